@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Meta Platforms, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+import torch
+
+from habitat_baselines.utils.info_dict import (
+    NON_SCALAR_METRICS,
+    extract_scalars_from_info,
+)
+
+COUNT_KEY = "count"
+REWARD_KEY = "reward"
+
+
+class EpisodeStatsAccumulator:
+    r"""Accumulates the episode statistics of the environments in a single
+    :py:`[num_envs, num_stats]` tensor.
+
+    The first two columns are the number of finished episodes and their
+    reward, the others are the scalar metrics of the environment infos. The
+    schema of the infos is discovered on the first step and only grows when
+    new metrics appear, so each step packs the metrics of all environments
+    in a preallocated buffer and accumulates them with a single masked add.
+
+    :param num_envs: number of environments.
+    :param device: device of the accumulated statistics.
+    :param ignore_keys: info keys that are not accumulated.
+    """
+
+    def __init__(
+        self,
+        num_envs: int,
+        device: Any = "cpu",
+        ignore_keys: Optional[Set[str]] = None,
+    ) -> None:
+        self._num_envs = num_envs
+        self._device = torch.device(device)
+        self._ignore_keys = set(NON_SCALAR_METRICS)
+        if ignore_keys is not None:
+            self._ignore_keys.update(ignore_keys)
+        self._keys: List[str] = [COUNT_KEY, REWARD_KEY]
+        self._columns: Dict[str, int] = {
+            k: i for i, k in enumerate(self._keys)
+        }
+        self._stats = torch.zeros(num_envs, len(self._keys), device=device)
+        self._staging = np.zeros((num_envs, len(self._keys)), np.float32)
+        # Columns of the metrics in the order of the last info
+        self._info_keys: List[str] = []
+        self._info_columns = np.zeros((0,), dtype=np.int64)
+
+    @property
+    def keys(self) -> List[str]:
+        return list(self._keys)
+
+    def __getitem__(self, key: str) -> torch.Tensor:
+        r"""Statistics of :p:`key` as a :py:`[num_envs, 1]` view."""
+        col = self._columns[key]
+        return self._stats[:, col : col + 1]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._columns
+
+    def _add_keys(self, keys: List[str]) -> None:
+        new_keys = [k for k in keys if k not in self._columns]
+        if len(new_keys) == 0:
+            return
+
+        for k in new_keys:
+            self._columns[k] = len(self._keys)
+            self._keys.append(k)
+
+        # Metrics that appear later start from zero, like the other metrics.
+        self._stats = torch.cat(
+            [
+                self._stats,
+                self._stats.new_zeros(self._num_envs, len(new_keys)),
+            ],
+            dim=1,
+        )
+        self._staging = np.zeros((self._num_envs, len(self._keys)), np.float32)
+
+    def add(
+        self,
+        env_slice: slice,
+        infos: List[Dict[str, Any]],
+        done_masks: torch.Tensor,
+        episode_rewards: torch.Tensor,
+    ) -> None:
+        r"""Adds the statistics of the environments of :p:`env_slice` whose
+        episode is over.
+
+        :param env_slice: environments the infos are from.
+        :param infos: info dict of each environment of the slice.
+        :param done_masks: :py:`[len(infos), 1]` bool tensor, whether the
+            episode of each environment is over.
+        :param episode_rewards: :py:`[len(infos), 1]` reward of the current
+            episode of each environment.
+        """
+        num_infos = len(infos)
+        metrics = [
+            extract_scalars_from_info(info, self._ignore_keys)
+            for info in infos
+        ]
+        for env_metrics in metrics:
+            if len(env_metrics.keys() - self._columns.keys()) > 0:
+                self._add_keys(list(env_metrics.keys()))
+
+        staging = self._staging[:num_infos]
+        staging.fill(0.0)
+        for i, env_metrics in enumerate(metrics):
+            info_keys = list(env_metrics.keys())
+            if info_keys != self._info_keys:
+                self._info_keys = info_keys
+                self._info_columns = np.array(
+                    [self._columns[k] for k in info_keys], dtype=np.int64
+                )
+            staging[i, self._info_columns] = list(env_metrics.values())
+        staging[:, self._columns[COUNT_KEY]] += 1.0
+
+        values = torch.from_numpy(staging).to(device=self._device)
+        values[:, self._columns[REWARD_KEY]] += episode_rewards.view(
+            num_infos
+        ).to(device=self._device, dtype=values.dtype)
+        self._stats[env_slice] += values.where(
+            done_masks.to(device=self._device), values.new_zeros(())
+        )
+
+    def state_dict(self) -> Dict[str, torch.Tensor]:
+        r"""Statistics as a dict of :py:`[num_envs, 1]` tensors."""
+        return {k: self[k].clone() for k in self._keys}
+
+    def load_state_dict(self, state_dict: Dict[str, torch.Tensor]) -> None:
+        self._add_keys(list(state_dict.keys()))
+        for k, v in state_dict.items():
+            self[k].copy_(v)
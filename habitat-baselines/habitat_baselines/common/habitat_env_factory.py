@@ -112,6 +112,7 @@ class HabitatVectorEnvFactory(VectorEnvFactory):
             make_env_fn=make_gym_from_config,
             env_fn_args=tuple((c,) for c in configs),
             workers_ignore_signals=workers_ignore_signals,
+            shared_memory_observations=config.habitat_baselines.shared_memory_observations,
         )
 
         if config.habitat.simulator.renderer.enable_batch_renderer:
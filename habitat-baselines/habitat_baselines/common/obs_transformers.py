@@ -22,7 +22,10 @@ This module API is experimental and likely to change
 """
 import abc
 import copy
+import hashlib
+import json
 import numbers
+import os
 from enum import Enum
 from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple, Union
 
@@ -608,10 +611,17 @@ class ProjectionConverter(nn.Module):
         self,
         input_projections: Union[List[CameraProjection], CameraProjection],
         output_projections: Union[List[CameraProjection], CameraProjection],
+        use_sampling_map: bool = True,
+        sampling_map_cache_dir: Optional[str] = None,
     ):
         """Args:
         input_projections: input images of projection models
         output_projections: generated image of projection models
+        use_sampling_map: precompute the input image of each output pixel,
+            and sample each output pixel once in the stacked input images
+            instead of sampling every input image
+        sampling_map_cache_dir: directory where the sampling maps are cached
+            between runs, or None to not cache them
         """
         super(ProjectionConverter, self).__init__()
         # Convert to list
@@ -646,8 +656,23 @@ class ProjectionConverter(nn.Module):
             self.output_models, inverse=True
         )
 
-        # grids shape: (output_len, input_len, output_img_h, output_img_w, 2)
-        self.grids = self.generate_grid()
+        self.use_sampling_map = use_sampling_map
+        self.grids: Optional[torch.Tensor] = None
+        if use_sampling_map:
+            # sampling_input_ids shape: (output_len, output_img_h, output_img_w)
+            # sampling_grids shape: (output_len, output_img_h, output_img_w, 2)
+            (
+                self.sampling_input_ids,
+                self.sampling_grids,
+            ) = self._load_or_generate_sampling_map(sampling_map_cache_dir)
+            # Sampling grids in the stacked input images, for each input
+            # image size and device.
+            self._sampling_grids_cache: Dict[
+                Tuple[int, int, torch.device], torch.Tensor
+            ] = {}
+        else:
+            # grids shape: (output_len, input_len, output_img_h, output_img_w, 2)
+            self.grids = self.generate_grid()
         # _grids_cache shape: (batch_size*output_len*input_len, output_img_h, output_img_w, 2)
         self._grids_cache: Optional[torch.Tensor] = None
 
@@ -678,6 +703,137 @@ class ProjectionConverter(nn.Module):
         multi_output_grids = torch.cat(multi_output_grids, dim=1)
         return multi_output_grids  # input_len, output_len, output_img_h, output_img_w, 2
 
+    def generate_sampling_map(self) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Generates the input image of each output pixel, -1 if the pixel
+        is not in any input image, and the grid_sample coordinates of the
+        pixel in this input image.
+        """
+        multi_output_ids = []
+        multi_output_grids = []
+        for output_model in self.output_models:
+            # Obtain points on unit sphere
+            world_pts, not_assigned_mask = output_model.unprojection()
+            input_ids = torch.full(
+                not_assigned_mask.shape, -1, dtype=torch.long
+            )
+            input_grids = torch.zeros(
+                (*not_assigned_mask.shape, 2), dtype=torch.float
+            )
+            for i, input_model in enumerate(self.input_models):
+                grid, input_mask = input_model.projection(world_pts)
+                # Make sure each point is only assigned to single input
+                input_mask *= not_assigned_mask
+                input_ids[input_mask] = i
+                input_grids[input_mask] = grid[input_mask].float()
+                not_assigned_mask *= ~input_mask
+            multi_output_ids.append(input_ids)
+            multi_output_grids.append(input_grids)
+        return torch.stack(multi_output_ids), torch.stack(multi_output_grids)
+
+    def _get_sampling_map_key(self) -> str:
+        """Hash of the parameters of the projection models."""
+
+        def describe(model: CameraProjection) -> List:
+            return [
+                type(model).__name__,
+                {
+                    k: v.tolist() if isinstance(v, torch.Tensor) else v
+                    for k, v in sorted(vars(model).items())
+                },
+            ]
+
+        description = json.dumps(
+            [
+                [describe(model) for model in self.input_models],
+                [describe(model) for model in self.output_models],
+            ],
+            default=str,
+        )
+        return hashlib.sha1(description.encode("utf-8")).hexdigest()
+
+    def _load_or_generate_sampling_map(
+        self, cache_dir: Optional[str]
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        if cache_dir is None:
+            return self.generate_sampling_map()
+
+        path = os.path.join(
+            cache_dir, f"sampling_map_{self._get_sampling_map_key()}.npz"
+        )
+        if os.path.exists(path):
+            try:
+                with np.load(path) as sampling_map:
+                    return (
+                        torch.from_numpy(sampling_map["input_ids"]),
+                        torch.from_numpy(sampling_map["grids"]),
+                    )
+            except (OSError, ValueError, KeyError):
+                logger.warning(f"Could not load the sampling map {path}")
+
+        input_ids, grids = self.generate_sampling_map()
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write then rename, so that concurrent processes never read a
+        # partial file.
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, input_ids=input_ids.numpy(), grids=grids.numpy())
+        os.replace(tmp_path, path)
+        return input_ids, grids
+
+    def _get_sampling_grid(
+        self, in_h: int, in_w: int, device: torch.device
+    ) -> torch.Tensor:
+        """grid_sample coordinates of the output pixels in the input images
+        of a set stacked vertically into a single image. Output pixels that
+        are not in any input image are out of this image.
+        """
+        key = (in_h, in_w, device)
+        if key not in self._sampling_grids_cache:
+            input_ids = self.sampling_input_ids
+            grids = self.sampling_grids.double()
+            # Row of each output pixel in the stacked input images, with
+            # align_corners=True.
+            rows = (grids[..., 1] + 1) / 2 * (in_h - 1) + input_ids * in_h
+            stacked_grids = torch.stack(
+                [grids[..., 0], rows / (self.input_len * in_h - 1) * 2 - 1],
+                dim=-1,
+            )
+            # Values bigger than one will be ignored by grid_sample
+            stacked_grids[input_ids < 0] = 2
+            out_h, out_w = self.output_models[0].size()
+            self._sampling_grids_cache[key] = (
+                stacked_grids.float()
+                .view(1, self.output_len * out_h, out_w, 2)
+                .to(device)
+            )
+        return self._sampling_grids_cache[key]
+
+    def _convert_with_sampling_map(self, batch: torch.Tensor) -> torch.Tensor:
+        """Converts a batch of images stacked in proper order by sampling
+        each output pixel once, in the input images of its set stacked
+        vertically."""
+        batch_size, ch, in_h, in_w = batch.shape
+        out_h, out_w = self.output_models[0].size()
+        num_input_set = batch_size // self.input_len
+        grid = self._get_sampling_grid(in_h, in_w, batch.device)
+
+        stacked_inputs = (
+            batch.view(num_input_set, self.input_len, ch, in_h, in_w)
+            .transpose(1, 2)
+            .reshape(num_input_set, ch, self.input_len * in_h, in_w)
+        )
+        output = torch.nn.functional.grid_sample(
+            stacked_inputs,
+            grid.expand(num_input_set, -1, -1, -1),
+            align_corners=True,
+            padding_mode="zeros",
+        )
+        return (
+            output.view(num_input_set, ch, self.output_len, out_h, out_w)
+            .transpose(1, 2)
+            .reshape(num_input_set * self.output_len, ch, out_h, out_w)
+        )  # output_len * batch_size, ch, output_model.img_h, output_model.img_w
+
     def _convert(self, batch: torch.Tensor) -> torch.Tensor:
         """Takes a batch of images stacked in proper order and converts thems,
         reduces batch size by input_len."""
@@ -714,10 +870,14 @@ class ProjectionConverter(nn.Module):
         if batch_size == 0 or batch_size % self.input_len != 0:
             raise ValueError(f"Batch size should be {self.input_len}x")
 
+        if self.use_sampling_map:
+            return self._convert_with_sampling_map(batch)
+
         # How many sets of input.
         num_input_set = batch_size // self.input_len
 
         # to(device) is a NOOP after the first call
+        assert self.grids is not None
         self.grids = self.grids.to(batch.device)
 
         # Adjust batch for multiple outputs
@@ -845,10 +1005,19 @@ class Cube2Equirect(ProjectionConverter):
     Inspired from https://github.com/fuenwang/PanoramaUtility and
     optimized for modern PyTorch."""
 
-    def __init__(self, equ_h: int, equ_w: int):
+    def __init__(
+        self,
+        equ_h: int,
+        equ_w: int,
+        use_sampling_map: bool = True,
+        sampling_map_cache_dir: Optional[str] = None,
+    ):
         """Args:
         equ_h: (int) the height of the generated equirect
         equ_w: (int) the width of the generated equirect
+        use_sampling_map: (bool) convert with precomputed sampling maps
+        sampling_map_cache_dir: (str) directory where the sampling maps are
+            cached, or None to not cache them
         """
 
         # Cubemap input
@@ -857,7 +1026,10 @@ class Cube2Equirect(ProjectionConverter):
         # Equirectangular output
         output_projection = EquirectProjection(equ_h, equ_w)
         super(Cube2Equirect, self).__init__(
-            input_projections, output_projection
+            input_projections,
+            output_projection,
+            use_sampling_map,
+            sampling_map_cache_dir,
         )
 
 
@@ -981,15 +1153,21 @@ class CubeMap2Equirect(ProjectionTransformer):
         channels_last: bool = False,
         target_uuids: Optional[List[str]] = None,
         depth_key: str = "depth",
+        use_sampling_map: bool = True,
+        sampling_map_cache_dir: Optional[str] = None,
     ):
         r""":param sensor_uuids: List of sensor_uuids: Back, Down, Front, Left, Right, Up.
         :param eq_shape: The shape of the equirectangular output (height, width)
         :param channels_last: Are the channels last in the input
         :param target_uuids: Optional List of which of the sensor_uuids to overwrite
         :param depth_key: If sensor_uuids has depth_key substring, they are processed as depth
+        :param use_sampling_map: Convert with precomputed sampling maps
+        :param sampling_map_cache_dir: Optional directory where the sampling maps are cached
         """
 
-        converter = Cube2Equirect(eq_shape[0], eq_shape[1])
+        converter = Cube2Equirect(
+            eq_shape[0], eq_shape[1], use_sampling_map, sampling_map_cache_dir
+        )
         super(CubeMap2Equirect, self).__init__(
             converter,
             sensor_uuids,
@@ -1013,6 +1191,8 @@ class CubeMap2Equirect(ProjectionTransformer):
                 config.width,
             ),
             target_uuids=target_uuids,
+            use_sampling_map=config.use_sampling_map,
+            sampling_map_cache_dir=config.sampling_map_cache_dir,
         )
 
 
@@ -1033,6 +1213,8 @@ class Cube2Fisheye(ProjectionConverter):
         fy: float,
         xi: float,
         alpha: float,
+        use_sampling_map: bool = True,
+        sampling_map_cache_dir: Optional[str] = None,
     ):
         """Args:
         fish_h: (int) the height of the generated fisheye
@@ -1040,6 +1222,9 @@ class Cube2Fisheye(ProjectionConverter):
         fish_fov: (float) the fov of the generated fisheye in degrees
         cx, cy: (float) the optical center of the generated fisheye
         fx, fy, xi, alpha: (float) the fisheye camera model parameters
+        use_sampling_map: (bool) convert with precomputed sampling maps
+        sampling_map_cache_dir: (str) directory where the sampling maps are
+            cached, or None to not cache them
         """
 
         # Cubemap input
@@ -1050,7 +1235,10 @@ class Cube2Fisheye(ProjectionConverter):
             fish_h, fish_w, fish_fov, cx, cy, fx, fy, xi, alpha
         )
         super(Cube2Fisheye, self).__init__(
-            input_projections, output_projection
+            input_projections,
+            output_projection,
+            use_sampling_map,
+            sampling_map_cache_dir,
         )
 
 
@@ -1076,6 +1264,8 @@ class CubeMap2Fisheye(ProjectionTransformer):
         channels_last: bool = False,
         target_uuids: Optional[List[str]] = None,
         depth_key: str = "depth",
+        use_sampling_map: bool = True,
+        sampling_map_cache_dir: Optional[str] = None,
     ):
         r""":param sensor_uuids: List of sensor_uuids: Back, Down, Front, Left, Right, Up.
         :param fish_shape: The shape of the fisheye output (height, width)
@@ -1084,6 +1274,8 @@ class CubeMap2Fisheye(ProjectionTransformer):
         :param channels_last: Are the channels last in the input
         :param target_uuids: Optional List of which of the sensor_uuids to overwrite
         :param depth_key: If sensor_uuids has depth_key substring, they are processed as depth
+        :param use_sampling_map: Convert with precomputed sampling maps
+        :param sampling_map_cache_dir: Optional directory where the sampling maps are cached
         """
 
         assert (
@@ -1097,7 +1289,17 @@ class CubeMap2Fisheye(ProjectionTransformer):
         xi = fish_params[1]
         alpha = fish_params[2]
         converter: ProjectionConverter = Cube2Fisheye(
-            fish_shape[0], fish_shape[1], fish_fov, cx, cy, fx, fy, xi, alpha
+            fish_shape[0],
+            fish_shape[1],
+            fish_fov,
+            cx,
+            cy,
+            fx,
+            fy,
+            xi,
+            alpha,
+            use_sampling_map,
+            sampling_map_cache_dir,
         )
 
         super(CubeMap2Fisheye, self).__init__(
@@ -1125,6 +1327,8 @@ class CubeMap2Fisheye(ProjectionTransformer):
             fish_fov=config.fov,
             fish_params=config.params,
             target_uuids=target_uuids,
+            use_sampling_map=config.use_sampling_map,
+            sampling_map_cache_dir=config.sampling_map_cache_dir,
         )
 
 
@@ -1132,10 +1336,19 @@ class Equirect2Cube(ProjectionConverter):
     """This is the backend Equirect2CubeMap that converts equirectangular image
     to cubemap images."""
 
-    def __init__(self, img_h: int, img_w: int):
+    def __init__(
+        self,
+        img_h: int,
+        img_w: int,
+        use_sampling_map: bool = True,
+        sampling_map_cache_dir: Optional[str] = None,
+    ):
         """Args:
         img_h: (int) the height of the generated cubemap
         img_w: (int) the width of the generated cubemap
+        use_sampling_map: (bool) convert with precomputed sampling maps
+        sampling_map_cache_dir: (str) directory where the sampling maps are
+            cached, or None to not cache them
         """
 
         # Equirectangular input
@@ -1144,7 +1357,10 @@ class Equirect2Cube(ProjectionConverter):
         #  Cubemap output
         output_projections = get_cubemap_projections(img_h, img_w)
         super(Equirect2Cube, self).__init__(
-            input_projection, output_projections
+            input_projection,
+            output_projections,
+            use_sampling_map,
+            sampling_map_cache_dir,
         )
 
 
@@ -1163,15 +1379,24 @@ class Equirect2CubeMap(ProjectionTransformer):
         channels_last: bool = False,
         target_uuids: Optional[List[str]] = None,
         depth_key: str = "depth",
+        use_sampling_map: bool = True,
+        sampling_map_cache_dir: Optional[str] = None,
     ):
         r""":param sensor_uuids: List of sensor_uuids: Back, Down, Front, Left, Right, Up.
         :param img_shape: The shape of the equirectangular output (height, width)
         :param channels_last: Are the channels last in the input
         :param target_uuids: Optional List of which of the sensor_uuids to overwrite
         :param depth_key: If sensor_uuids has depth_key substring, they are processed as depth
+        :param use_sampling_map: Convert with precomputed sampling maps
+        :param sampling_map_cache_dir: Optional directory where the sampling maps are cached
         """
 
-        converter = Equirect2Cube(img_shape[0], img_shape[1])
+        converter = Equirect2Cube(
+            img_shape[0],
+            img_shape[1],
+            use_sampling_map,
+            sampling_map_cache_dir,
+        )
         super(Equirect2CubeMap, self).__init__(
             converter,
             sensor_uuids,
@@ -1195,6 +1420,8 @@ class Equirect2CubeMap(ProjectionTransformer):
                 config.width,
             ),
             target_uuids=target_uuids,
+            use_sampling_map=config.use_sampling_map,
+            sampling_map_cache_dir=config.sampling_map_cache_dir,
         )
 
 
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Meta Platforms, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+r"""Batched engines for computing discounted returns and GAE advantages.
+
+Both quantities follow the same backward linear recurrence
+
+.. code:: py
+
+    x[t] = b[t] + c[t] * x[t + 1]
+
+with :py:`b = rewards, c = gamma * masks[1:]` and :py:`x[T] = next_value` for
+the plain returns and :py:`b = delta, c = gamma * tau * masks[1:]` and
+:py:`x[T] = 0` for the GAE advantages. The engines only differ by how this
+recurrence is evaluated:
+
+* :py:`"loop"` runs one python iteration per step.
+* :py:`"torchscript"` runs the same loop compiled with TorchScript, which
+  removes the python overhead but still launches a few kernels per step.
+* :py:`"chunked"` evaluates the recurrence in closed form over chunks of
+  steps, launching a handful of kernels per chunk instead of per step.
+"""
+
+from typing import Callable, Dict
+
+import torch
+
+RETURNS_IMPLEMENTATIONS = ("loop", "torchscript", "chunked")
+
+
+def _backward_scan_loop(
+    b: torch.Tensor, c: torch.Tensor, x_last: torch.Tensor, chunk_size: int
+) -> torch.Tensor:
+    x = torch.empty_like(b)
+    carry = x_last
+    for step in range(b.size(0) - 1, -1, -1):
+        carry = b[step] + c[step] * carry
+        x[step] = carry
+
+    return x
+
+
+@torch.jit.script
+def _backward_scan_script(
+    b: torch.Tensor, c: torch.Tensor, x_last: torch.Tensor, chunk_size: int
+) -> torch.Tensor:
+    x = torch.empty_like(b)
+    carry = x_last
+    for step in range(b.size(0) - 1, -1, -1):
+        carry = b[step] + c[step] * carry
+        x[step] = carry
+
+    return x
+
+
+def _backward_scan_chunked(
+    b: torch.Tensor, c: torch.Tensor, x_last: torch.Tensor, chunk_size: int
+) -> torch.Tensor:
+    r"""Unrolls the recurrence over chunks of :p:`chunk_size` steps. Within a
+    chunk starting at :py:`s` and ending at :py:`e`,
+
+    .. code:: py
+
+        x[t] = sum_{k=t}^{e-1} W[t, k] * b[k] + W[t, e] * x[e]
+
+    where :py:`W[t, k] = prod_{j=t}^{k-1} c[j]`. :py:`W` is built with a
+    cumulative product, which unlike a log-space cumulative sum is exact when
+    some of the :py:`c` are zero (episode boundaries).
+    """
+    num_steps = b.size(0)
+    x = torch.empty_like(b)
+    b_flat = b.reshape(num_steps, -1)
+    c_flat = c.reshape(num_steps, -1)
+    carry = x_last.reshape(-1)
+
+    for end in range(num_steps, 0, -chunk_size):
+        start = max(end - chunk_size, 0)
+        length = end - start
+        # factors[t, j] = c[start + j] for j >= t and 1 otherwise
+        factors = c_flat[start:end].unsqueeze(0).expand(length, -1, -1)
+        upper = torch.ones(
+            length, length, dtype=torch.bool, device=b.device
+        ).triu_()
+        factors = torch.where(
+            upper.unsqueeze(-1),
+            factors,
+            torch.ones((), dtype=b.dtype, device=b.device),
+        )
+        weights = torch.cat(
+            [torch.ones_like(factors[:, :1]), factors], dim=1
+        ).cumprod(dim=1)
+        # Only the k >= t part of the cumulative product is used
+        lower = torch.ones(
+            length, length + 1, dtype=torch.bool, device=b.device
+        ).tril_(-1)
+        weights = weights.masked_fill(lower.unsqueeze(-1), 0.0)
+
+        chunk = (weights[:, :length] * b_flat[start:end].unsqueeze(0)).sum(
+            1
+        ) + weights[:, length] * carry.unsqueeze(0)
+        x[start:end] = chunk.view_as(b[start:end])
+        carry = chunk[0]
+
+    return x
+
+
+_BACKWARD_SCANS: Dict[str, Callable[..., torch.Tensor]] = {
+    "loop": _backward_scan_loop,
+    "torchscript": _backward_scan_script,
+    "chunked": _backward_scan_chunked,
+}
+
+
+def compute_returns_(
+    returns: torch.Tensor,
+    rewards: torch.Tensor,
+    value_preds: torch.Tensor,
+    masks: torch.Tensor,
+    num_steps: int,
+    use_gae: bool,
+    gamma: float,
+    tau: float,
+    implementation: str = "loop",
+    chunk_size: int = 32,
+) -> None:
+    r"""Computes the returns of a rollout in place.
+
+    All tensors are indexed by step first and must have at least
+    :p:`num_steps` + 1 steps. With :p:`use_gae`, :py:`value_preds[num_steps]`
+    must hold the value of the last observation, otherwise
+    :py:`returns[num_steps]` must.
+
+    :param returns: tensor the returns of the first :p:`num_steps` steps
+        are written to.
+    :param rewards: rewards of each step.
+    :param value_preds: value predictions of each step.
+    :param masks: :py:`masks[t]` is false if step :py:`t` starts a new
+        episode.
+    :param num_steps: number of steps in the rollout.
+    :param use_gae: whether to compute the GAE returns or the plain
+        discounted returns.
+    :param gamma: discount factor.
+    :param tau: GAE lambda.
+    :param implementation: one of :ref:`RETURNS_IMPLEMENTATIONS`.
+    :param chunk_size: number of steps per chunk for the :py:`"chunked"`
+        implementation.
+    """
+    if implementation not in _BACKWARD_SCANS:
+        raise ValueError(
+            f"Unknown returns implementation '{implementation}', "
+            f"expected one of {RETURNS_IMPLEMENTATIONS}"
+        )
+    if num_steps == 0:
+        return
+
+    scan = _BACKWARD_SCANS[implementation]
+    next_masks = masks[1 : num_steps + 1].to(rewards.dtype)
+    if use_gae:
+        values = value_preds[:num_steps]
+        delta = (
+            rewards[:num_steps]
+            + gamma * value_preds[1 : num_steps + 1] * next_masks
+            - values
+        )
+        advantages = scan(
+            delta,
+            (gamma * tau) * next_masks,
+            torch.zeros_like(delta[0]),
+            chunk_size,
+        )
+        returns[:num_steps] = advantages + values
+    else:
+        returns[:num_steps] = scan(
+            rewards[:num_steps],
+            gamma * next_masks,
+            returns[num_steps],
+            chunk_size,
+        )
@@ -4,13 +4,16 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+import contextlib
 import warnings
-from typing import Any, Dict, Iterator, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import numpy as np
 import torch
 
 from habitat_baselines.common.baseline_registry import baseline_registry
+from habitat_baselines.common.return_computation import compute_returns_
 from habitat_baselines.common.storage import Storage
 from habitat_baselines.common.tensor_dict import DictTree, TensorDict
 from habitat_baselines.rl.models.rnn_state_encoder import (
@@ -21,6 +24,145 @@ from habitat_baselines.utils.common import get_action_space_info
 from habitat_baselines.utils.timing import g_timer
 
 
+class _MiniBatchPrefetcher:
+    r"""Builds the mini batches of :ref:`RolloutStorage.data_generator` in a
+    background thread, and on a side CUDA stream when the storage is on the
+    GPU, so that the next mini batch is gathered while the current one is
+    used for training.
+
+    The mini batches are gathered with :py:`torch.index_select` into two sets
+    of preallocated buffers that are reused across epochs and updates, so a
+    mini batch is only valid until two more mini batches are requested.
+    """
+
+    num_slots = 2
+
+    def __init__(self, device: torch.device) -> None:
+        self._device = device
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="mini_batch_prefetch"
+        )
+        self._stream: Optional[torch.cuda.Stream] = None
+        if device.type == "cuda":
+            self._stream = torch.cuda.Stream(device=device)
+        self._buffers: Dict[Tuple[Any, ...], TensorDict] = {}
+
+    def _stream_context(self):
+        if self._stream is None:
+            return contextlib.nullcontext()
+        return torch.cuda.stream(self._stream)
+
+    def _record_event(self) -> Optional[torch.cuda.Event]:
+        r"""Records an event on the stream of the calling thread."""
+        if self._device.type != "cuda":
+            return None
+        event = torch.cuda.Event()
+        event.record(torch.cuda.current_stream(self._device))
+        return event
+
+    def _wait_event(self, event: Optional[torch.cuda.Event]) -> None:
+        if event is not None:
+            torch.cuda.current_stream(self._device).wait_event(event)
+
+    def _get_buffers(
+        self, slot: int, source: TensorDict, num_inds: int
+    ) -> TensorDict:
+        key = (slot, num_inds, source["masks"].size(0), *source.flatten()[0])
+        if key not in self._buffers:
+            self._buffers[key] = source.map(
+                lambda v: v.new_empty((v.size(0) * num_inds, *v.shape[2:]))
+            )
+        return self._buffers[key]
+
+    def _dones_cpu(
+        self, masks: torch.Tensor, ready: Optional[torch.cuda.Event]
+    ) -> np.ndarray:
+        with self._stream_context():
+            self._wait_event(ready)
+            return (
+                torch.logical_not(masks).cpu().view(masks.size(0), -1).numpy()
+            )
+
+    def _build(
+        self,
+        slot: int,
+        source: TensorDict,
+        inds: torch.Tensor,
+        dones_cpu: "Future[np.ndarray]",
+        ready: Optional[torch.cuda.Event],
+    ) -> Tuple[DictTree, Optional[torch.cuda.Event]]:
+        num_steps = source["masks"].size(0)
+        with self._stream_context():
+            # The mini batch buffers of this slot may still be read by the
+            # training of the mini batch before the previous one.
+            self._wait_event(ready)
+            batch = self._get_buffers(slot, source, len(inds))
+            device_inds = inds.to(device=self._device, non_blocking=True)
+            for src, dst in zip(source.flatten()[1], batch.flatten()[1]):
+                torch.index_select(
+                    src,
+                    1,
+                    device_inds,
+                    out=dst.view(src.size(0), len(inds), *src.shape[2:]),
+                )
+
+            batch = TensorDict(batch)
+            batch["rnn_build_seq_info"] = build_rnn_build_seq_info(
+                device=self._device,
+                build_fn_result=build_pack_info_from_dones(
+                    dones_cpu.result()[0:num_steps, inds.numpy()].reshape(
+                        -1, len(inds)
+                    ),
+                ),
+                pin_memory=self._stream is not None,
+            )
+            done = self._record_event()
+
+        return batch.to_tree(), done
+
+    def generate(
+        self,
+        source: TensorDict,
+        masks: torch.Tensor,
+        mini_batch_inds: List[torch.Tensor],
+    ) -> Iterator[DictTree]:
+        dones_cpu = self._executor.submit(
+            self._dones_cpu, masks, self._record_event()
+        )
+
+        def submit(i: int) -> "Future[Tuple[DictTree, Any]]":
+            return self._executor.submit(
+                self._build,
+                i % self.num_slots,
+                source,
+                mini_batch_inds[i],
+                dones_cpu,
+                self._record_event(),
+            )
+
+        pending = submit(0)
+        try:
+            for i in range(len(mini_batch_inds)):
+                batch, done = pending.result()
+                if i + 1 < len(mini_batch_inds):
+                    pending = submit(i + 1)
+                self._wait_event(done)
+                if self._stream is not None:
+                    # The pack info is allocated on the side stream
+                    current_stream = torch.cuda.current_stream(self._device)
+                    for v in batch["rnn_build_seq_info"].values():
+                        if v.is_cuda:
+                            v.record_stream(current_stream)
+                yield batch
+        finally:
+            # Don't leave a mini batch being written when the generator
+            # is closed early.
+            pending.result()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
 @baseline_registry.register_storage
 class RolloutStorage(Storage):
     r"""Class for storing rollout information for RL trainers."""
@@ -33,6 +175,9 @@ class RolloutStorage(Storage):
         action_space,
         actor_critic,
         is_double_buffered: bool = False,
+        returns_implementation: str = "loop",
+        returns_chunk_size: int = 32,
+        prefetch_mini_batches: bool = False,
     ):
         action_shape, discrete_actions = get_action_space_info(action_space)
 
@@ -94,6 +239,12 @@ class RolloutStorage(Storage):
         self.num_steps = numsteps
         self.current_rollout_step_idxs = [0 for _ in range(self._nbuffers)]
 
+        self._returns_implementation = returns_implementation
+        self._returns_chunk_size = returns_chunk_size
+
+        self._prefetch_mini_batches = prefetch_mini_batches
+        self._prefetcher: Optional[_MiniBatchPrefetcher] = None
+
         # The default device to torch is the CPU, so everything is on the CPU.
         self.device = torch.device("cpu")
 
@@ -108,6 +259,12 @@ class RolloutStorage(Storage):
     def to(self, device):
         self.buffers.map_in_place(lambda v: v.to(device))
         self.device = device
+        self._close_prefetcher()
+
+    def _close_prefetcher(self) -> None:
+        if self._prefetcher is not None:
+            self._prefetcher.close()
+            self._prefetcher = None
 
     @g_timer.avg_time("rollout_storage.insert", level=1)
     def insert(
@@ -178,31 +335,22 @@ class RolloutStorage(Storage):
             self.buffers["value_preds"][
                 self.current_rollout_step_idx
             ] = next_value
-            gae = 0.0
-            for step in reversed(range(self.current_rollout_step_idx)):
-                delta = (
-                    self.buffers["rewards"][step]
-                    + gamma
-                    * self.buffers["value_preds"][step + 1]
-                    * self.buffers["masks"][step + 1]
-                    - self.buffers["value_preds"][step]
-                )
-                gae = (
-                    delta + gamma * tau * gae * self.buffers["masks"][step + 1]
-                )
-                self.buffers["returns"][step] = (  # type: ignore
-                    gae + self.buffers["value_preds"][step]  # type: ignore
-                )
-
         else:
+            assert isinstance(self.buffers["returns"], torch.Tensor)
             self.buffers["returns"][self.current_rollout_step_idx] = next_value
-            for step in reversed(range(self.current_rollout_step_idx)):
-                self.buffers["returns"][step] = (
-                    gamma
-                    * self.buffers["returns"][step + 1]
-                    * self.buffers["masks"][step + 1]
-                    + self.buffers["rewards"][step]
-                )
+
+        compute_returns_(
+            self.buffers["returns"],  # type: ignore
+            self.buffers["rewards"],  # type: ignore
+            self.buffers["value_preds"],  # type: ignore
+            self.buffers["masks"],  # type: ignore
+            self.current_rollout_step_idx,
+            use_gae,
+            gamma,
+            tau,
+            implementation=self._returns_implementation,
+            chunk_size=self._returns_chunk_size,
+        )
 
     def data_generator(
         self,
@@ -227,6 +375,12 @@ class RolloutStorage(Storage):
                 )
             )
 
+        if self._prefetch_mini_batches:
+            yield from self._prefetched_data_generator(
+                advantages, num_environments, num_mini_batch
+            )
+            return
+
         dones_cpu = (
             torch.logical_not(self.buffers["masks"])
             .cpu()
@@ -256,7 +410,36 @@ class RolloutStorage(Storage):
 
             yield batch.to_tree()
 
+    def _prefetched_data_generator(
+        self,
+        advantages: Optional[torch.Tensor],
+        num_environments: int,
+        num_mini_batch: int,
+    ) -> Iterator[DictTree]:
+        num_steps = self.current_rollout_step_idx
+        # Views of the data the mini batches are gathered from
+        source = self.buffers[0:num_steps]
+        if advantages is not None:
+            source["advantages"] = advantages[0:num_steps]
+        source["recurrent_hidden_states"] = self.buffers[
+            "recurrent_hidden_states"
+        ][0:1]
+
+        if self._prefetcher is None:
+            self._prefetcher = _MiniBatchPrefetcher(torch.device(self.device))
+
+        yield from self._prefetcher.generate(
+            source,
+            self.buffers["masks"],  # type: ignore
+            list(torch.randperm(num_environments).chunk(num_mini_batch)),
+        )
+
     def __getstate__(self) -> Dict[str, Any]:
+        if self._prefetcher is not None:
+            # The prefetch thread and buffers are recreated when needed
+            state = self.__dict__.copy()
+            state["_prefetcher"] = None
+            return state
         return self.__dict__
 
     def __setstate__(self, state: Dict[str, Any]):
@@ -145,6 +145,12 @@ class Cube2EqConfig(ObsTransformConfig):
             "UP",
         ]
     )
+    # Precompute the input image of each output pixel, instead of sampling
+    # every input image for every output pixel.
+    use_sampling_map: bool = True
+    # Directory where the sampling maps are cached between runs, None to not
+    # cache them.
+    sampling_map_cache_dir: Optional[str] = None
 
 
 cs.store(
@@ -171,6 +177,9 @@ class Cube2FishConfig(ObsTransformConfig):
             "UP",
         ]
     )
+    # See Cube2EqConfig.
+    use_sampling_map: bool = True
+    sampling_map_cache_dir: Optional[str] = None
 
 
 cs.store(
@@ -208,6 +217,9 @@ class Eq2CubeConfig(ObsTransformConfig):
             "UP",
         ]
     )
+    # See Cube2EqConfig.
+    use_sampling_map: bool = True
+    sampling_map_cache_dir: Optional[str] = None
 
 
 cs.store(
@@ -311,6 +323,17 @@ class PPOConfig(HabitatBaselinesBaseConfig):
     # policy inference time during rollout generation
     # Not that this does not change the memory requirements
     use_double_buffered_sampler: bool = False
+    # How the returns and GAE advantages are computed: "loop" (one python
+    # iteration per step), "torchscript" (TorchScript compiled loop) or
+    # "chunked" (closed form over chunks of `returns_chunk_size` steps,
+    # fewest kernel launches on GPU). All produce matching results.
+    returns_implementation: str = "loop"
+    returns_chunk_size: int = 32
+    # Build the next mini batch in a background thread (and on a side CUDA
+    # stream) while the current one is used for the update. Mini batches are
+    # gathered into reused buffers, so they are only valid until two more
+    # mini batches are requested.
+    prefetch_mini_batches: bool = False
 
 
 @dataclass
@@ -456,6 +479,9 @@ class HabitatBaselinesConfig(HabitatBaselinesBaseConfig):
     # path to ckpt or path to ckpts dir
     eval_ckpt_path_dir: str = "data/checkpoints"
     num_environments: int = 16
+    # If true, the VectorEnv workers write their array observations into a
+    # shared memory ring instead of pickling them through a pipe.
+    shared_memory_observations: bool = False
     num_processes: int = -1  # deprecated
     rollout_storage_name: str = "RolloutStorage"
     checkpoint_folder: str = "data/checkpoints"
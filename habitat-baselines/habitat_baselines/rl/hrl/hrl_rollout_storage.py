@@ -9,6 +9,7 @@ from typing import Iterator, Optional
 import torch
 
 from habitat_baselines.common.baseline_registry import baseline_registry
+from habitat_baselines.common.return_computation import compute_returns_
 from habitat_baselines.common.rollout_storage import RolloutStorage
 from habitat_baselines.common.tensor_dict import DictTree, TensorDict
 from habitat_baselines.rl.models.rnn_state_encoder import (
@@ -154,19 +155,18 @@ class HrlRolloutStorage(RolloutStorage):
             raise ValueError("Only GAE is supported with HRL trainer")
 
         assert isinstance(self.buffers["value_preds"], torch.Tensor)
-        gae = 0.0
-        for step in reversed(range(self._cur_step_idxs.max())):
-            delta = (
-                self.buffers["rewards"][step]
-                + gamma
-                * self.buffers["value_preds"][step + 1]
-                * self.buffers["masks"][step + 1]
-                - self.buffers["value_preds"][step]
-            )
-            gae = delta + gamma * tau * gae * self.buffers["masks"][step + 1]
-            self.buffers["returns"][step] = (  # type: ignore
-                gae + self.buffers["value_preds"][step]  # type: ignore
-            )
+        compute_returns_(
+            self.buffers["returns"],  # type: ignore
+            self.buffers["rewards"],  # type: ignore
+            self.buffers["value_preds"],
+            self.buffers["masks"],  # type: ignore
+            int(self._cur_step_idxs.max()),
+            use_gae,
+            gamma,
+            tau,
+            implementation=self._returns_implementation,
+            chunk_size=self._returns_chunk_size,
+        )
 
     def data_generator(self, advantages, num_batches) -> Iterator[DictTree]:
         """
@@ -169,17 +169,25 @@ def build_pack_info_from_dones(dones: np.ndarray) -> Dict[str, np.ndarray]:
 
 
 def build_rnn_build_seq_info(
-    device: torch.device, build_fn_result: Dict[str, np.ndarray]
+    device: torch.device,
+    build_fn_result: Dict[str, np.ndarray],
+    pin_memory: bool = False,
 ) -> TensorDict:
-    r"""Creates the dict with the build pack seq results."""
+    r"""Creates the dict with the build pack seq results.
+
+    :param pin_memory: Whether to copy the results to pinned memory and send
+        them to :p:`device` asynchronously.
+    """
     rnn_build_seq_info = TensorDict()
     for k, v_n in build_fn_result.items():
         v = torch.from_numpy(v_n)
+        if pin_memory:
+            v = v.pin_memory()
         # We keep the CPU side
         # tensor as well. This makes various things
         # easier and some things need to be on the CPU
         rnn_build_seq_info[f"cpu_{k}"] = v
-        rnn_build_seq_info[k] = v.to(device=device)
+        rnn_build_seq_info[k] = v.to(device=device, non_blocking=pin_memory)
 
     return rnn_build_seq_info
 
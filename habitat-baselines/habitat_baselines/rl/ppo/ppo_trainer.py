@@ -9,7 +9,7 @@ import os
 import random
 import time
 from collections import defaultdict, deque
-from typing import TYPE_CHECKING, Dict, List, Optional, Set
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set
 
 import hydra
 import numpy as np
@@ -21,10 +21,12 @@ from habitat import VectorEnv, logger
 from habitat.config import read_write
 from habitat.config.default import get_agent_config
 from habitat.utils import profiling_wrapper
+from habitat.utils.profiler import Profiler, get_profiler
 from habitat_baselines.common import VectorEnvFactory
 from habitat_baselines.common.base_trainer import BaseRLTrainer
 from habitat_baselines.common.baseline_registry import baseline_registry
 from habitat_baselines.common.env_spec import EnvironmentSpec
+from habitat_baselines.common.episode_stats import EpisodeStatsAccumulator
 from habitat_baselines.common.obs_transformers import (
     apply_obs_transforms_batch,
     apply_obs_transforms_obs_space,
@@ -282,14 +284,19 @@ class PPOTrainer(BaseRLTrainer):
         self._agent.rollouts.insert_first_observations(batch)
 
         self.current_episode_reward = torch.zeros(self.envs.num_envs, 1)
-        self.running_episode_stats = dict(
-            count=torch.zeros(self.envs.num_envs, 1),
-            reward=torch.zeros(self.envs.num_envs, 1),
+        self.running_episode_stats = EpisodeStatsAccumulator(
+            self.envs.num_envs,
+            device=self.current_episode_reward.device,
+            ignore_keys=self._rank0_keys,
         )
         self.window_episode_stats = defaultdict(
             lambda: deque(maxlen=self._ppo_cfg.reward_window_size)
         )
 
+        # The profiler is reset at every log so the percentiles cover the log
+        # interval, its scopes are accumulated here for the exported trace.
+        self._profiler_history = Profiler(trace_path=get_profiler().trace_path)
+
         self.t_start = time.time()
 
     @rank0_only
@@ -373,20 +380,20 @@ class PPOTrainer(BaseRLTrainer):
         profiling_wrapper.range_pop()  # compute actions
 
         with g_timer.avg_time("trainer.obs_insert"):
-            for index_env, act in zip(
-                range(env_slice.start, env_slice.stop),
-                action_data.env_actions.cpu().unbind(0),
-            ):
-                if is_continuous_action_space(self._env_spec.action_space):
-                    # Clipping actions to the specified limits
-                    act = np.clip(
-                        act.numpy(),
-                        self._env_spec.action_space.low,
-                        self._env_spec.action_space.high,
-                    )
-                else:
-                    act = act.item()
-                self.envs.async_step_at(index_env, act)
+            env_actions = action_data.env_actions.cpu().numpy()
+            if is_continuous_action_space(self._env_spec.action_space):
+                # Clipping actions to the specified limits
+                self.envs.async_step_batch(
+                    env_actions,
+                    env_slice.start,
+                    low=self._env_spec.action_space.low,
+                    high=self._env_spec.action_space.high,
+                )
+            else:
+                # One scalar action per environment
+                self.envs.async_step_batch(
+                    env_actions.reshape(len(env_actions)), env_slice.start
+                )
 
         with g_timer.avg_time("trainer.obs_insert"):
             self._agent.rollouts.insert(
@@ -436,9 +443,12 @@ class PPOTrainer(BaseRLTrainer):
             done_masks = torch.logical_not(not_done_masks)
 
             self.current_episode_reward[env_slice] += rewards
-            current_ep_reward = self.current_episode_reward[env_slice]
-            self.running_episode_stats["reward"][env_slice] += current_ep_reward.where(done_masks, current_ep_reward.new_zeros(()))  # type: ignore
-            self.running_episode_stats["count"][env_slice] += done_masks.float()  # type: ignore
+            self.running_episode_stats.add(
+                env_slice,
+                infos,
+                done_masks,
+                self.current_episode_reward[env_slice],
+            )
 
             self._single_proc_infos = extract_scalars_from_infos(
                 infos,
@@ -446,20 +456,6 @@ class PPOTrainer(BaseRLTrainer):
                     k for k in infos[0].keys() if k not in self._rank0_keys
                 ),
             )
-            extracted_infos = extract_scalars_from_infos(
-                infos, ignore_keys=self._rank0_keys
-            )
-            for k, v_k in extracted_infos.items():
-                v = torch.tensor(
-                    v_k,
-                    dtype=torch.float,
-                    device=self.current_episode_reward.device,
-                ).unsqueeze(1)
-                if k not in self.running_episode_stats:
-                    self.running_episode_stats[k] = torch.zeros_like(
-                        self.running_episode_stats["count"]
-                    )
-                self.running_episode_stats[k][env_slice] += v.where(done_masks, v.new_zeros(()))  # type: ignore
 
             self.current_episode_reward[env_slice].masked_fill_(
                 done_masks, 0.0
@@ -525,7 +521,7 @@ class PPOTrainer(BaseRLTrainer):
     def _coalesce_post_step(
         self, losses: Dict[str, float], count_steps_delta: int
     ) -> Dict[str, float]:
-        stats_ordering = sorted(self.running_episode_stats.keys())
+        stats_ordering = sorted(self.running_episode_stats.keys)
         stats = torch.stack(
             [self.running_episode_stats[k] for k in stats_ordering], 0
         )
@@ -605,6 +601,21 @@ class PPOTrainer(BaseRLTrainer):
                 self.num_steps_done,
             )
 
+        profiler_stats = {}
+        if get_profiler().enabled:
+            interval_profiler = Profiler()
+            interval_profiler.merge_state(
+                {"stats": self._take_profiler_state()["stats"], "events": []}
+            )
+            profiler_stats = interval_profiler.get_stats()
+        for scope_name, scope_stats in profiler_stats.items():
+            for k in ("p50", "p95", "p99"):
+                writer.add_scalar(
+                    f"profiler/{scope_name}/{k}",
+                    scope_stats[k],
+                    self.num_steps_done,
+                )
+
         # log stats
         if (
             self.num_updates_done % self.config.habitat_baselines.log_interval
@@ -635,10 +646,30 @@ class PPOTrainer(BaseRLTrainer):
                 [f"{k}: {v.mean:.3f}" for k, v in g_timer.items()]
             )
             logger.info(f"\tPerf Stats: {perf_stats_str}")
+            for scope_name, scope_stats in profiler_stats.items():
+                logger.info(
+                    f"\t{scope_name}: count: {scope_stats['count']} "
+                    + " ".join(
+                        f"{k}: {scope_stats[k] * 1000:.3f}ms"
+                        for k in ("mean", "p50", "p95", "p99")
+                    )
+                )
             if self.config.habitat_baselines.should_log_single_proc_infos:
                 for k, v in self._single_proc_infos.items():
                     logger.info(f" - {k}: {np.mean(v):.3f}")
 
+    def _take_profiler_state(self) -> Dict[str, Any]:
+        r"""Takes the profiler scopes of the trainer and of the environment
+        workers recorded since the previous call, and accumulates them in
+        `self._profiler_history`.
+        """
+        profiler = get_profiler()
+        for state in self.envs.get_profiler_states():
+            profiler.merge_state(state)
+        state = profiler.get_state(reset=True)
+        self._profiler_history.merge_state(state)
+        return state
+
     def should_end_early(self, rollout_step) -> bool:
         if not self._is_distributed:
             return False
@@ -683,7 +714,9 @@ class PPOTrainer(BaseRLTrainer):
             count_checkpoints = requeue_stats["count_checkpoints"]
             prev_time = requeue_stats["prev_time"]
 
-            self.running_episode_stats = requeue_stats["running_episode_stats"]
+            self.running_episode_stats.load_state_dict(
+                requeue_stats["running_episode_stats"]
+            )
             self.window_episode_stats.update(
                 requeue_stats["window_episode_stats"]
             )
@@ -712,7 +745,7 @@ class PPOTrainer(BaseRLTrainer):
                         num_updates_done=self.num_updates_done,
                         _last_checkpoint_percent=self._last_checkpoint_percent,
                         prev_time=(time.time() - self.t_start) + prev_time,
-                        running_episode_stats=self.running_episode_stats,
+                        running_episode_stats=self.running_episode_stats.state_dict(),
                         window_episode_stats=dict(self.window_episode_stats),
                         run_id=writer.get_run_id(),
                     )
@@ -799,6 +832,17 @@ class PPOTrainer(BaseRLTrainer):
 
                 profiling_wrapper.range_pop()  # train update
 
+            if self._profiler_history.trace_path is not None:
+                self._take_profiler_state()
+                if self._is_distributed:
+                    # Each rank exports its own trace.
+                    rank = torch.distributed.get_rank()
+                    self._profiler_history.export_chrome_trace(
+                        f"{self._profiler_history.trace_path}.rank{rank}"
+                    )
+                else:
+                    self._profiler_history.export_chrome_trace()
+
             self.envs.close()
 
     def _eval_checkpoint(
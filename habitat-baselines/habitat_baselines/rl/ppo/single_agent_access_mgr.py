@@ -136,6 +136,9 @@ class SingleAgentAccessMgr(AgentAccessMgr):
             action_space=policy_action_space,
             actor_critic=actor_critic,
             is_double_buffered=ppo_cfg.use_double_buffered_sampler,
+            returns_implementation=ppo_cfg.returns_implementation,
+            returns_chunk_size=ppo_cfg.returns_chunk_size,
+            prefetch_mini_batches=ppo_cfg.prefetch_mini_batches,
         )
         rollouts.to(device)
         return rollouts
@@ -16,6 +16,7 @@ from typing import (
     List,
     Optional,
     Sequence,
+    Tuple,
     TypeVar,
 )
 
@@ -72,6 +73,13 @@ def infinite_shuffling_iterator(
 
 @attr.s(slots=True, init=False, auto_attribs=True)
 class DefaultActionPlugin:
+    r"""Transforms the actions of the policy into actions for the environments.
+
+    :py:ref:`transform_batch` is applied once to each batch of actions by the
+    inference worker, before the actions are written to the transfer
+    buffers. :py:ref:`__call__` is then applied by each environment worker to
+    its slice of the transformed batch.
+    """
     policy_action_space: Any
     is_continuous: bool
 
@@ -79,13 +87,21 @@ class DefaultActionPlugin:
         self.policy_action_space = policy_action_space
         self.is_continuous = is_continuous_action_space(policy_action_space)
 
-    def __call__(self, action: np.ndarray) -> np.ndarray:
+    def transform_batch(self, actions: np.ndarray) -> np.ndarray:
         if self.is_continuous:
             return np.clip(
-                action,
+                actions,
                 self.policy_action_space.low,
                 self.policy_action_space.high,
             )
+        else:
+            return actions
+
+    def __call__(self, action: np.ndarray) -> np.ndarray:
+        if self.is_continuous:
+            # The action is a view of the transfer buffer, which is
+            # overwritten by the next inference step.
+            return action.copy()
         else:
             return action.item()
 
@@ -106,6 +122,16 @@ class EnvironmentWorkerProcess(ProcessBase):
     _torch_transfer_buffers: TensorDict = attr.ib(init=False)
     send_transfer_buffers: NDArrayDict = attr.ib(init=False)
     actions: np.ndarray = attr.ib(init=False)
+    # Views of the slot of this environment in the transfer buffers. The
+    # observations are flattened to (key path, timing key, view).
+    _obs_slots: List[Tuple[Tuple[str, ...], str, np.ndarray]] = attr.ib(
+        init=False
+    )
+    _obs_top_keys: List[str] = attr.ib(init=False)
+    _reward_slot: np.ndarray = attr.ib(init=False)
+    _mask_slot: np.ndarray = attr.ib(init=False)
+    _episode_id_slot: np.ndarray = attr.ib(init=False)
+    _step_id_slot: np.ndarray = attr.ib(init=False)
 
     def __attrs_post_init__(self):
         self.build_dispatch_table(EnvironmentWorkerTasks)
@@ -141,16 +167,32 @@ class EnvironmentWorkerProcess(ProcessBase):
     def start_experience_collection(self):
         assert self.env is not None
 
-        full_env_result = dict(
-            observations=self._last_obs,
-            episode_ids=self._episode_id,
-            step_ids=self._step_id,
-        )
-        self.send_transfer_buffers.slice_keys(full_env_result.keys())[
-            self.env_idx
-        ] = full_env_result  # type:ignore[assignment]
+        self._write_observations(self._last_obs)
+        self._episode_id_slot[...] = self._episode_id
+        self._step_id_slot[...] = self._step_id
         self.queues.inference.put(self.env_idx)
 
+    def _write_observations(self, obs) -> None:
+        """
+        Copies the observations into the slot of this environment in the
+        shared transfer buffers, with one contiguous copy per key.
+        """
+        if len(obs) != len(self._obs_top_keys) or any(
+            k not in obs for k in self._obs_top_keys
+        ):
+            raise KeyError(
+                "Keys don't match: Dest={} Source={}".format(
+                    self._obs_top_keys, obs.keys()
+                )
+            )
+
+        for key_path, timing_key, dst in self._obs_slots:
+            src = obs
+            for k in key_path:
+                src = src[k]
+            with self.timer.avg_time(timing_key):
+                np.copyto(dst, NDArrayDict._to_instance(src), casting="unsafe")
+
     def _step_env(self, action):
         with self.timer.avg_time("step env"):
             obs, reward, done, info = self.env.step(action)
@@ -175,15 +217,11 @@ class EnvironmentWorkerProcess(ProcessBase):
         self._last_obs, reward, done, info = self._step_env(action)
 
         with self.timer.avg_time("enqueue env"):
-            self.send_transfer_buffers[
-                self.env_idx
-            ] = dict(  # type:ignore[assignment]
-                observations=self._last_obs,
-                rewards=reward,
-                masks=not done,
-                episode_ids=self._episode_id,
-                step_ids=self._step_id,
-            )
+            self._write_observations(self._last_obs)
+            self._reward_slot[...] = reward
+            self._mask_slot[...] = not done
+            self._episode_id_slot[...] = self._episode_id
+            self._step_id_slot[...] = self._step_id
 
         self.queues.inference.put(self.env_idx)
 
@@ -229,6 +267,28 @@ class EnvironmentWorkerProcess(ProcessBase):
             "step_ids",
         ).numpy()
 
+        obs_buffers = self.send_transfer_buffers["observations"]
+        assert isinstance(obs_buffers, NDArrayDict)
+        self._obs_top_keys = list(obs_buffers.keys())
+        key_paths, leaves = obs_buffers.flatten()
+        self._obs_slots = [
+            (
+                key_path,
+                "copy obs " + ".".join(key_path),
+                leaf[self.env_idx],
+            )
+            for key_path, leaf in zip(key_paths, leaves)
+        ]
+        (
+            self._reward_slot,
+            self._mask_slot,
+            self._episode_id_slot,
+            self._step_id_slot,
+        ) = (
+            self.send_transfer_buffers[k][self.env_idx : self.env_idx + 1]  # type: ignore[index]
+            for k in ("rewards", "masks", "episode_ids", "step_ids")
+        )
+
     def set_action_plugin(self, action_plugin):
         self.action_plugin = action_plugin
 
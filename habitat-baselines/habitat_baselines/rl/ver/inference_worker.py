@@ -9,7 +9,7 @@ import queue
 import time
 from multiprocessing import SimpleQueue
 from multiprocessing.context import BaseContext
-from typing import TYPE_CHECKING, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, List, Optional, Tuple
 
 import attr
 import numpy as np
@@ -65,6 +65,7 @@ class InferenceWorkerProcess(ProcessBase):
     rollout_ends: RolloutEarlyEnds
     actor_critic_tensors: List[torch.Tensor] = attr.ib(None, init=False)
     rollouts: VERRolloutStorage = attr.ib(None, init=False)
+    action_plugin: Any = attr.ib(None, init=False)
     replay_reqs: List = attr.ib(factory=list, init=False)
     new_reqs: List = attr.ib(factory=list, init=False)
     _avg_step_time: WindowedRunningMean = attr.ib(
@@ -149,6 +150,9 @@ class InferenceWorkerProcess(ProcessBase):
             self.rollouts.cpu_current_policy_version
         )
 
+    def set_action_plugin(self, action_plugin):
+        self.action_plugin = action_plugin
+
     def _update_actor_critic(self):
         for src, dst in zip(
             self.actor_critic_tensors, self.actor_critic.all_policy_tensors()
@@ -347,7 +351,7 @@ class InferenceWorkerProcess(ProcessBase):
             cpu_actions = action_data.env_actions.to(device="cpu")
             self.transfer_buffers["actions"][
                 self.new_reqs
-            ] = cpu_actions.numpy()
+            ] = self.action_plugin.transform_batch(cpu_actions.numpy())
 
             self._sync_device()
 
@@ -512,6 +516,8 @@ class InferenceWorkerProcess(ProcessBase):
                 self.set_actor_critic_tensors(data)
             elif task == InferenceWorkerTasks.set_rollouts:
                 self.set_rollouts(data)
+            elif task == InferenceWorkerTasks.set_action_plugin:
+                self.set_action_plugin(data)
             elif task == InferenceWorkerTasks.start:
                 break
             else:
@@ -572,5 +578,10 @@ class InferenceWorker(WorkerBase):
     def set_rollouts(self, rollouts):
         self.setup_queue.put((InferenceWorkerTasks.set_rollouts, rollouts))
 
+    def set_action_plugin(self, action_plugin):
+        self.setup_queue.put(
+            (InferenceWorkerTasks.set_action_plugin, action_plugin)
+        )
+
     def start(self):
         self.setup_queue.put((InferenceWorkerTasks.start, None))
@@ -41,4 +41,5 @@ class PreemptionDeciderTasks(enum.Enum):
 class InferenceWorkerTasks(enum.Enum):
     set_rollouts = enum.auto()
     set_actor_critic_tensors = enum.auto()
+    set_action_plugin = enum.auto()
     start = enum.auto()
@@ -199,10 +199,13 @@ class VERTrainer(PPOTrainer):
 
         action_space = init_reports[0]["act_space"]
 
+        # The action plugin transforms each batch of actions in the inference
+        # workers, and each environment worker applies its slice.
+        action_plugin = build_action_plugin_from_policy_action_space(
+            action_space
+        )
         [
-            ew.set_action_plugin(
-                build_action_plugin_from_policy_action_space(action_space)
-            )
+            ew.set_action_plugin(action_plugin)
             for ew in self.environment_workers
         ]
 
@@ -335,6 +338,7 @@ class VERTrainer(PPOTrainer):
                 self._transfer_policy_tensors
             )
             self._inference_worker_impl.set_rollouts(self._agent.rollouts)
+            self._inference_worker_impl.set_action_plugin(action_plugin)
         else:
             self._inference_worker_impl = None
 
@@ -346,6 +350,7 @@ class VERTrainer(PPOTrainer):
             # destruction which causes an error.
             iw.set_actor_critic_tensors(self._transfer_policy_tensors)
             iw.set_rollouts(self._agent.rollouts)
+            iw.set_action_plugin(action_plugin)
             iw.start()
 
         ews_to_wait = []
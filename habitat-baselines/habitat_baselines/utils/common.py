@@ -188,43 +188,103 @@ def linear_decay(epoch: int, total_num_updates: int) -> float:
     return 1 - (epoch / float(total_num_updates))
 
 
+# Kinds of observation leaves in a _BatchPlan
+_LEAF_NDARRAY = 0
+_LEAF_CPU_TENSOR = 1
+_LEAF_TENSOR = 2
+
+
+def _observation_leaf_signature(v: Any) -> Tuple[Any, ...]:
+    if isinstance(v, np.ndarray):
+        return (_LEAF_NDARRAY, v.shape, v.dtype)
+    elif isinstance(v, torch.Tensor):
+        if v.device.type == "cpu":
+            return (_LEAF_CPU_TENSOR, tuple(v.size()), v.dtype)
+        return (_LEAF_TENSOR, tuple(v.size()), v.dtype, v.device)
+    else:
+        # Scalars and other CPU side data are batched as numpy arrays
+        return (type(v),)
+
+
+def _flatten_observation(
+    observation: DictTree,
+) -> Tuple[Tuple[Tuple[str, ...], ...], List[Any]]:
+    r"""Key paths and leaves of an observation, in the order of
+    :ref:`TensorOrNDArrayDict.flatten`.
+    """
+    paths: List[Tuple[str, ...]] = []
+    leaves: List[Any] = []
+    for k, v in observation.items():
+        if isinstance(v, dict):
+            sub_paths, sub_leaves = _flatten_observation(v)
+            paths.extend((k, *sub_path) for sub_path in sub_paths)
+            leaves.extend(sub_leaves)
+        else:
+            paths.append((k,))
+            leaves.append(v)
+    return tuple(paths), leaves
+
+
+@attr.s(auto_attribs=True, slots=True)
+class _BatchPlan:
+    r"""How to batch observations with a given structure, compiled once by
+    :ref:`_ObservationBatchingCache` for each observation structure.
+
+    :property paths: key of each observation leaf, in flattened order.
+    :property signatures: kind, shape and dtype of each leaf, used to check
+        that observations still match the plan.
+    :property pool_keys: key of the pooled buffer of each leaf.
+    :property buffer_specs: shape, dtype and device of the pooled buffer of
+        each leaf.
+    :property upload_ordering: leaves ordered by size, largest first.
+    """
+    paths: List[Tuple[str, ...]]
+    signatures: List[Tuple[Any, ...]]
+    pool_keys: List[Tuple[Any, ...]]
+    buffer_specs: List[Tuple[Size, torch.dtype, torch.device]]
+    upload_ordering: List[int]
+
+    def matches(self, leaves: List[Any]) -> bool:
+        return all(
+            _observation_leaf_signature(v) == signature
+            for v, signature in zip(leaves, self.signatures)
+        )
+
+
 @attr.s(auto_attribs=True, slots=True)
 class _ObservationBatchingCache(metaclass=Singleton):
     r"""Helper for batching observations that maintains a cpu-side tensor
     that is the right size and is pinned to cuda memory
+
+    The structure of the observations is compiled once into a
+    :ref:`_BatchPlan`, so batching only copies the observations into the
+    pooled buffers. The buffers grow geometrically, to at most twice the
+    largest number of observations batched together, so pausing and resuming
+    environments doesn't reallocate them.
     """
     _pool: Dict[Any, Union[torch.Tensor, np.ndarray]] = {}
+    _plans: Dict[Any, _BatchPlan] = {}
 
-    def get(
+    def _get_by_key(
         self,
+        key: Tuple[Any, ...],
         num_obs: int,
-        sensor_name: Any,
-        sensor: torch.Tensor,
-        device: Optional[torch.device] = None,
+        buffer_spec: Tuple[Size, torch.dtype, torch.device],
+        device: Optional[torch.device],
     ) -> Union[torch.Tensor, np.ndarray]:
-        r"""Returns a tensor of the right size to batch num_obs observations together
-
-        If sensor is a cpu-side tensor and device is a cuda device the batched tensor will
-        be pinned to cuda memory.  If sensor is a cuda tensor, the batched tensor will also be
-        a cuda tensor
-        """
-        key = (
-            sensor_name,
-            tuple(sensor.size()),
-            sensor.type(),
-            sensor.device.type,
-            sensor.device.index,
-        )
+        capacity = num_obs
         if key in self._pool:
             cache = self._pool[key]
             if cache.shape[0] >= num_obs:
                 return cache[0:num_obs]
             else:
+                capacity = max(num_obs, 2 * cache.shape[0])
                 cache = None
                 del self._pool[key]
 
+        shape, dtype, sensor_device = buffer_spec
         cache = torch.empty(
-            num_obs, *sensor.size(), dtype=sensor.dtype, device=sensor.device
+            capacity, *shape, dtype=dtype, device=sensor_device
         )
         if (
             device is not None
@@ -239,59 +299,121 @@ class _ObservationBatchingCache(metaclass=Singleton):
             cache = cache.numpy()
 
         self._pool[key] = cache
-        return cache
+        return cache[0:num_obs]
 
-    def batch_obs(
+    @staticmethod
+    def _pool_key(sensor_name: Any, sensor: torch.Tensor) -> Tuple[Any, ...]:
+        return (
+            sensor_name,
+            tuple(sensor.size()),
+            sensor.type(),
+            sensor.device.type,
+            sensor.device.index,
+        )
+
+    def get(
         self,
-        observations: List[DictTree],
+        num_obs: int,
+        sensor_name: Any,
+        sensor: torch.Tensor,
         device: Optional[torch.device] = None,
-    ) -> TensorDict:
-        observations = [
-            TensorOrNDArrayDict.from_tree(o).map(
-                lambda t: t.numpy()
-                if isinstance(t, torch.Tensor) and t.device.type == "cpu"
-                else t
+    ) -> Union[torch.Tensor, np.ndarray]:
+        r"""Returns a tensor of the right size to batch num_obs observations together
+
+        If sensor is a cpu-side tensor and device is a cuda device the batched tensor will
+        be pinned to cuda memory.  If sensor is a cuda tensor, the batched tensor will also be
+        a cuda tensor
+        """
+        return self._get_by_key(
+            self._pool_key(sensor_name, sensor),
+            num_obs,
+            (sensor.size(), sensor.dtype, sensor.device),
+            device,
+        )
+
+    def _compile_plan(self, observation: DictTree) -> _BatchPlan:
+        paths, leaves = TensorOrNDArrayDict.from_tree(observation).flatten()
+        # Keep the leaves as they are in the observations for the
+        # signatures, TensorOrNDArrayDict converts scalars to arrays
+        _, raw_leaves = _flatten_observation(observation)
+        sensors = [
+            torch.as_tensor(
+                v.numpy()
+                if isinstance(v, torch.Tensor) and v.device.type == "cpu"
+                else v
             )
-            for o in observations
+            for v in leaves
         ]
-        observation_keys, _ = observations[0].flatten()
-        observation_tensors = [o.flatten()[1] for o in observations]
-
-        # Order sensors by size, stack and move the largest first
-        upload_ordering = sorted(
-            range(len(observation_keys)),
-            key=lambda idx: 1
-            if isinstance(observation_tensors[0][idx], numbers.Number)
-            else int(np.prod(observation_tensors[0][idx].shape)),  # type: ignore
-            reverse=True,
+        return _BatchPlan(
+            paths=paths,
+            signatures=[_observation_leaf_signature(v) for v in raw_leaves],
+            pool_keys=[
+                self._pool_key(path, sensor)
+                for path, sensor in zip(paths, sensors)
+            ],
+            buffer_specs=[
+                (sensor.size(), sensor.dtype, sensor.device)
+                for sensor in sensors
+            ],
+            # Order sensors by size, stack and move the largest first
+            upload_ordering=sorted(
+                range(len(paths)),
+                key=lambda idx: sensors[idx].numel(),
+                reverse=True,
+            ),
         )
 
-        batched_tensors = []
-        for sensor_name, obs in zip(observation_keys, observation_tensors[0]):
-            batched_tensors.append(
-                self.get(
-                    len(observations),
-                    sensor_name,
-                    torch.as_tensor(obs),
-                    device,
-                )
+    def _get_plan(
+        self, observations: List[DictTree]
+    ) -> Tuple[_BatchPlan, List[List[Any]]]:
+        flattened = [_flatten_observation(o) for o in observations]
+        plan_key = flattened[0][0]
+        if any(paths != plan_key for paths, _ in flattened[1:]):
+            raise ValueError(
+                "All the batched observations must have the same keys"
             )
+        observation_leaves = [leaves for _, leaves in flattened]
 
-        for idx in upload_ordering:
-            for i, all_obs in enumerate(observation_tensors):
+        plan = self._plans.get(plan_key, None)
+        if plan is None or not all(
+            plan.matches(leaves) for leaves in observation_leaves
+        ):
+            plan = self._compile_plan(observations[0])
+            self._plans[plan_key] = plan
+        return plan, observation_leaves
+
+    def batch_obs(
+        self,
+        observations: List[DictTree],
+        device: Optional[torch.device] = None,
+    ) -> TensorDict:
+        plan, observation_leaves = self._get_plan(observations)
+
+        batched_tensors: List[Any] = [None for _ in plan.paths]
+        for idx in plan.upload_ordering:
+            batched = self._get_by_key(
+                plan.pool_keys[idx],
+                len(observations),
+                plan.buffer_specs[idx],
+                device,
+            )
+            for i, all_obs in enumerate(observation_leaves):
                 obs = all_obs[idx]
                 # Use isinstance(sensor, np.ndarray) here instead of
                 # np.asarray as this is quickier for the more common
                 # path of sensor being an np.ndarray
                 # np.asarray is ~3x slower than checking
                 if isinstance(obs, np.ndarray):
-                    batched_tensors[idx][i] = obs  # type: ignore
+                    batched[i] = obs  # type: ignore
                 elif isinstance(obs, torch.Tensor):
-                    batched_tensors[idx][i].copy_(obs, non_blocking=True)  # type: ignore
+                    if isinstance(batched, np.ndarray):
+                        batched[i] = obs.numpy()
+                    else:
+                        batched[i].copy_(obs, non_blocking=True)
                 # If the sensor wasn't a tensor, then it's some CPU side data
                 # so use a numpy array
                 else:
-                    batched_tensors[idx][i] = np.asarray(obs)  # type: ignore
+                    batched[i] = np.asarray(obs)  # type: ignore
 
             # With the batching cache, we use pinned mem
             # so we can start the move to the GPU async
@@ -300,14 +422,14 @@ class _ObservationBatchingCache(metaclass=Singleton):
             # convert back to torch tensor
             # We know that batch_t[sensor_name] is either an np.ndarray
             # or a torch.Tensor, so this is faster than torch.as_tensor
-            if isinstance(batched_tensors[idx], np.ndarray):
-                batched_tensors[idx] = torch.from_numpy(batched_tensors[idx])
+            if isinstance(batched, np.ndarray):
+                batched = torch.from_numpy(batched)
 
-            batched_tensors[idx] = batched_tensors[idx].to(  # type: ignore
+            batched_tensors[idx] = batched.to(  # type: ignore
                 device, non_blocking=True
             )
 
-        return TensorDict.from_flattened(observation_keys, batched_tensors)
+        return TensorDict.from_flattened(plan.paths, batched_tensors)
 
 
 @inference_mode()
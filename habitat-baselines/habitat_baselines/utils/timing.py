@@ -5,22 +5,40 @@
 # LICENSE file in the root directory of this source tree.
 
 import os
+import threading
 import time
 from contextlib import nullcontext
 from functools import wraps
 
+from habitat.utils.profiler import get_profiler
 from habitat_baselines.common.windowed_running_mean import WindowedRunningMean
 
 EPS = 1e-5
 
 
 class TimingContext:
+    """
+    Times a block of code into `timer[key]`. The same context can be entered
+    again before it exits, e.g. when it decorates a recursive function or a
+    function called from several threads. The block is also timed as a scope
+    of the profiler, see `habitat.utils.profiler`.
+    """
+
     def __init__(self, timer, key, additive=False, average=None):
         self._timer = timer
         self._key = key
         self._additive = additive
         self._average = average
-        self._time_enter = None
+        # Enter times and profiler scopes of the blocks being timed, per
+        # thread.
+        self._local = threading.local()
+
+    def _get_stack(self):
+        try:
+            return self._local.stack
+        except AttributeError:
+            self._local.stack = []
+            return self._local.stack
 
     def __call__(self, f):
         @wraps(f)
@@ -37,12 +55,16 @@ class TimingContext:
             else:
                 self._timer[self._key] = 0
 
-        self._time_enter = time.perf_counter()
+        scope = get_profiler().scope(self._key)
+        scope.__enter__()
+        self._get_stack().append((time.perf_counter(), scope))
 
     def __exit__(self, type_, value, traceback):
+        time_enter, scope = self._get_stack().pop()
         time_passed = max(
-            time.perf_counter() - self._time_enter, EPS
+            time.perf_counter() - time_enter, EPS
         )  # EPS to prevent div by zero
+        scope.__exit__(type_, value, traceback)
 
         if self._additive or self._average is not None:
             self._timer[self._key] += time_passed
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Meta Platforms, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import json
+import struct
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from habitat_hitl.core.types import Keyframe, KeyframeAndMessages
+
+# Keyframe fields that can be omitted for a client when they are identical to
+# the last ones sent to that client, and the key identifying each item.
+_DELTA_FIELDS: Dict[str, Tuple[str, str]] = {
+    "stateUpdates": ("instanceKey", "state"),
+    "rigUpdates": ("id", "pose"),
+}
+
+WIRE_FORMAT_JSON = "json"
+WIRE_FORMAT_MSGPACK = "msgpack"
+
+Payload = Union[str, bytes]
+
+
+class _ClientDeltaState:
+    """
+    The state and rig updates last sent to a client. Updates are pending
+    until the send is acknowledged.
+    """
+
+    def __init__(self) -> None:
+        self.sent: Dict[str, Dict[Any, Any]] = {
+            field: {} for field in _DELTA_FIELDS
+        }
+        self.pending: Dict[str, Dict[Any, Any]] = {
+            field: {} for field in _DELTA_FIELDS
+        }
+        self.pending_deletions: List[Any] = []
+
+    def get_last(self, field: str, key: Any) -> Any:
+        pending = self.pending[field]
+        if key in pending:
+            return pending[key]
+        return self.sent[field].get(key)
+
+    def acknowledge(self) -> None:
+        for key in self.pending_deletions:
+            for field in _DELTA_FIELDS:
+                self.sent[field].pop(key, None)
+        for field in _DELTA_FIELDS:
+            self.sent[field].update(self.pending[field])
+            self.pending[field].clear()
+        self.pending_deletions.clear()
+
+
+def _msgpack_container_header(
+    count: int, fix_tag: int, tag16: int, tag32: int
+) -> bytes:
+    if count < 16:
+        return bytes([fix_tag | count])
+    elif count < 2**16:
+        return struct.pack(">BH", tag16, count)
+    return struct.pack(">BI", tag32, count)
+
+
+def _msgpack_map_header(count: int) -> bytes:
+    return _msgpack_container_header(count, 0x80, 0xDE, 0xDF)
+
+
+def _msgpack_array_header(count: int) -> bytes:
+    return _msgpack_container_header(count, 0x90, 0xDC, 0xDD)
+
+
+class KeyframeEncoder:
+    """
+    Serializes the keyframes sent to each user.
+
+    The keyframe is the same for all users, only the "message" field is user
+    specific. The keyframe fields are therefore serialized once per batch of
+    sends and spliced with the serialized message of each user, producing the
+    same payload as serializing each user keyframe.
+
+    Two wire formats are supported:
+    * "json": text messages, as `json.dumps({"keyframes": keyframes})`.
+    * "msgpack": binary messages with the same structure, encoded with
+      msgpack. Floats, including all transforms and poses, are quantized to
+      32 bits. This requires the `msgpack` package.
+
+    With delta encoding, state and rig updates identical to the last ones sent
+    to a user are omitted from the keyframes of this user. A send is
+    considered acknowledged once the websocket send completes, see
+    `acknowledge`.
+    """
+
+    def __init__(self, wire_format: str, delta_encoding: bool) -> None:
+        self._dumps: Callable[[Any], Payload]
+        if wire_format == WIRE_FORMAT_JSON:
+            self._dumps = json.dumps
+        elif wire_format == WIRE_FORMAT_MSGPACK:
+            try:
+                import msgpack
+            except ImportError as e:
+                raise ImportError(
+                    "The msgpack keyframe wire format requires the msgpack package."
+                ) from e
+            self._dumps = msgpack.Packer(
+                use_single_float=True, autoreset=True
+            ).pack
+        else:
+            raise ValueError(f"Unknown keyframe wire format '{wire_format}'.")
+        self._wire_format = wire_format
+        self._delta_encoding = delta_encoding
+        self._clients: Dict[int, _ClientDeltaState] = {}
+        # Serialized keyframe fields of the current batch, keyed by keyframe
+        # and by the delta updates included.
+        self._shared_cache: Dict[Tuple[int, Any], Tuple[Payload, int]] = {}
+        self._batch_keyframes: List[Keyframe] = []
+
+    @property
+    def wire_format(self) -> str:
+        return self._wire_format
+
+    def reset_client(self, user_index: int) -> None:
+        """
+        Forgets what was sent to a user, e.g. when a new client takes the
+        user slot.
+        """
+        self._clients.pop(user_index, None)
+
+    def acknowledge(self, user_index: int) -> None:
+        """
+        Marks the last payload encoded for a user as received.
+        """
+        if user_index in self._clients:
+            self._clients[user_index].acknowledge()
+
+    def begin_batch(self) -> None:
+        """
+        Clears the serialized keyframes shared by the users. Must be called
+        before encoding a new set of keyframes.
+        """
+        self._shared_cache.clear()
+        self._batch_keyframes.clear()
+
+    def _get_delta_selection(
+        self, keyframe: Keyframe, client: _ClientDeltaState
+    ) -> Tuple[Tuple[int, ...], ...]:
+        """
+        Indices of the delta field items to send to a client, and records them
+        as pending.
+        """
+        selection = []
+        for field, (key_name, value_name) in _DELTA_FIELDS.items():
+            included: List[int] = []
+            pending = client.pending[field]
+            for i, item in enumerate(keyframe.get(field, ())):
+                key = item[key_name]
+                value = item[value_name]
+                if client.get_last(field, key) != value:
+                    included.append(i)
+                    pending[key] = value
+            selection.append(tuple(included))
+        deletions = keyframe.get("deletions", ())
+        if len(deletions) > 0:
+            client.pending_deletions.extend(deletions)
+            for key in deletions:
+                for field in _DELTA_FIELDS:
+                    client.pending[field].pop(key, None)
+        return tuple(selection)
+
+    def _get_shared(
+        self,
+        keyframe_id: int,
+        keyframe: Keyframe,
+        selection: Optional[Tuple[Tuple[int, ...], ...]],
+    ) -> Tuple[Payload, int]:
+        """
+        The serialized keyframe fields and their count.
+        """
+        cache_key = (keyframe_id, selection)
+        if cache_key in self._shared_cache:
+            return self._shared_cache[cache_key]
+
+        assert "message" not in keyframe
+        fields = keyframe
+        if selection is not None:
+            fields = dict(keyframe)
+            for field, included in zip(_DELTA_FIELDS, selection):
+                if field in keyframe and len(included) != len(keyframe[field]):
+                    items = keyframe[field]
+                    fields[field] = [items[i] for i in included]
+
+        shared: Payload
+        if self._wire_format == WIRE_FORMAT_JSON:
+            shared = self._dumps(fields)
+        else:
+            shared = b"".join(
+                self._dumps(k) + self._dumps(v) for k, v in fields.items()
+            )
+        self._shared_cache[cache_key] = (shared, len(fields))
+        return self._shared_cache[cache_key]
+
+    def _encode_user_keyframe(
+        self, shared: Payload, num_fields: int, message: Any
+    ) -> Payload:
+        if self._wire_format == WIRE_FORMAT_JSON:
+            assert isinstance(shared, str)
+            separator = ", " if num_fields > 0 else ""
+            return (
+                shared[:-1]
+                + separator
+                + '"message": '
+                + self._dumps(message)
+                + "}"
+            )
+        assert isinstance(shared, bytes)
+        return (
+            _msgpack_map_header(num_fields + 1)
+            + shared
+            + self._dumps("message")
+            + self._dumps(message)
+        )
+
+    def encode(
+        self,
+        user_index: int,
+        keyframes_and_messages: List[KeyframeAndMessages],
+    ) -> Payload:
+        """
+        Serializes `{"keyframes": [...]}` where each keyframe of
+        `keyframes_and_messages` is combined with the message of the user.
+        The keyframes must not change until the next `begin_batch`.
+        """
+        client: Optional[_ClientDeltaState] = None
+        if self._delta_encoding:
+            if user_index not in self._clients:
+                self._clients[user_index] = _ClientDeltaState()
+            client = self._clients[user_index]
+
+        user_keyframes: List[Payload] = []
+        for keyframe_and_messages in keyframes_and_messages:
+            keyframe = keyframe_and_messages.keyframe
+            # Identify the keyframe by position in the batch, since ids of
+            # objects can be reused once they are released.
+            for keyframe_id, batch_keyframe in enumerate(
+                self._batch_keyframes
+            ):
+                if batch_keyframe is keyframe:
+                    break
+            else:
+                keyframe_id = len(self._batch_keyframes)
+                self._batch_keyframes.append(keyframe)
+
+            selection = None
+            if client is not None:
+                selection = self._get_delta_selection(keyframe, client)
+            shared, num_fields = self._get_shared(
+                keyframe_id, keyframe, selection
+            )
+            user_keyframes.append(
+                self._encode_user_keyframe(
+                    shared,
+                    num_fields,
+                    keyframe_and_messages.messages[user_index],
+                )
+            )
+
+        if self._wire_format == WIRE_FORMAT_JSON:
+            return '{"keyframes": [' + ", ".join(user_keyframes) + "]}"
+        return (
+            _msgpack_map_header(1)
+            + self._dumps("keyframes")
+            + _msgpack_array_header(len(user_keyframes))
+            + b"".join(user_keyframes)
+        )
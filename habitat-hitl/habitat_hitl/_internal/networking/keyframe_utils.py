@@ -4,7 +4,8 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
-from typing import List
+import json
+from typing import Any, Dict, List
 
 from habitat_hitl.core.types import Keyframe, KeyframeAndMessages, Message
 
@@ -131,6 +132,77 @@ def update_consolidated_keyframe(
     # todo: lights, userTransforms
 
 
+def get_keyframe_item_count(keyframe: Keyframe) -> int:
+    """
+    Count the loads, creations, updates and deletions of a keyframe.
+    """
+    return sum(
+        len(value) for value in keyframe.values() if isinstance(value, list)
+    )
+
+
+def compact_consolidated_keyframe(consolidated_keyframe: Keyframe) -> int:
+    """
+    Collapse a consolidated keyframe to the current live set of instances.
+    update_consolidated_keyframe only appends loads and keeps the updates of
+    instances whose creation it never saw. The compacted keyframe yields the
+    same scene for a client receiving it as its first keyframe:
+    * Duplicate loads are removed.
+    * Deletions are removed. A deletion in a consolidated keyframe either
+      refers to an instance that was never created, or predates the latest
+      creation of the instance.
+    * State updates and metadata of instances that are not created are
+      removed.
+    * Only the latest rig creation and rig update of each rig are kept.
+
+    Returns the number of removed items.
+    """
+    item_count = get_keyframe_item_count(consolidated_keyframe)
+
+    def filter_field(key: str, keep) -> None:
+        if key in consolidated_keyframe:
+            consolidated_keyframe[key] = [
+                entry for entry in consolidated_keyframe[key] if keep(entry)
+            ]
+
+    def keep_latest(key: str, id_key: str) -> None:
+        if key in consolidated_keyframe:
+            latest: Dict[Any, Any] = {}
+            for entry in consolidated_keyframe[key]:
+                latest[entry[id_key]] = entry
+            consolidated_keyframe[key] = list(latest.values())
+
+    if "loads" in consolidated_keyframe:
+        load_keys = set()
+        unique_loads = []
+        for load in consolidated_keyframe["loads"]:
+            load_key = json.dumps(load, sort_keys=True)
+            if load_key not in load_keys:
+                load_keys.add(load_key)
+                unique_loads.append(load)
+        consolidated_keyframe["loads"] = unique_loads
+
+    if "deletions" in consolidated_keyframe:
+        consolidated_keyframe["deletions"] = []
+
+    live_instance_keys = {
+        entry["instanceKey"]
+        for entry in consolidated_keyframe.get("creations", [])
+    }
+    filter_field(
+        "stateUpdates",
+        lambda entry: entry["instanceKey"] in live_instance_keys,
+    )
+    filter_field(
+        "metadata", lambda entry: entry["instanceKey"] in live_instance_keys
+    )
+
+    keep_latest("rigCreations", "id")
+    keep_latest("rigUpdates", "id")
+
+    return item_count - get_keyframe_item_count(consolidated_keyframe)
+
+
 def update_consolidated_message(
     consolidated_message: Message, inc_message: Message
 ) -> None:
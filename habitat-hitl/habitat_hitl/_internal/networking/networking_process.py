@@ -13,7 +13,7 @@ import time
 import traceback
 from datetime import datetime
 from multiprocessing import Process
-from typing import Dict, List
+from typing import Any, Dict, List
 
 import aiohttp.web
 from websockets.server import WebSocketServer, WebSocketServerProtocol, serve
@@ -24,9 +24,14 @@ from habitat_hitl._internal.networking.frequency_limiter import (
 from habitat_hitl._internal.networking.interprocess_record import (
     InterprocessRecord,
 )
+from habitat_hitl._internal.networking.keyframe_encoding import (
+    KeyframeEncoder,
+    Payload,
+)
 from habitat_hitl._internal.networking.keyframe_utils import (
+    compact_consolidated_keyframe,
     get_empty_keyframe,
-    get_user_keyframe,
+    get_keyframe_item_count,
     update_consolidated_keyframe,
     update_consolidated_messages,
 )
@@ -35,7 +40,6 @@ from habitat_hitl.core.types import (
     ClientState,
     ConnectionRecord,
     DisconnectionRecord,
-    Keyframe,
     KeyframeAndMessages,
     Message,
 )
@@ -131,6 +135,22 @@ class NetworkManager:
         self._consolidated_keyframe_and_messages = KeyframeAndMessages(
             get_empty_keyframe(), consolidated_messages
         )
+        # The consolidated keyframe grows for the server's lifetime. It is
+        # periodically compacted to the current live set of instances.
+        self._keyframe_compaction_interval = (
+            self._networking_config.keyframe_compaction_interval
+        )
+        self._last_compaction_time = time.time()
+        self._compaction_stats = {
+            "compaction_count": 0,
+            "last_compaction_duration_ms": 0.0,
+            "last_compaction_removed_item_count": 0,
+        }
+
+        self._keyframe_encoder = KeyframeEncoder(
+            wire_format=self._networking_config.wire_format,
+            delta_encoding=self._networking_config.delta_encoding,
+        )
 
     def _occupy_user_slot(self, websocket: WebSocketServerProtocol) -> int:
         """
@@ -147,6 +167,7 @@ class NetworkManager:
         while user_index in self._user_slots:
             user_index += 1
         self._user_slots[user_index] = client
+        self._keyframe_encoder.reset_client(user_index)
 
         # Remove user-specific messages.
         self._consolidated_keyframe_and_messages.messages[user_index].clear()
@@ -161,10 +182,46 @@ class NetworkManager:
         assert len(self._user_slots) > 0
         assert user_index in self._user_slots
         del self._user_slots[user_index]
+        self._keyframe_encoder.reset_client(user_index)
 
         # Remove user-specific messages.
         self._consolidated_keyframe_and_messages.messages[user_index].clear()
 
+    def _maybe_compact_consolidated_keyframe(self) -> None:
+        if self._keyframe_compaction_interval is None:
+            return
+        now = time.time()
+        if (
+            now - self._last_compaction_time
+            < self._keyframe_compaction_interval
+        ):
+            return
+        self._last_compaction_time = now
+
+        time_start_ns = time.time_ns()
+        removed_item_count = compact_consolidated_keyframe(
+            self._consolidated_keyframe_and_messages.keyframe
+        )
+        elapsed_ms = (time.time_ns() - time_start_ns) / (10**6)
+        self._compaction_stats["compaction_count"] += 1
+        self._compaction_stats["last_compaction_duration_ms"] = elapsed_ms
+        self._compaction_stats[
+            "last_compaction_removed_item_count"
+        ] = removed_item_count
+
+    def get_consolidated_keyframe_stats(self) -> Dict[str, Any]:
+        """
+        Size of the consolidated keyframe sent to late-joining clients, and
+        statistics about its compaction.
+        """
+        stats: Dict[str, Any] = {
+            "item_count": get_keyframe_item_count(
+                self._consolidated_keyframe_and_messages.keyframe
+            )
+        }
+        stats.update(self._compaction_stats)
+        return stats
+
     def _update_consolidated_keyframes_and_messages(
         self,
         consolidated_keyframes_and_messages: KeyframeAndMessages,
@@ -229,9 +286,9 @@ class NetworkManager:
 
     async def send_keyframes(self) -> None:
         # this runs continuously even when there is no client connection
-        user_json_strings: Dict[int, str] = {}
+        user_payloads: Dict[int, Payload] = {}
         while True:
-            user_json_strings.clear()
+            user_payloads.clear()
             self._check_kick_client()
 
             time_start_ns = time.time_ns()
@@ -256,6 +313,7 @@ class NetworkManager:
                         )
                     inc_keyframes_and_messages = [tmp_con_keyframe]
 
+                self._keyframe_encoder.begin_batch()
                 for user_index in self._user_slots.keys():
                     slot = self._user_slots[user_index]
                     message = inc_keyframes_and_messages[0].messages[
@@ -276,45 +334,37 @@ class NetworkManager:
                         # some frames. To handle this case, we send a consolidated keyframe as
                         # the very first keyframe for the new client. It captures all the
                         # previous incremental keyframes since the server started.
-                        user_keyframes_to_send: List[Keyframe] = []
+                        keyframes_to_send: List[KeyframeAndMessages] = []
                         if slot.needs_consolidated_keyframe:
-                            user_keyframes_to_send.insert(
-                                0,
-                                get_user_keyframe(
-                                    self._consolidated_keyframe_and_messages,
-                                    user_index,
-                                ),
+                            keyframes_to_send.append(
+                                self._consolidated_keyframe_and_messages
                             )
                             slot.needs_consolidated_keyframe = False
+                        keyframes_to_send += inc_keyframes_and_messages
+
+                        # Serialize the keyframes combined with the user
+                        # messages. See KeyframeEncoder.
+                        user_payloads[
+                            user_index
+                        ] = self._keyframe_encoder.encode(
+                            user_index, keyframes_to_send
+                        )
 
-                        # Create final user keyframes by combining keyframes and user messages.
-                        for (
-                            keyframe_and_messages_to_send
-                        ) in inc_keyframes_and_messages:
-                            user_keyframes_to_send.append(
-                                get_user_keyframe(
-                                    keyframe_and_messages_to_send, user_index
-                                )
-                            )
-
-                        # Convert keyframes to JSON string
-                        wrapper_obj = {"keyframes": user_keyframes_to_send}
-                        user_json_strings[user_index] = json.dumps(wrapper_obj)
-
-                # after we've converted our keyframes to send to json, update
+                # after we've serialized our keyframes to send, update
                 # our consolidated keyframe
                 for inc_keyframe_and_messages in inc_keyframes_and_messages:
                     self._update_consolidated_keyframes_and_messages(
                         self._consolidated_keyframe_and_messages,
                         inc_keyframe_and_messages,
                     )
+                self._maybe_compact_consolidated_keyframe()
 
                 tasks = {}
                 for user_index in self._user_slots.keys():
                     if self.is_okay_to_send_keyframes(user_index):
                         slot = self._user_slots[user_index]
                         tasks[user_index] = slot.socket.send(
-                            user_json_strings[user_index]
+                            user_payloads[user_index]
                         )
                         slot.recent_connection_activity_timestamp = (
                             datetime.now()
@@ -327,6 +377,7 @@ class NetworkManager:
                             # This will raise an exception if the connection is broken,
                             # e.g. if the server lost its network connection.
                             await tasks[user_index]
+                            self._keyframe_encoder.acknowledge(user_index)
                         except Exception as e:
                             print(f"Error sending to client. Error: {e}.")
                             self.handle_disconnect(slot.connection_id)
@@ -535,6 +586,7 @@ async def start_http_availability_server(
             {
                 "accepting_users": network_mgr.is_server_available(),
                 "user_count": len(network_mgr._user_slots),
+                "consolidated_keyframe": network_mgr.get_consolidated_keyframe_stats(),
             },
             text=None,
             body=None,
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Meta Platforms, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import json
+
+import pytest
+
+from habitat_hitl._internal.networking.keyframe_encoding import KeyframeEncoder
+from habitat_hitl._internal.networking.keyframe_utils import (
+    get_empty_keyframe,
+    get_user_keyframe,
+)
+from habitat_hitl.core.types import KeyframeAndMessages
+
+
+def _state_update(key, x):
+    return {
+        "instanceKey": key,
+        "state": {
+            "absTransform": {
+                "translation": [x, 0.5, -1.25],
+                "rotation": [1.0, 0.0, 0.0, 0.0],
+            },
+            "semanticId": 0,
+        },
+    }
+
+
+def _keyframes():
+    consolidated = KeyframeAndMessages(
+        get_empty_keyframe(), [{"camera": 0}, {}]
+    )
+    consolidated.keyframe["stateUpdates"] = [
+        _state_update(0, 0.0),
+        _state_update(1, 1.0),
+    ]
+    inc = KeyframeAndMessages(
+        {"stateUpdates": [_state_update(0, 0.0), _state_update(1, 2.0)]},
+        [{"camera": 1}, {"text": "hello"}],
+    )
+    return consolidated, inc
+
+
+def _decode_states(keyframes):
+    return [
+        [u["instanceKey"] for u in keyframe.get("stateUpdates", [])]
+        for keyframe in keyframes
+    ]
+
+
+def test_json_keyframe_encoding():
+    consolidated, inc = _keyframes()
+    encoder = KeyframeEncoder(wire_format="json", delta_encoding=False)
+    encoder.begin_batch()
+    for user_index in range(2):
+        expected = json.dumps(
+            {
+                "keyframes": [
+                    get_user_keyframe(consolidated, user_index),
+                    get_user_keyframe(inc, user_index),
+                ]
+            }
+        )
+        assert encoder.encode(user_index, [consolidated, inc]) == expected
+
+    # Empty keyframes only contain the message.
+    encoder.begin_batch()
+    empty = KeyframeAndMessages({}, [{"a": 1}])
+    assert json.loads(encoder.encode(0, [empty])) == {
+        "keyframes": [{"message": {"a": 1}}]
+    }
+
+
+def test_delta_keyframe_encoding():
+    consolidated, inc = _keyframes()
+    encoder = KeyframeEncoder(wire_format="json", delta_encoding=True)
+    encoder.begin_batch()
+    keyframes = json.loads(encoder.encode(0, [consolidated, inc]))
+    # Instance 0 did not change since the consolidated keyframe.
+    assert _decode_states(keyframes["keyframes"]) == [[0, 1], [1]]
+    assert keyframes["keyframes"][1]["message"] == {"camera": 1}
+    encoder.acknowledge(0)
+
+    # Nothing changed since the acknowledged keyframes.
+    encoder.begin_batch()
+    keyframes = json.loads(encoder.encode(0, [inc]))
+    assert _decode_states(keyframes["keyframes"]) == [[]]
+
+    # Deleted instances are sent again when re-created.
+    encoder.begin_batch()
+    encoder.encode(0, [KeyframeAndMessages({"deletions": [1]}, [{}])])
+    encoder.acknowledge(0)
+    encoder.begin_batch()
+    keyframes = json.loads(encoder.encode(0, [inc]))
+    assert _decode_states(keyframes["keyframes"]) == [[1]]
+
+    # A new client receives everything.
+    encoder.reset_client(0)
+    encoder.begin_batch()
+    keyframes = json.loads(encoder.encode(0, [inc]))
+    assert _decode_states(keyframes["keyframes"]) == [[0, 1]]
+
+
+def test_msgpack_keyframe_encoding():
+    msgpack = pytest.importorskip("msgpack")
+    consolidated, inc = _keyframes()
+    encoder = KeyframeEncoder(wire_format="msgpack", delta_encoding=False)
+    encoder.begin_batch()
+    for user_index in range(2):
+        payload = encoder.encode(user_index, [consolidated, inc])
+        assert isinstance(payload, bytes)
+        assert msgpack.unpackb(payload) == {
+            "keyframes": [
+                get_user_keyframe(consolidated, user_index),
+                get_user_keyframe(inc, user_index),
+            ]
+        }
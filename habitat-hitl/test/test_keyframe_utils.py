@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Meta Platforms, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from habitat_hitl._internal.networking.keyframe_utils import (
+    compact_consolidated_keyframe,
+    get_empty_keyframe,
+    get_keyframe_item_count,
+    update_consolidated_keyframe,
+)
+
+
+def _load(filepath):
+    return {"type": 0, "filepath": filepath, "virtualUnitToMeters": 1.0}
+
+
+def _creation(key, filepath):
+    return {"instanceKey": key, "creation": {"filepath": filepath}}
+
+
+def _state_update(key, x):
+    return {"instanceKey": key, "state": {"absTransform": {"x": x}}}
+
+
+def test_compact_consolidated_keyframe():
+    consolidated = get_empty_keyframe()
+    inc_keyframes = [
+        {
+            "loads": [_load("a.glb"), _load("b.glb")],
+            "creations": [_creation(0, "a.glb"), _creation(1, "b.glb")],
+            "stateUpdates": [_state_update(0, 0.0), _state_update(1, 0.0)],
+            "rigCreations": [{"id": 0, "boneNames": ["root"]}],
+            "rigUpdates": [{"id": 0, "pose": [0.0]}],
+        },
+        # Update of an instance whose creation was never received.
+        {"stateUpdates": [_state_update(5, 1.0)], "deletions": [7]},
+        # The asset is loaded again with instance 1 re-created.
+        {"deletions": [1]},
+        {
+            "loads": [_load("b.glb")],
+            "creations": [_creation(1, "b.glb")],
+            "stateUpdates": [_state_update(1, 2.0)],
+            "rigUpdates": [{"id": 0, "pose": [1.0]}],
+        },
+    ]
+    for inc_keyframe in inc_keyframes:
+        update_consolidated_keyframe(consolidated, inc_keyframe)
+
+    item_count = get_keyframe_item_count(consolidated)
+    removed_count = compact_consolidated_keyframe(consolidated)
+    assert get_keyframe_item_count(consolidated) == item_count - removed_count
+
+    assert consolidated["loads"] == [_load("a.glb"), _load("b.glb")]
+    assert consolidated["creations"] == [
+        _creation(0, "a.glb"),
+        _creation(1, "b.glb"),
+    ]
+    assert consolidated["stateUpdates"] == [
+        _state_update(0, 0.0),
+        _state_update(1, 2.0),
+    ]
+    assert consolidated["deletions"] == []
+    assert consolidated["rigUpdates"] == [{"id": 0, "pose": [1.0]}]
+
+    # Compacting again is a no-op.
+    assert compact_consolidated_keyframe(consolidated) == 0
@@ -9,6 +9,11 @@ from habitat.articulated_agent_controllers.humanoid_base_controller import (
     Motion,
     Pose,
 )
+from habitat.articulated_agent_controllers.humanoid_motion_library import (
+    HandReachData,
+    MotionLibrary,
+    get_motion_library,
+)
 from habitat.articulated_agent_controllers.humanoid_rearrange_controller import (
     HumanoidRearrangeController,
 )
@@ -22,4 +27,7 @@ __all__ = [
     "HumanoidSeqPoseController",
     "Pose",
     "Motion",
+    "HandReachData",
+    "MotionLibrary",
+    "get_motion_library",
 ]
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Meta Platforms, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import json
+import os
+import struct
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+import magnum as mn
+import numpy as np
+
+from habitat.articulated_agent_controllers.humanoid_base_controller import (
+    Motion,
+    Pose,
+)
+from habitat.core.logging import logger
+
+# Extension of the motion library converted from a motion file, which is
+# stored next to the motion file.
+MOTION_LIBRARY_EXT = ".motionlib"
+
+_MAGIC = b"HABMOTLB"
+_VERSION = 1
+# Alignment of the arrays in the file, so that they can be viewed in place.
+_ALIGNMENT = 64
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def _get_source_stamp(path: str) -> Dict[str, int]:
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def build_hand_ik_arrays(
+    hand_motion: Motion, walk_motion: Motion, stop_pose: Pose
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Builds the joint quats, root rotation quats and root translations of every pose of a reaching Motion, followed by the stop pose, so that they can be interpolated when reaching.
+
+    :param hand_motion: The hand Motion object.
+    :param walk_motion: The walking Motion, whose first root transform is used for the stop pose.
+    :param stop_pose: The stationary standing pose.
+
+    :return: A Tuple of arrays of shape (num_poses + 1) x num_joints x 4, (num_poses + 1) x 4 and (num_poses + 1) x 3, containing the joint quats, rotation quats and translation vectors respectively.
+    """
+
+    rotations, translations, joints = [], [], []
+    for pose in hand_motion.poses:
+        curr_transform = mn.Matrix4(pose.root_transform)
+
+        quat_Rot = mn.Quaternion.from_matrix(curr_transform.rotation())
+        joints.append(np.array(pose.joints).reshape(-1, 4))
+        rotations.append(np.array(list(quat_Rot.vector) + [quat_Rot.scalar]))
+        translations.append(np.array(curr_transform.translation))
+
+    add_rot = mn.Matrix4.rotation(mn.Rad(np.pi), mn.Vector3(0, 1.0, 0))
+
+    obj_transform = add_rot @ walk_motion.poses[0].root_transform
+    obj_transform.translation *= mn.Vector3.x_axis() + mn.Vector3.y_axis()
+    trans = (
+        mn.Matrix4.rotation_y(mn.Rad(-np.pi / 2.0))
+        @ mn.Matrix4.rotation_z(mn.Rad(-np.pi / 2.0))
+    ).inverted()
+    curr_transform = trans @ obj_transform
+
+    quat_Rot = mn.Quaternion.from_matrix(curr_transform.rotation())
+    joints.append(np.array(stop_pose.joints).reshape(-1, 4))
+    rotations.append(np.array(list(quat_Rot.vector) + [quat_Rot.scalar]))
+    translations.append(np.array(curr_transform.translation))
+    return np.stack(joints), np.stack(rotations), np.stack(translations)
+
+
+@dataclass(frozen=True)
+class HandReachData:
+    """
+    The poses used to reach positions with a hand.
+
+    :property joints: (num_poses + 1) x num_joints x 4 joint quats, see :ref:`build_hand_ik_arrays`.
+    :property rotations: (num_poses + 1) x 4 root rotation quats.
+    :property translations: (num_poses + 1) x 3 root translations.
+    :property coord_min: The minimum reached coordinate along each axis.
+    :property coord_max: The maximum reached coordinate along each axis.
+    :property num_bins: The number of reached coordinates along each axis. The poses are ordered by y, then x, then z bin.
+    """
+
+    joints: np.ndarray
+    rotations: np.ndarray
+    translations: np.ndarray
+    coord_min: np.ndarray
+    coord_max: np.ndarray
+    num_bins: np.ndarray
+
+    @property
+    def coord_info(self) -> Dict[str, np.ndarray]:
+        return {
+            "min": self.coord_min,
+            "max": self.coord_max,
+            "num_bins": self.num_bins,
+        }
+
+    def interpolate(
+        self, positions: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Computes the poses reaching a batch of positions using trilinear interpolation of the poses of the grid.
+
+        Positions outside of the grid are clamped to it, except below the minimum z coordinate, where the poses are interpolated from the stop pose at z = 0.
+
+        :param positions: N x 3 positions to reach, relative to the humanoid root.
+
+        :return: A Tuple of arrays of shape N x num_joints x 4, N x 4 and N x 3, containing the joint quats, root rotation quats and root translations respectively.
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        coord_min = self.coord_min.astype(np.float64)
+        coord_max = self.coord_max.astype(np.float64)
+        num_bins = self.num_bins.astype(np.int64)
+
+        lower_bound = np.array([coord_min[0], coord_min[1], 0.0])
+        values = np.minimum(
+            np.maximum(np.minimum(positions, coord_max), lower_bound),
+            coord_max,
+        )
+        # Fractional index of each coordinate in the grid.
+        index = (values - coord_min) / (coord_max - coord_min) * (num_bins - 1)
+        lower = np.minimum(np.floor(index), num_bins - 1)
+        upper = np.maximum(np.minimum(np.ceil(index), num_bins - 1), 0)
+        t = index - lower
+        below = lower < 0
+        if below.any():
+            # The stop pose, stored after the poses of the grid, is at the
+            # index of the coordinate 0.
+            zero_index = np.broadcast_to(
+                np.trunc(
+                    -coord_min * (num_bins - 1) / (coord_max - coord_min)
+                ),
+                index.shape,
+            )
+            with np.errstate(divide="ignore", invalid="ignore"):
+                t = np.where(below, (index - zero_index) / -zero_index, t)
+            lower = np.where(below, -1, lower)
+
+        # Grid indices of the 8 corners around each position, where the
+        # corner k uses the upper bound of the axis i if bit i of k is set.
+        corners = (np.arange(8)[:, None] >> np.arange(3)) & 1
+        bounds = np.stack([lower, upper], axis=-1).astype(np.int64)
+        corner_ids = bounds[:, np.arange(3), corners]
+        pose_ids = (
+            corner_ids[..., 1] * num_bins[0] * num_bins[2]
+            + corner_ids[..., 0] * num_bins[2]
+            + corner_ids[..., 2]
+        )
+        pose_ids[(corner_ids < 0).any(axis=-1)] = -1
+        weights = np.where(corners, t[:, None, :], 1.0 - t[:, None, :]).prod(
+            axis=-1
+        )
+
+        joints = np.einsum("nc,ncjq->njq", weights, self.joints[pose_ids])
+        rotations = np.einsum("nc,ncq->nq", weights, self.rotations[pose_ids])
+        translations = np.einsum(
+            "nc,ncd->nd", weights, self.translations[pose_ids]
+        )
+        joints /= np.linalg.norm(joints, axis=-1, keepdims=True)
+        rotations /= np.linalg.norm(rotations, axis=-1, keepdims=True)
+        return joints, rotations, translations
+
+
+class MotionLibrary:
+    """
+    The motions, poses and hand reaching data of a humanoid motion file, stored as flat arrays in a single file.
+
+    The arrays of a library loaded with `load` are read-only views of a memory map of the file, so the pages are shared by all the processes of a host loading the same library. Use :ref:`get_motion_library` to also share the library between the controllers of a process.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], header: Dict[str, Any]):
+        """
+        :param arrays: The arrays of the library, keyed by "<entry name>/<array name>".
+        :param header: The names of the "motions" with their fps, of the "poses" and of the "reach" data, and the "source" file stamp.
+        """
+        self._arrays = arrays
+        self._header = header
+        self._motions: Dict[str, Motion] = {}
+        self._poses: Dict[str, Pose] = {}
+
+    @property
+    def source(self) -> Optional[Dict[str, int]]:
+        """
+        The size and modification time of the motion file the library was converted from.
+        """
+        return self._header.get("source")
+
+    @property
+    def motion_names(self) -> List[str]:
+        return list(self._header["motions"])
+
+    @property
+    def pose_names(self) -> List[str]:
+        return list(self._header["poses"])
+
+    @property
+    def reach_names(self) -> List[str]:
+        return list(self._header["reach"])
+
+    def get_motion(self, name: str) -> Motion:
+        """
+        The Motion `name`, shared by all the callers.
+        """
+        if name not in self._motions:
+            if name not in self._header["motions"]:
+                raise KeyError(f"No motion '{name}' in the motion library.")
+            self._motions[name] = Motion(
+                self._arrays[f"{name}/joints"],
+                self._arrays[f"{name}/transforms"],
+                self._arrays.get(f"{name}/displacement"),
+                self._header["motions"][name]["fps"],
+            )
+        return self._motions[name]
+
+    def get_pose(self, name: str) -> Pose:
+        """
+        The Pose `name`, shared by all the callers.
+        """
+        if name not in self._poses:
+            if name not in self._header["poses"]:
+                raise KeyError(f"No pose '{name}' in the motion library.")
+            self._poses[name] = Pose(
+                self._arrays[f"{name}/joints"],
+                mn.Matrix4(self._arrays[f"{name}/transform"]),
+            )
+        return self._poses[name]
+
+    def get_reach_data(self, name: str) -> Optional[HandReachData]:
+        """
+        The data to reach with the hand `name`, or None if the library has none.
+        """
+        if name not in self._header["reach"]:
+            return None
+        return HandReachData(
+            *(
+                self._arrays[f"{name}/{array_name}"]
+                for array_name in (
+                    "joints",
+                    "rotations",
+                    "translations",
+                    "coord_min",
+                    "coord_max",
+                    "num_bins",
+                )
+            )
+        )
+
+    @classmethod
+    def from_motion_file(cls, motion_path: str) -> "MotionLibrary":
+        """
+        Converts a pickled motion file. Motions are the entries with a "joints_array", poses the entries with "joints" and a "transform", and reach data the entries with a "pose_motion" and "coord_info". Reach data requires the "walk_motion" and the "stop_pose".
+        """
+        data = np.load(motion_path, allow_pickle=True)
+
+        def _unwrap(value: Any) -> Any:
+            # Dictionaries saved with numpy are 0-d object arrays.
+            if (
+                isinstance(value, np.ndarray)
+                and value.dtype == object
+                and value.ndim == 0
+            ):
+                return value.item()
+            return value
+
+        entries = {name: _unwrap(value) for name, value in data.items()}
+        arrays: Dict[str, np.ndarray] = {}
+        header: Dict[str, Any] = {
+            "source": _get_source_stamp(motion_path),
+            "motions": {},
+            "poses": [],
+            "reach": [],
+        }
+        reach_entries = {}
+        for name, value in entries.items():
+            if not isinstance(value, dict):
+                continue
+            if "joints_array" in value:
+                header["motions"][name] = {
+                    "fps": np.asarray(value["fps"]).item()
+                }
+                arrays[f"{name}/joints"] = np.asarray(value["joints_array"])
+                arrays[f"{name}/transforms"] = np.asarray(
+                    value["transform_array"]
+                )
+                if value.get("displacement") is not None:
+                    arrays[f"{name}/displacement"] = np.asarray(
+                        value["displacement"]
+                    )
+            elif "joints" in value and "transform" in value:
+                header["poses"].append(name)
+                arrays[f"{name}/joints"] = np.asarray(value["joints"]).reshape(
+                    -1
+                )
+                arrays[f"{name}/transform"] = np.asarray(value["transform"])
+            elif "pose_motion" in value and "coord_info" in value:
+                reach_entries[name] = value
+
+        library = cls(arrays, header)
+        for name, value in reach_entries.items():
+            pose_motion = value["pose_motion"]
+            nposes = pose_motion["transform_array"].shape[0]
+            hand_motion = Motion(
+                pose_motion["joints_array"].reshape(nposes, -1, 4),
+                pose_motion["transform_array"],
+                None,
+                1,
+            )
+            (
+                arrays[f"{name}/joints"],
+                arrays[f"{name}/rotations"],
+                arrays[f"{name}/translations"],
+            ) = build_hand_ik_arrays(
+                hand_motion,
+                library.get_motion("walk_motion"),
+                library.get_pose("stop_pose"),
+            )
+            coord_info = _unwrap(value["coord_info"])
+            arrays[f"{name}/coord_min"] = np.asarray(coord_info["min"])
+            arrays[f"{name}/coord_max"] = np.asarray(coord_info["max"])
+            arrays[f"{name}/num_bins"] = np.asarray(coord_info["num_bins"])
+            header["reach"].append(name)
+        return library
+
+    def save(self, path: str) -> None:
+        """
+        Writes the library to `path`. The file is written then renamed, so that concurrent processes never read a partial file.
+        """
+        arrays = {
+            key: np.ascontiguousarray(array)
+            for key, array in self._arrays.items()
+        }
+        array_entries = {}
+        offset = 0
+        for key, array in arrays.items():
+            if array.dtype.hasobject:
+                raise ValueError(
+                    f"Motion library array '{key}' has an object dtype."
+                )
+            offset = _align(offset)
+            array_entries[key] = {
+                "dtype": array.dtype.str,
+                "shape": list(array.shape),
+                "offset": offset,
+            }
+            offset += array.nbytes
+
+        header = dict(self._header, version=_VERSION, arrays=array_entries)
+        header_bytes = json.dumps(header).encode("utf-8")
+        data_start = _align(len(_MAGIC) + 8 + len(header_bytes))
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(_MAGIC)
+                f.write(struct.pack("<Q", len(header_bytes)))
+                f.write(header_bytes)
+                for key, array in arrays.items():
+                    f.seek(data_start + array_entries[key]["offset"])
+                    f.write(array.tobytes())
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def load(cls, path: str) -> "MotionLibrary":
+        """
+        Memory maps the library file `path`.
+        """
+        with open(path, "rb") as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError(f"{path} is not a motion library.")
+            (header_len,) = struct.unpack("<Q", f.read(8))
+            header = json.loads(f.read(header_len).decode("utf-8"))
+        if header.get("version") != _VERSION:
+            raise ValueError(
+                f"Motion library {path} has version {header.get('version')}, expected {_VERSION}."
+            )
+
+        data_start = _align(len(_MAGIC) + 8 + header_len)
+        buffer = np.memmap(path, dtype=np.uint8, mode="r")
+        arrays = {}
+        for key, entry in header.pop("arrays").items():
+            dtype = np.dtype(entry["dtype"])
+            shape = tuple(entry["shape"])
+            start = data_start + entry["offset"]
+            nbytes = dtype.itemsize * int(np.prod(shape))
+            arrays[key] = (
+                buffer[start : start + nbytes].view(dtype).reshape(shape)
+            )
+        return cls(arrays, header)
+
+
+def get_motion_library_path(motion_path: str) -> str:
+    """
+    The path of the motion library converted from the motion file `motion_path`.
+    """
+    if motion_path.endswith(MOTION_LIBRARY_EXT):
+        return motion_path
+    return motion_path + MOTION_LIBRARY_EXT
+
+
+@lru_cache(maxsize=None)
+def _get_motion_library(motion_path: str) -> MotionLibrary:
+    library_path = get_motion_library_path(motion_path)
+    if library_path == motion_path:
+        return MotionLibrary.load(library_path)
+
+    source = _get_source_stamp(motion_path)
+    if os.path.isfile(library_path):
+        try:
+            library = MotionLibrary.load(library_path)
+            if library.source == source:
+                return library
+        except (OSError, ValueError) as e:
+            logger.warning(
+                f"Could not load motion library {library_path}: {e}"
+            )
+
+    library = MotionLibrary.from_motion_file(motion_path)
+    try:
+        library.save(library_path)
+    except OSError as e:
+        logger.warning(
+            f"Could not write motion library {library_path}: {e}. The motion file will be converted by every process."
+        )
+        return library
+    return MotionLibrary.load(library_path)
+
+
+def get_motion_library(motion_path: str) -> MotionLibrary:
+    """
+    Returns the motion library of a motion file, shared by the whole process.
+
+    The motion file is converted once to a library file next to it, see :ref:`get_motion_library_path`, which is converted again when the motion file changes. `motion_path` can also be the path of a library file.
+    """
+    return _get_motion_library(os.path.abspath(motion_path))
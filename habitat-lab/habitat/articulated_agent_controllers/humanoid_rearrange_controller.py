@@ -4,9 +4,7 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
-import math
 import os
-import pickle as pkl
 
 import magnum as mn
 import numpy as np
@@ -14,11 +12,14 @@ import numpy as np
 from habitat.articulated_agent_controllers import (
     HumanoidBaseController,
     Motion,
-    Pose,
 )
 from habitat.articulated_agent_controllers.humanoid_base_controller import (
     BASE_HUMANOID_OFFSET,
 )
+from habitat.articulated_agent_controllers.humanoid_motion_library import (
+    build_hand_ik_arrays,
+    get_motion_library,
+)
 
 MIN_ANGLE_TURN: float = 5.0  # If we turn less than this amount, we can just rotate the base and keep walking motion the same as if we had not rotated
 TURNING_STEP_AMOUNT: float = (
@@ -29,7 +30,54 @@ DIST_TO_STOP: float = (
     1e-9  # If the amount to move is this distance, just stop the character
 )
 
-from typing import List, Tuple
+from typing import Tuple
+
+# Rotation from the reaching poses to the humanoid root, which is
+# rotation_y(-pi / 2) @ rotation_z(-pi / 2).
+_REACH_ROOT_ROTATION: np.ndarray = np.array(
+    [
+        [0.0, 0.0, -1.0, 0.0],
+        [-1.0, 0.0, 0.0, 0.0],
+        [0.0, 1.0, 0.0, 0.0],
+        [0.0, 0.0, 0.0, 1.0],
+    ]
+)
+
+
+def _quat_to_rotation_matrix(quats: np.ndarray) -> np.ndarray:
+    """
+    Converts N x 4 unit quaternions, stored as vector then scalar, to N x 3 x 3 rotation matrices.
+    """
+    x, y, z, w = quats.T
+    return np.stack(
+        [
+            np.stack(
+                [
+                    1 - 2 * (y * y + z * z),
+                    2 * (x * y - z * w),
+                    2 * (x * z + y * w),
+                ],
+                axis=-1,
+            ),
+            np.stack(
+                [
+                    2 * (x * y + z * w),
+                    1 - 2 * (x * x + z * z),
+                    2 * (y * z - x * w),
+                ],
+                axis=-1,
+            ),
+            np.stack(
+                [
+                    2 * (x * z - y * w),
+                    2 * (y * z + x * w),
+                    1 - 2 * (x * x + y * y),
+                ],
+                axis=-1,
+            ),
+        ],
+        axis=-2,
+    )
 
 
 def bin_search(v, a, b, target_value):
@@ -78,21 +126,9 @@ class HumanoidRearrangeController(HumanoidBaseController):
                 f"Path does {walk_pose_path} not exist. Reach out to the paper authors to obtain this data."
             )
 
-        with open(walk_pose_path, "rb") as f:
-            walk_data = pkl.load(f)
-        walk_info = walk_data["walk_motion"]
-
-        self.walk_motion = Motion(
-            walk_info["joints_array"],
-            walk_info["transform_array"],
-            walk_info["displacement"],
-            walk_info["fps"],
-        )
-
-        self.stop_pose = Pose(
-            walk_data["stop_pose"]["joints"].reshape(-1),
-            mn.Matrix4(walk_data["stop_pose"]["transform"]),
-        )
+        motion_library = get_motion_library(walk_pose_path)
+        self.walk_motion = motion_library.get_motion("walk_motion")
+        self.stop_pose = motion_library.get_pose("stop_pose")
         self.motion_fps = motion_fps
         self.dist_per_step_size = (
             self.walk_motion.displacement[-1] / self.walk_motion.num_poses
@@ -105,30 +141,14 @@ class HumanoidRearrangeController(HumanoidBaseController):
         self._hand_names = ["left_hand", "right_hand"]
         ## Load hand data
         for hand_name in self._hand_names:
-            if hand_name in walk_data:
-                # Hand data contains two keys, pose_motion and coord_info
-                # pose_motion: Contains information about each of the N poses.
-                #   joints_array: list of joints represented as quaternions for
-                #   each pose: (N * J) x 4.
-                #   transform_array: an offset transform matrix for every pose
-                # coord_info: dictionary specifying the bounds and number of bins used
-                #   to compute the target poses
-                hand_data = walk_data[hand_name]
-                nposes = hand_data["pose_motion"]["transform_array"].shape[0]
-                self.vpose_info = hand_data["coord_info"].item()
-                hand_motion = Motion(
-                    hand_data["pose_motion"]["joints_array"].reshape(
-                        nposes, -1, 4
-                    ),
-                    hand_data["pose_motion"]["transform_array"],
-                    None,
-                    1,
-                )
-                self.hand_processed_data[hand_name] = self.build_ik_vectors(
-                    hand_motion
-                )
-            else:
-                self.hand_processed_data[hand_name] = None
+            # The reach data of each hand contains the joints and root
+            # transforms of poses reaching a grid of positions, precomputed
+            # in the motion library. coord_info specifies the bounds and
+            # number of bins of the grid.
+            reach_data = motion_library.get_reach_data(hand_name)
+            if reach_data is not None:
+                self.vpose_info = reach_data.coord_info
+            self.hand_processed_data[hand_name] = reach_data
 
     def set_framerate_for_linspeed(
         self, lin_speed: float, ang_speed: float, ctrl_freq: float
@@ -548,196 +568,60 @@ class HumanoidRearrangeController(HumanoidBaseController):
 
     def build_ik_vectors(
         self, hand_motion: Motion
-    ) -> Tuple[List[np.ndarray], List[np.ndarray], List[np.ndarray]]:
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
         Given a hand_motion Motion file containing different humanoid poses to reach objects with the hand, builds matrices of joint angles, root offset translations, and rotations so that they can be easily interpolated when reaching poses.
 
         :param hand_motion: The hand Motion object.
 
-        :return: A Tuple of Lists containing joint quats, rotation quats, and translation vectors respectfully. Each list entry is a formatted matrix for the aforementioned values at a single Motion frame.
+        :return: A Tuple of arrays containing joint quats, rotation quats, and translation vectors respectfully. Each array row is the aforementioned value at a single Motion frame.
         """
-
-        rotations, translations, joints = [], [], []
-        for ind in range(len(hand_motion.poses)):
-            curr_transform = mn.Matrix4(hand_motion.poses[ind].root_transform)
-
-            quat_Rot = mn.Quaternion.from_matrix(curr_transform.rotation())
-            joints.append(
-                np.array(hand_motion.poses[ind].joints).reshape(-1, 4)[
-                    None, ...
-                ]
-            )
-            rotations.append(
-                np.array(list(quat_Rot.vector) + [quat_Rot.scalar])[None, ...]
-            )
-            translations.append(
-                np.array(curr_transform.translation)[None, ...]
-            )
-
-        add_rot = mn.Matrix4.rotation(mn.Rad(np.pi), mn.Vector3(0, 1.0, 0))
-
-        obj_transform = add_rot @ self.walk_motion.poses[0].root_transform
-        obj_transform.translation *= mn.Vector3.x_axis() + mn.Vector3.y_axis()
-        curr_transform = obj_transform
-        trans = (
-            mn.Matrix4.rotation_y(mn.Rad(-np.pi / 2.0))
-            @ mn.Matrix4.rotation_z(mn.Rad(-np.pi / 2.0))
-        ).inverted()
-        curr_transform = trans @ obj_transform
-
-        quat_Rot = mn.Quaternion.from_matrix(curr_transform.rotation())
-        joints.append(
-            np.array(self.stop_pose.joints).reshape(-1, 4)[None, ...]
+        return build_hand_ik_arrays(
+            hand_motion, self.walk_motion, self.stop_pose
         )
-        rotations.append(
-            np.array(list(quat_Rot.vector) + [quat_Rot.scalar])[None, ...]
-        )
-        translations.append(np.array(curr_transform.translation)[None, ...])
-        return (joints, rotations, translations)
 
-    def _trilinear_interpolate_pose(
-        self,
-        position: mn.Vector3,
-        hand_data: Tuple[List[np.ndarray], List[np.ndarray], List[np.ndarray]],
-    ) -> Tuple[List[np.ndarray], mn.Matrix4]:
+    def calculate_reach_poses(
+        self, obj_positions: np.ndarray, index_hand: int = 0
+    ) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Given a 3D coordinate position, computes the humanoid's joints states + root rotations and translations to reach that position using trilinear interpolation.
+        Computes the humanoid states to reach each of a batch of positions with the hand, from the current base transform. Does not update the controller's state.
 
-        :param position: The position to reach for.
-        :param hand_data: The joint quats, root rotations, and root translation for each frame of the input reaching Motion.
+        :param obj_positions: N x 3 array of positions to reach with the hand.
+        :param index_hand: is 0 or 1 corresponding to the left or right hand
 
-        :return: joint state and root transform for the next step in the reaching sequence.
+        :return: N x num_joints x 4 joint quats and N x 4 x 4 root offset transforms, as set in joint_pose and obj_transform_offset by calculate_reach_pose.
         """
-
+        assert index_hand < 2
+        hand_name = self._hand_names[index_hand]
+        assert hand_name in self.hand_processed_data
+        hand_data = self.hand_processed_data[hand_name]
         assert hand_data is not None
 
-        joints, rotations, translations = hand_data
-
-        def find_index_quant(
-            minv: float,
-            maxv: float,
-            num_bins: int,
-            value: float,
-            interp: bool = False,
-        ) -> Tuple[int, int, float]:
-            # Find the quantization bins where a given value falls
-            # E.g. if we have 3 points, min=0, max=1, value=0.75, it
-            # will fall between 1 and 2
-            if interp:
-                value = max(min(value, maxv), 0)
-            else:
-                value = max(min(value, maxv), minv)
-            value = min(value, maxv)
-            value_norm = (value - minv) / (maxv - minv)
-
-            index = value_norm * (num_bins - 1)
-
-            lower = min(math.floor(index), num_bins - 1)
-            upper = max(min(math.ceil(index), num_bins - 1), 0)
-            value_norm_t = index - lower
-            if lower < 0:
-                min_poss_val = 0.0
-                lower = int(
-                    (min_poss_val - minv) * (num_bins - 1) / (maxv - minv)
+        root_pos = np.array(list(self.obj_transform_base.translation))
+        inv_T = (
+            mn.Matrix4.rotation_y(mn.Rad(-np.pi / 2.0))
+            @ mn.Matrix4.rotation_x(mn.Rad(-np.pi / 2.0))
+            @ self.obj_transform_base.inverted()
+        )
+        # Rows are the transformed x, y and z axes.
+        inv_rot = np.array(
+            [
+                list(inv_T.transform_vector(axis))
+                for axis in (
+                    mn.Vector3.x_axis(),
+                    mn.Vector3.y_axis(),
+                    mn.Vector3.z_axis(),
                 )
-                value_norm_t = (index - lower) / -lower
-                lower = -1
-
-            return lower, upper, value_norm_t
-
-        def comp_inter(x_i: int, y_i: int, z_i: int) -> int:
-            # Given an integer index from 0 to num_bins - 1
-            # on each dimension, compute the final index
-
-            if y_i < 0 or x_i < 0 or z_i < 0:
-                return -1
-            index = (
-                y_i
-                * self.vpose_info["num_bins"][0]
-                * self.vpose_info["num_bins"][2]
-                + x_i * self.vpose_info["num_bins"][2]
-                + z_i
-            )
-            return index
-
-        def normalize_quat(quat_tens: np.ndarray) -> np.ndarray:
-            # The last dimension contains the quaternion
-            return quat_tens / np.linalg.norm(quat_tens, axis=-1)[..., None]
-
-        def inter_data(
-            x_i: Tuple[int, int, float],
-            y_i: Tuple[int, int, float],
-            z_i: Tuple[int, int, float],
-            dat: np.ndarray,
-            is_quat: bool = False,
-        ) -> np.ndarray:
-            """
-            General trilinear interpolation function. Performs trilinear interpolation,
-            normalizing the result if the values are represented as quaternions (is_quat)
-
-            :param x_i, y_i, z_i: For the x,y,z dimensions, specifies the lower, upper, and normalized value
-            so that we can perform interpolation in 3 dimensions
-            :param dat: the values we want to interpolate.
-            :param is_quat: used to normalize the value in case we are interpolating quaternions
-
-            """
-            x0, y0, z0 = x_i[0], y_i[0], z_i[0]
-            x1, y1, z1 = x_i[1], y_i[1], z_i[1]
-            xd, yd, zd = x_i[2], y_i[2], z_i[2]
-            c000 = dat[comp_inter(x0, y0, z0)]
-            c001 = dat[comp_inter(x0, y0, z1)]
-            c010 = dat[comp_inter(x0, y1, z0)]
-            c011 = dat[comp_inter(x0, y1, z1)]
-            c100 = dat[comp_inter(x1, y0, z0)]
-            c101 = dat[comp_inter(x1, y0, z1)]
-            c110 = dat[comp_inter(x1, y1, z0)]
-            c111 = dat[comp_inter(x1, y1, z1)]
-
-            c00 = c000 * (1 - xd) + c100 * xd
-            c01 = c001 * (1 - xd) + c101 * xd
-            c10 = c010 * (1 - xd) + c110 * xd
-            c11 = c011 * (1 - xd) + c111 * xd
-
-            c0 = c00 * (1 - yd) + c10 * yd
-            c1 = c01 * (1 - yd) + c11 * yd
-
-            c = c0 * (1 - zd) + c1 * zd
-            if is_quat:
-                c = normalize_quat(c)
-
-            return c
-
-        relative_pos = position
-        x_diff, y_diff, z_diff = relative_pos.x, relative_pos.y, relative_pos.z
-        coord_diff = [x_diff, y_diff, z_diff]
-        coord_data = [
-            (
-                self.vpose_info["min"][ind_diff],
-                self.vpose_info["max"][ind_diff],
-                self.vpose_info["num_bins"][ind_diff],
-                coord_diff[ind_diff],
-            )
-            for ind_diff in range(3)
-        ]
-        # each value contains the lower, upper index and distance
-        interp = [False, False, True]
-        x_ind, y_ind, z_ind = [
-            find_index_quant(*data, interp)
-            for interp, data in zip(interp, coord_data)
-        ]
-
-        data_trans = np.concatenate(translations)
-        data_rot = np.concatenate(rotations)
-        data_joint = np.concatenate(joints)
-        res_joint = inter_data(x_ind, y_ind, z_ind, data_joint, is_quat=True)
-        res_trans = inter_data(x_ind, y_ind, z_ind, data_trans)
-        res_rot = inter_data(x_ind, y_ind, z_ind, data_rot, is_quat=True)
-        quat_rot = mn.Quaternion(mn.Vector3(res_rot[:3]), res_rot[-1])
-        joint_list = list(res_joint.reshape(-1))
-        transform = mn.Matrix4.from_(
-            quat_rot.to_matrix(), mn.Vector3(res_trans)
+            ]
         )
-        return joint_list, transform
+        obj_positions = np.asarray(obj_positions, dtype=np.float64)
+        relative_pos = (obj_positions.reshape(-1, 3) - root_pos) @ inv_rot
+
+        joints, rotations, translations = hand_data.interpolate(relative_pos)
+        transforms = np.tile(np.eye(4), (len(joints), 1, 1))
+        transforms[:, :3, :3] = _quat_to_rotation_matrix(rotations)
+        transforms[:, :3, 3] = translations
+        return joints, _REACH_ROOT_ROTATION @ transforms
 
     def calculate_reach_pose(
         self, obj_pos: mn.Vector3, index_hand: int = 0
@@ -751,25 +635,13 @@ class HumanoidRearrangeController(HumanoidBaseController):
         assert index_hand < 2
         hand_name = self._hand_names[index_hand]
         assert hand_name in self.hand_processed_data
-        hand_data = self.hand_processed_data[hand_name]
-        root_pos = self.obj_transform_base.translation
-        inv_T = (
-            mn.Matrix4.rotation_y(mn.Rad(-np.pi / 2.0))
-            @ mn.Matrix4.rotation_x(mn.Rad(-np.pi / 2.0))
-            @ self.obj_transform_base.inverted()
-        )
-        relative_pos = inv_T.transform_vector(obj_pos - root_pos)
 
         # TODO
-        if hand_data is not None:
-            curr_poses, curr_transform = self._trilinear_interpolate_pose(
-                mn.Vector3(relative_pos), hand_data
+        if self.hand_processed_data[hand_name] is not None:
+            joints, transforms = self.calculate_reach_poses(
+                np.array([list(obj_pos)]), index_hand
             )
-
-            self.obj_transform_offset = (
-                mn.Matrix4.rotation_y(mn.Rad(-np.pi / 2.0))
-                @ mn.Matrix4.rotation_z(mn.Rad(-np.pi / 2.0))
-                @ curr_transform
+            self.obj_transform_offset = mn.Matrix4(
+                *(mn.Vector4(*column) for column in transforms[0].T.tolist())
             )
-
-            self.joint_pose = curr_poses
+            self.joint_pose = list(joints[0].reshape(-1))
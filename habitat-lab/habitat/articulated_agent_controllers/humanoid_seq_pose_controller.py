@@ -7,11 +7,10 @@
 import os
 
 import magnum as mn
-import numpy as np
 
-from habitat.articulated_agent_controllers import (
-    HumanoidBaseController,
-    Motion,
+from habitat.articulated_agent_controllers import HumanoidBaseController
+from habitat.articulated_agent_controllers.humanoid_motion_library import (
+    get_motion_library,
 )
 
 
@@ -37,13 +36,8 @@ class HumanoidSeqPoseController(HumanoidBaseController):
                 f"Path does {motion_pose_path} not exist. Reach out to the paper authors to obtain this data."
             )
 
-        motion_info = np.load(motion_pose_path, allow_pickle=True)
-        motion_info = motion_info["pose_motion"]
-        self.humanoid_motion = Motion(
-            motion_info["joints_array"],
-            motion_info["transform_array"],
-            motion_info["displacement"],
-            motion_info["fps"],
+        self.humanoid_motion = get_motion_library(motion_pose_path).get_motion(
+            "pose_motion"
         )
         self.motion_frame = 0
         self.ref_pose = mn.Matrix4()
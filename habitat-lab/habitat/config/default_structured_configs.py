@@ -355,6 +355,12 @@ class OracleNavActionConfig(ActionConfig):
     allow_back: bool = True
     spawn_max_dist_to_obj: float = 2.0
     num_spawn_attempts: int = 200
+    # The path to the target is only planned again when the agent is further
+    # than path_corridor_radius from it, or when the target or the navmesh
+    # changes. Set to 0 to plan the path at every step.
+    path_corridor_radius: float = 0.3
+    # Distance at which the next waypoint of the path is considered reached.
+    path_waypoint_radius: float = 0.1
     # For social nav training only. It controls the distance threshold
     # between the robot and the human and decide if the human wants to walk or not
     human_stop_and_walk_to_robot_distance_threshold: float = -1.0
@@ -790,6 +796,12 @@ class TopDownMapMeasurementConfig(MeasurementConfig):
     # axes aligned bounding boxes
     draw_goal_aabbs: bool = True
     fog_of_war: FogOfWarConfig = FogOfWarConfig()
+    # number of rasterized navmesh maps cached in memory by each process, 0
+    # disables the in-memory cache
+    map_cache_size: int = 8
+    # if set, the rasterized navmesh maps are also saved to this directory
+    # and shared by all the processes and runs using it
+    map_cache_dir: Optional[str] = None
 
 
 @dataclass
@@ -1351,9 +1363,15 @@ class DistanceToGoalMeasurementConfig(MeasurementConfig):
     In Navigation tasks only, measures the geodesic distance to the goal.
 
     :property distance_to: If 'POINT' measures the distance to the closest episode goal. If 'VIEW_POINTS' measures the distance to the episode's goal's viewpoint.
+    :property distance_field_cell_size: If positive, the distance is bilinearly interpolated from exact distances computed on a grid with this spacing (in meters) and cached across the episodes with the same goals, instead of querying the pathfinder at every step.
+    :property distance_field_exact_radius: Distances below this value are always computed exactly, so that the success of the episodes is not affected by the interpolation.
+    :property distance_field_cache_size: Number of goal sets for which the grid distances are cached.
     """
     type: str = "DistanceToGoal"
     distance_to: str = "POINT"
+    distance_field_cell_size: float = 0.0
+    distance_field_exact_radius: float = 1.5
+    distance_field_cache_size: int = 64
 
 
 @dataclass
@@ -1817,6 +1835,9 @@ class DatasetConfig(HabitatBaseConfig):
     :property data_path: The path to the episode dataset. Episodes need to be compatible with the `type` argument (so they will load properly) and only use scenes that are present in the `scenes_dir`.
     :property split: `data_path` can have a `split` in the path. For example: "data/datasets/pointnav/habitat-test-scenes/v1/{split}/{split}.json.gz" the value in "{split}" will be replaced by the value of the `split` argument. This allows to easily swap between training, validation and test episodes by only changing the split argument.
     :property metadata: Optional. Additional information for interpreting the dataset.
+    :property num_load_workers: Number of workers decoding the per-scene episode files in parallel. Only used by datasets derived from `PointNav-v1`. With 0 or 1 the files are decoded sequentially.
+    :property load_workers_type: Either "thread" or "process". Use "thread" when the dataset is loaded inside of a `VectorEnv` worker, which cannot start processes.
+    :property decoded_cache_dir: Optional. Directory where the decoded episode files are cached in the memory mapped binary format. The cache is keyed by the path and modification time of each file, so later runs and the other environment workers load the decoded episodes instead of parsing the JSON files again.
 
     A dataset consists of episodes
     (a start configuration for a task within a scene) and a scene dataset
@@ -1832,6 +1853,9 @@ class DatasetConfig(HabitatBaseConfig):
     )
     # TODO: Make this field a structured dataclass.
     metadata: Optional[Any] = None
+    num_load_workers: int = 0
+    load_workers_type: str = "thread"
+    decoded_cache_dir: Optional[str] = None
 
 
 @dataclass
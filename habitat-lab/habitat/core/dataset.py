@@ -8,6 +8,7 @@
 ``habitat.core.Episode``. Each episode consists of a single instantiation
 of a ``habitat.Agent`` inside ``habitat.Env``.
 """
+import abc
 import copy
 import os
 import random
@@ -18,12 +19,15 @@ from typing import (
     Callable,
     Dict,
     Generic,
+    Iterable,
     Iterator,
     List,
     Optional,
     Sequence,
     TypeVar,
     Union,
+    cast,
+    overload,
 )
 
 import attr
@@ -108,6 +112,195 @@ class Episode(BaseEpisode):
 T = TypeVar("T", bound=Episode)
 
 
+class EpisodeSource(Generic[T], metaclass=abc.ABCMeta):
+    """Storage backing a :ref:`LazyEpisodeSequence`, typically the columnar
+    arrays of a binary dataset file. Episodes are addressed by their local
+    index and only built when :ref:`load` is called.
+    """
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    @abc.abstractmethod
+    def scene_id(self, index: int) -> str:
+        """Returns the scene id of an episode without building it."""
+
+    @abc.abstractmethod
+    def episode_id(self, index: int) -> str:
+        """Returns the episode id of an episode without building it."""
+
+    @abc.abstractmethod
+    def load(self, index: int) -> T:
+        """Builds the episode at :p:`index`."""
+
+
+class _ListEpisodeSource(EpisodeSource[T]):
+    """Source for already built episodes appended to a
+    :ref:`LazyEpisodeSequence`.
+    """
+
+    def __init__(self) -> None:
+        self.episodes: List[T] = []
+
+    def __len__(self) -> int:
+        return len(self.episodes)
+
+    def scene_id(self, index: int) -> str:
+        return self.episodes[index].scene_id
+
+    def episode_id(self, index: int) -> str:
+        return self.episodes[index].episode_id
+
+    def load(self, index: int) -> T:
+        return self.episodes[index]
+
+
+@attr.s(auto_attribs=True, slots=True)
+class LazyEpisodeRef:
+    """Lightweight handle on an episode of a :ref:`LazyEpisodeSequence`. It
+    exposes the :py:`scene_id` and :py:`episode_id` of the episode so that the
+    :ref:`EpisodeIterator` can group and order episodes without building them.
+    """
+
+    episodes: "LazyEpisodeSequence"
+    index: int
+
+    @property
+    def scene_id(self) -> str:
+        return self.episodes.scene_id_at(self.index)
+
+    @property
+    def episode_id(self) -> str:
+        return self.episodes.episode_id_at(self.index)
+
+    def load(self) -> Episode:
+        return self.episodes[self.index]
+
+
+class LazyEpisodeSequence(Sequence[T]):
+    """Read-only sequence of episodes that are built on access from one or
+    more :ref:`EpisodeSource`. Selecting a subset of the episodes (splits,
+    scene filters) only creates new index arrays and shares the sources.
+
+    Every access builds a new episode object, so changes made to an episode
+    are not persisted in the sequence.
+    """
+
+    def __init__(
+        self,
+        sources: Optional[List[EpisodeSource[T]]] = None,
+        source_ids: Optional[np.ndarray] = None,
+        local_ids: Optional[np.ndarray] = None,
+    ) -> None:
+        self._sources: List[EpisodeSource[T]] = (
+            sources if sources is not None else []
+        )
+        if source_ids is None or local_ids is None:
+            source_ids = np.concatenate(
+                [np.zeros(0, dtype=np.int32)]
+                + [
+                    np.full(len(src), i, dtype=np.int32)
+                    for i, src in enumerate(self._sources)
+                ]
+            )
+            local_ids = np.concatenate(
+                [np.zeros(0, dtype=np.int64)]
+                + [
+                    np.arange(len(src), dtype=np.int64)
+                    for src in self._sources
+                ]
+            )
+        self._source_ids = source_ids
+        self._local_ids = local_ids
+
+    def __len__(self) -> int:
+        return len(self._local_ids)
+
+    @overload
+    def __getitem__(self, index: int) -> T:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "LazyEpisodeSequence[T]":
+        ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.select(range(len(self))[index])
+        return self._sources[self._source_ids[index]].load(
+            int(self._local_ids[index])
+        )
+
+    def __iter__(self) -> Iterator[T]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def scene_id_at(self, index: int) -> str:
+        return self._sources[self._source_ids[index]].scene_id(
+            int(self._local_ids[index])
+        )
+
+    def episode_id_at(self, index: int) -> str:
+        return self._sources[self._source_ids[index]].episode_id(
+            int(self._local_ids[index])
+        )
+
+    def unique_scene_ids(self) -> List[str]:
+        return sorted({self.scene_id_at(i) for i in range(len(self))})
+
+    def refs(self) -> List[LazyEpisodeRef]:
+        return [LazyEpisodeRef(self, i) for i in range(len(self))]
+
+    def select(self, indices: Iterable[int]) -> "LazyEpisodeSequence[T]":
+        """Returns a new sequence with the episodes at :p:`indices`, in that
+        order, without building them.
+        """
+        indices = np.asarray(list(indices), dtype=np.int64)
+        return LazyEpisodeSequence(
+            self._sources, self._source_ids[indices], self._local_ids[indices]
+        )
+
+    def filter_scenes(
+        self, filter_fn: Callable[[LazyEpisodeRef], bool]
+    ) -> "LazyEpisodeSequence[T]":
+        """Selects the episodes for which :p:`filter_fn` is true. The filter
+        receives a :ref:`LazyEpisodeRef` so it may only use the
+        :py:`scene_id` and :py:`episode_id` of the episode.
+        """
+        return self.select(
+            i for i, ref in enumerate(self.refs()) if filter_fn(ref)
+        )
+
+    def extend(self, episodes: Iterable[T]) -> None:
+        if isinstance(episodes, LazyEpisodeSequence):
+            offset = len(self._sources)
+            self._sources = self._sources + episodes._sources
+            self._source_ids = np.concatenate(
+                [self._source_ids, episodes._source_ids + offset]
+            )
+            self._local_ids = np.concatenate(
+                [self._local_ids, episodes._local_ids]
+            )
+            return
+
+        for episode in episodes:
+            self.append(episode)
+
+    def append(self, episode: T) -> None:
+        if len(self._sources) == 0 or not isinstance(
+            self._sources[-1], _ListEpisodeSource
+        ):
+            self._sources = self._sources + [_ListEpisodeSource()]
+        source = self._sources[-1]
+        assert isinstance(source, _ListEpisodeSource)
+        source.episodes.append(episode)
+        self._source_ids = np.append(
+            self._source_ids, np.int32(len(self._sources) - 1)
+        )
+        self._local_ids = np.append(self._local_ids, np.int64(len(source) - 1))
+
+
 class Dataset(Generic[T]):
     """Base class for dataset specification."""
 
@@ -158,6 +351,8 @@ class Dataset(Generic[T]):
     @property
     def scene_ids(self) -> List[str]:
         """unique scene ids present in the dataset."""
+        if isinstance(self.episodes, LazyEpisodeSequence):
+            return self.episodes.unique_scene_ids()
         return sorted({episode.scene_id for episode in self.episodes})
 
     def get_scene_episodes(self, scene_id: str) -> List[T]:
@@ -166,6 +361,10 @@ class Dataset(Generic[T]):
         :param scene_id: id of scene in scene dataset.
         :return: list of episodes for the :p:`scene_id`.
         """
+        if isinstance(self.episodes, LazyEpisodeSequence):
+            return list(
+                self.episodes.filter_scenes(lambda x: x.scene_id == scene_id)
+            )
         return list(
             filter(lambda x: x.scene_id == scene_id, iter(self.episodes))
         )
@@ -196,9 +395,19 @@ class Dataset(Generic[T]):
         """
         Serialize the Dataset into JSON formatted string so it can be written to a file.
         """
+        if isinstance(self.episodes, LazyEpisodeSequence):
+            return self._with_built_episodes().to_json()
         result = DatasetJSONEncoder().encode(self)
         return result
 
+    def _with_built_episodes(self) -> "Dataset":
+        """Returns a shallow copy of the dataset where a
+        :ref:`LazyEpisodeSequence` is replaced by the list of its episodes.
+        """
+        new_dataset = copy.copy(self)
+        new_dataset.episodes = list(self.episodes)
+        return new_dataset
+
     def from_json(
         self, json_str: str, scenes_dir: Optional[str] = None
     ) -> None:
@@ -220,6 +429,15 @@ class Dataset(Generic[T]):
         :param filter_fn: function used to filter the episodes.
         :return: the new dataset.
         """
+        if isinstance(self.episodes, LazyEpisodeSequence):
+            new_dataset = copy.copy(self)
+            new_dataset.episodes = self.episodes.select(
+                i
+                for i, episode in enumerate(self.episodes)
+                if filter_fn(episode)
+            )
+            return new_dataset
+
         new_episodes = []
         for episode in self.episodes:
             if filter_fn(episode):
@@ -300,15 +518,37 @@ class Dataset(Generic[T]):
         rand_items = np.random.choice(
             self.num_episodes, num_episodes, replace=False
         ).tolist()
+        is_lazy = isinstance(self.episodes, LazyEpisodeSequence)
         if collate_scene_ids:
             scene_ids: Dict[str, List[int]] = {}
             for rand_ind in rand_items:
-                scene = self.episodes[rand_ind].scene_id
+                if is_lazy:
+                    scene = self.episodes.scene_id_at(rand_ind)  # type: ignore[attr-defined]
+                else:
+                    scene = self.episodes[rand_ind].scene_id
                 if scene not in scene_ids:
                     scene_ids[scene] = []
                 scene_ids[scene].append(rand_ind)
             rand_items = []
             list(map(rand_items.extend, scene_ids.values()))
+
+        if is_lazy:
+            # Splits share the sources of the lazy episodes
+            lazy_episodes = cast(LazyEpisodeSequence, self.episodes)
+            split_starts = np.cumsum([0] + split_lengths)
+            for nn in range(num_splits):
+                split_items = rand_items[
+                    split_starts[nn] : split_starts[nn + 1]
+                ]
+                if sort_by_episode_id:
+                    split_items.sort(key=lazy_episodes.episode_id_at)
+                new_dataset = copy.copy(self)
+                new_dataset.episodes = lazy_episodes.select(split_items)
+                new_datasets.append(new_dataset)
+            if remove_unused_episodes:
+                self.episodes = lazy_episodes.select(rand_items)
+            return new_datasets
+
         ep_ind = 0
         new_episodes = []
         for nn in range(num_splits):
@@ -381,6 +621,11 @@ class EpisodeIterator(Iterator[T]):
             random.seed(seed)
             np.random.seed(seed)
 
+        if isinstance(episodes, LazyEpisodeSequence):
+            # Order the episodes through lightweight references, they are
+            # only built when returned by the iterator
+            episodes = episodes.refs()  # type: ignore[assignment]
+
         # sample episodes
         if num_episode_sample >= 0:
             episodes = np.random.choice(  # type: ignore[assignment]
@@ -435,6 +680,9 @@ class EpisodeIterator(Iterator[T]):
 
             next_episode = next(self._iterator)
 
+        if isinstance(next_episode, LazyEpisodeRef):
+            next_episode = next_episode.load()
+
         if (
             self._prev_scene_id != next_episode.scene_id
             and self._prev_scene_id is not None
@@ -43,6 +43,9 @@ from habitat.utils.pickle5_multiprocessing import (
     CloudpickleWrapper,
     ConnectionWrapper,
 )
+from habitat.utils.profiler import get_profiler
+from habitat.utils.shared_action_buffer import SharedActionBuffer
+from habitat.utils.shared_observation_buffer import SharedObservationBuffer
 
 try:
     # Use torch.multiprocessing if we can.
@@ -65,6 +68,9 @@ RENDER_COMMAND = "render"
 CLOSE_COMMAND = "close"
 CALL_COMMAND = "call"
 COUNT_EPISODES_COMMAND = "count_episodes"
+SHARED_OBS_BUFFER_COMMAND = "shared_obs_buffer"
+STEP_BATCH_COMMAND = "step_batch"
+PROFILER_STATE_COMMAND = "profiler_state"
 
 EPISODE_OVER_NAME = "episode_over"
 GET_METRICS_NAME = "get_metrics"
@@ -132,6 +138,18 @@ class _WriteWrapper:
         self.read_wrapper.is_waiting = True
 
 
+@attr.s(auto_attribs=True, slots=True)
+class _SharedObservationReader:
+    r"""Read function that resolves the observation headers sent by a worker
+    using shared memory observations.
+    """
+    read_fn: Callable[[], Any]
+    obs_buffer: SharedObservationBuffer
+
+    def __call__(self) -> Any:
+        return self.obs_buffer.resolve(self.read_fn())
+
+
 class VectorEnv:
     r"""Vectorized environment which creates multiple processes where each
     process runs its own environment. Main class for parallelization of
@@ -151,6 +169,9 @@ class VectorEnv:
     _connection_read_fns: List[_ReadWrapper]
     _connection_write_fns: List[_WriteWrapper]
     _batch_renderer: Optional[EnvBatchRenderer] = None
+    _shared_obs_buffers: List[SharedObservationBuffer]
+    _shared_action_buffers: List[SharedActionBuffer]
+    _action_buffer_ranks: Set[int]
 
     def __init__(
         self,
@@ -159,6 +180,8 @@ class VectorEnv:
         auto_reset_done: bool = True,
         multiprocessing_start_method: str = "forkserver",
         workers_ignore_signals: bool = False,
+        shared_memory_observations: bool = False,
+        shared_memory_ring_size: int = 2,
     ) -> None:
         """..
 
@@ -176,8 +199,21 @@ class VectorEnv:
             used, the subproccess  must be started before any other GPU usage.
         :param workers_ignore_signals: Whether or not workers will ignore SIGINT and SIGTERM
             and instead will only exit when :ref:`close` is called
+        :param shared_memory_observations: If true, the workers write the
+            array observations into a preallocated shared memory ring laid
+            out from the observation space and only send a small header
+            through the pipe. The observations returned by :ref:`step` and
+            :ref:`reset` are then zero-copy views into the ring, see
+            :ref:`SharedObservationBuffer`.
+        :param shared_memory_ring_size: Number of observation slots per
+            environment when :p:`shared_memory_observations` is used. Returned
+            observations stay valid for :py:`shared_memory_ring_size - 1`
+            subsequent steps of the same environment.
         """
         self._is_closed = True
+        self._shared_obs_buffers = []
+        self._shared_action_buffers = []
+        self._action_buffer_ranks = set()
 
         assert (
             env_fn_args is not None and len(env_fn_args) > 0
@@ -226,6 +262,9 @@ class VectorEnv:
         ]
         self._paused: List[Tuple] = []
 
+        if shared_memory_observations:
+            self._setup_shared_observation_buffers(shared_memory_ring_size)
+
     @property
     def num_envs(self):
         r"""number of individual environments."""
@@ -243,6 +282,9 @@ class VectorEnv:
         parent_pipe: Optional[Connection] = None,
     ) -> None:
         r"""process worker for creating and interacting with the environment."""
+        obs_buffer: Optional[SharedObservationBuffer] = None
+        action_buffer: Optional[SharedActionBuffer] = None
+        action_row = 0
         if mask_signals:
             signal.signal(signal.SIGINT, signal.SIG_IGN)
             signal.signal(signal.SIGTERM, signal.SIG_IGN)
@@ -251,21 +293,41 @@ class VectorEnv:
             signal.signal(signal.SIGUSR2, signal.SIG_IGN)
 
         env = EnvCountEpisodeWrapper(EnvObsDictWrapper(env_fn(*env_fn_args)))
+        profiler = get_profiler()
         if parent_pipe is not None:
             parent_pipe.close()
         try:
             command, data = connection_read_fn()
             while command != CLOSE_COMMAND:
-                if command == STEP_COMMAND:
-                    observations, reward, done, info = env.step(data)
+                if command in (STEP_COMMAND, STEP_BATCH_COMMAND):
+                    if command == STEP_BATCH_COMMAND:
+                        if data is not None:
+                            # The action buffer was (re)created
+                            if action_buffer is not None:
+                                action_buffer.close()
+                            action_layout, action_row = data
+                            action_buffer = SharedActionBuffer.attach(
+                                action_layout
+                            )
+                        assert action_buffer is not None
+                        data = action_buffer.read(action_row)
+                    with profiler.scope("env.step"):
+                        observations, reward, done, info = env.step(data)
 
                     if auto_reset_done and done:
-                        observations = env.reset()
+                        with profiler.scope("env.reset"):
+                            observations = env.reset()
+
+                    if obs_buffer is not None:
+                        observations = obs_buffer.write(observations)
 
                     connection_write_fn((observations, reward, done, info))
 
                 elif command == RESET_COMMAND:
-                    observations = env.reset()
+                    with profiler.scope("env.reset"):
+                        observations = env.reset()
+                    if obs_buffer is not None:
+                        observations = obs_buffer.write(observations)
                     connection_write_fn(observations)
 
                 elif command == RENDER_COMMAND:
@@ -288,6 +350,13 @@ class VectorEnv:
                 elif command == COUNT_EPISODES_COMMAND:
                     connection_write_fn(len(env.episodes))
 
+                elif command == SHARED_OBS_BUFFER_COMMAND:
+                    obs_buffer = SharedObservationBuffer.attach(data)
+                    connection_write_fn(True)
+
+                elif command == PROFILER_STATE_COMMAND:
+                    connection_write_fn(profiler.get_state(reset=True))
+
                 else:
                     raise NotImplementedError(f"Unknown command {command}")
 
@@ -298,6 +367,10 @@ class VectorEnv:
         finally:
             if child_pipe is not None:
                 child_pipe.close()
+            if obs_buffer is not None:
+                obs_buffer.close()
+            if action_buffer is not None:
+                action_buffer.close()
             env.close()
 
     def _spawn_workers(
@@ -345,6 +418,27 @@ class VectorEnv:
 
         return read_fns, write_fns
 
+    def _setup_shared_observation_buffers(self, ring_size: int) -> None:
+        r"""Creates one shared observation ring per environment and hands it
+        to the worker. The read function of each worker then resolves the
+        headers it receives into views of its ring.
+        """
+        for read_fn, write_fn, obs_space in zip(
+            self._connection_read_fns,
+            self._connection_write_fns,
+            self.observation_spaces,
+        ):
+            obs_buffer = SharedObservationBuffer.create(obs_space, ring_size)
+            if obs_buffer is None:
+                continue
+            self._shared_obs_buffers.append(obs_buffer)
+
+            write_fn((SHARED_OBS_BUFFER_COMMAND, obs_buffer.layout))
+            read_fn()
+            read_fn.read_fn = _SharedObservationReader(
+                read_fn.read_fn, obs_buffer
+            )
+
     def current_episodes(self):
         for write_fn in self._connection_write_fns:
             write_fn((CALL_COMMAND, (CURRENT_EPISODE_NAME, None)))
@@ -377,6 +471,15 @@ class VectorEnv:
             results.append(read_fn())
         return results
 
+    def get_profiler_states(self) -> List[Dict[str, Any]]:
+        r"""Profiler states of the worker processes, see
+        :ref:`habitat.utils.profiler.Profiler.get_state`. The worker profilers
+        are reset so that each scope is returned once.
+        """
+        for write_fn in self._connection_write_fns:
+            write_fn((PROFILER_STATE_COMMAND, None))
+        return [read_fn() for read_fn in self._connection_read_fns]
+
     def reset(self):
         r"""Reset all the vectorized environments
 
@@ -419,6 +522,78 @@ class VectorEnv:
         self.async_step_at(index_env, action)
         return self.wait_step_at(index_env)
 
+    def async_step_batch(
+        self,
+        actions: np.ndarray,
+        index_start: int = 0,
+        low: Optional[Any] = None,
+        high: Optional[Any] = None,
+    ) -> None:
+        r"""Asynchronously step in :py:`len(actions)` consecutive
+        environments starting at :p:`index_start`.
+
+        The actions are written to a shared memory buffer with a single array
+        operation and each worker reads its own action from it, so only a
+        small command is sent through the pipe of each worker. Actions of
+        shape :py:`[num_envs]` are received by the environments as python
+        scalars, other actions as arrays.
+
+        :param actions: array with the action of each environment.
+        :param index_start: index of the environment of :py:`actions[0]`.
+        :param low: if not :py:`None`, lower bound the actions are clipped to.
+        :param high: if not :py:`None`, upper bound the actions are clipped
+            to.
+        """
+        self._warn_cuda_tensors(actions)
+        actions = np.asarray(actions)
+        read_fns = self._connection_read_fns[
+            index_start : index_start + len(actions)
+        ]
+        assert len(read_fns) == len(actions), (
+            f"Got {len(actions)} actions for {len(read_fns)} environments "
+            f"starting at {index_start}"
+        )
+        for read_fn in read_fns:
+            if read_fn.is_waiting:
+                raise RuntimeError(
+                    f"Tried to write to process {read_fn.rank}"
+                    " but the last write has not been read"
+                )
+
+        if len(
+            self._shared_action_buffers
+        ) == 0 or not self._shared_action_buffers[-1].matches(actions):
+            # Previous buffers are kept alive as workers that are still
+            # stepping may not have attached to them yet.
+            self._shared_action_buffers.append(
+                SharedActionBuffer.create(
+                    self._num_envs, actions.shape[1:], actions.dtype
+                )
+            )
+            self._action_buffer_ranks = set()
+        action_buffer = self._shared_action_buffers[-1]
+
+        ranks = [read_fn.rank for read_fn in read_fns]
+        rows: Union[slice, List[int]] = ranks
+        if len(ranks) > 0 and ranks == list(
+            range(ranks[0], ranks[0] + len(ranks))
+        ):
+            rows = slice(ranks[0], ranks[0] + len(ranks))
+        action_buffer.write(rows, actions, low, high)
+
+        for rank, write_fn in zip(
+            ranks,
+            self._connection_write_fns[
+                index_start : index_start + len(actions)
+            ],
+        ):
+            if rank in self._action_buffer_ranks:
+                write_fn((STEP_BATCH_COMMAND, None))
+            else:
+                # Workers attach to the buffer on their first batched step
+                write_fn((STEP_BATCH_COMMAND, (action_buffer.layout, rank)))
+                self._action_buffer_ranks.add(rank)
+
     def async_step(self, data: Sequence[Union[int, np.ndarray]]) -> None:
         r"""Asynchronously step in the environments.
 
@@ -478,6 +653,14 @@ class VectorEnv:
         for _, _, _, process in self._paused:
             process.join()
 
+        for obs_buffer in self._shared_obs_buffers:
+            obs_buffer.close()
+        self._shared_obs_buffers = []
+
+        for action_buffer in self._shared_action_buffers:
+            action_buffer.close()
+        self._shared_action_buffers = []
+
         self._is_closed = True
 
         if self._batch_renderer != None:
@@ -629,6 +812,11 @@ class ThreadedVectorEnv(VectorEnv):
     performance.
     """
 
+    def get_profiler_states(self) -> List[Dict[str, Any]]:
+        # The worker threads record their scopes in the profiler of this
+        # process.
+        return []
+
     def _spawn_workers(
         self,
         env_fn_args: Sequence[Tuple],
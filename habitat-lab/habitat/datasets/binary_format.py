@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Meta Platforms, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+"""
+Helpers for the columnar binary dataset format.
+
+A binary dataset is a dict of flat numpy arrays plus a JSON serializable
+:py:`"meta"` entry. It is stored as an uncompressed :py:`.npz` archive so that
+:ref:`load_columnar` can memory map every array instead of reading it.
+Variable length data (goals, paths, ...) is stored as ragged arrays: a flat
+array of values and an :py:`offsets` array such that the values of item
+:py:`i` are :py:`values[offsets[i] : offsets[i + 1]]`.
+
+Large datasets can be written as several self-contained shards with
+:ref:`ColumnarWriter`, in which case the arrays of shard :py:`k` are prefixed
+with :py:`"k/"`, see :ref:`split_shards`.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import zipfile
+from typing import (
+    Any,
+    Collection,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+)
+
+import attr
+import numpy as np
+
+from habitat.core.utils import DatasetJSONEncoder
+
+META_KEY = "meta"
+SHARDS_KEY = "shards"
+BINARY_DATASET_EXT = ".npz"
+
+# Layout of a zip local file header, see the zipfile module
+_ZIP_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+
+
+class StringInterner:
+    """Assigns consecutive integer ids to strings in O(1) per string."""
+
+    def __init__(self) -> None:
+        self._ids: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __call__(self, value: str) -> int:
+        idx = self._ids.get(value, None)
+        if idx is None:
+            idx = len(self._ids)
+            self._ids[value] = idx
+        return idx
+
+    def table(self) -> np.ndarray:
+        """The interned strings, indexed by id."""
+        return np.array(list(self._ids.keys()), dtype=np.str_)
+
+
+def ragged_offsets(lengths: Iterable[int]) -> np.ndarray:
+    """Offsets of a ragged array from the length of each item."""
+    return np.concatenate(
+        [np.zeros(1, dtype=np.int64), np.cumsum(list(lengths), dtype=np.int64)]
+    )
+
+
+def to_float_list(value: Any) -> Optional[List[float]]:
+    """Converts a position or rotation (list, array or quaternion) to a list
+    of floats.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return DatasetJSONEncoder().default(value)
+
+
+def float_rows(
+    rows: Sequence[Optional[Sequence[float]]],
+    width: int,
+    dtype: Type[np.floating] = np.float64,
+) -> np.ndarray:
+    """Packs rows of :p:`width` floats in a :p:`dtype` array, rows that are
+    :py:`None` are filled with NaN. The default :py:`float64` keeps the JSON
+    values exactly.
+    """
+    out = np.full((len(rows), width), np.nan, dtype=dtype)
+    for i, row in enumerate(rows):
+        if row is not None:
+            out[i] = row
+    return out
+
+
+def float_row_to_list(row: np.ndarray) -> Optional[List[float]]:
+    """Inverse of :ref:`float_rows` for a single row."""
+    if np.isnan(row).all():
+        return None
+    return row.tolist()
+
+
+def attr_extras(obj: Any, skip_fields: Collection[str]) -> Dict[str, Any]:
+    """The init fields of an attrs object that are not in :p:`skip_fields`
+    and differ from their default value. Used to store the fields that don't
+    have a dedicated column.
+    """
+    extras = {}
+    for field in attr.fields(type(obj)):
+        if not field.init or field.name in skip_fields:
+            continue
+        value = getattr(obj, field.name)
+        if (
+            field.default is not attr.NOTHING
+            and not isinstance(field.default, attr.Factory)  # type: ignore[arg-type]
+            and not isinstance(value, np.ndarray)
+            and value == field.default
+        ):
+            continue
+        extras[field.name] = value
+    return extras
+
+
+def encode_json_blob(
+    items: Sequence[Any], cls: Optional[Type[json.JSONEncoder]] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Serializes each item to JSON and packs them in a ragged byte array.
+
+    :param items: the items to serialize.
+    :param cls: optional JSON encoder class.
+    :return: the :py:`uint8` blob and its offsets.
+    """
+    encoded = [json.dumps(item, cls=cls).encode("utf-8") for item in items]
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return blob, ragged_offsets(map(len, encoded))
+
+
+def decode_json_blob(blob: np.ndarray, offsets: np.ndarray, index: int) -> Any:
+    """Decodes the item at :p:`index` of a blob built by
+    :ref:`encode_json_blob`.
+    """
+    return json.loads(
+        blob[offsets[index] : offsets[index + 1]].tobytes().decode("utf-8")
+    )
+
+
+class ColumnarWriter:
+    r"""Streams the arrays of a binary dataset to an uncompressed :py:`.npz`
+    file, so that a dataset can be written shard by shard without holding
+    every shard in memory. The file can be read with :ref:`load_columnar`.
+
+    :param path: path of the :py:`.npz` file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._zf = zipfile.ZipFile(
+            path, "w", compression=zipfile.ZIP_STORED, allowZip64=True
+        )
+        self._num_shards = 0
+
+    @property
+    def num_shards(self) -> int:
+        return self._num_shards
+
+    def _write_array(self, key: str, value: Any) -> None:
+        arr = np.asarray(value)
+        assert not arr.dtype.hasobject, f"Cannot store object array `{key}`"
+        with self._zf.open(key + ".npy", "w", force_zip64=True) as f:
+            np.lib.format.write_array(f, arr, allow_pickle=False)
+
+    def write(self, data: Dict[str, Any], prefix: str = "") -> None:
+        """Writes the arrays of :p:`data`, its :py:`"meta"` entry is
+        ignored.
+        """
+        for key, value in data.items():
+            if key != META_KEY:
+                self._write_array(prefix + key, value)
+
+    def write_shard(self, data: Dict[str, Any]) -> None:
+        """Writes the arrays of :p:`data` as the next shard."""
+        self.write(data, prefix=f"{self._num_shards}/")
+        self._num_shards += 1
+
+    def close(self, meta: Dict[str, Any]) -> None:
+        """Writes :p:`meta` and closes the file. The number of shards is
+        added to :p:`meta` if shards were written.
+        """
+        if self._num_shards > 0:
+            meta = {**meta, SHARDS_KEY: self._num_shards}
+        self._write_array(
+            META_KEY,
+            np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8),
+        )
+        self._zf.close()
+
+
+def save_columnar(path: str, data: Dict[str, Any]) -> None:
+    """Writes a binary dataset dict to an uncompressed :py:`.npz` file."""
+    writer = ColumnarWriter(path)
+    writer.write(data)
+    writer.close(data.get(META_KEY, {}))
+
+
+def save_columnar_atomic(path: str, data: Dict[str, Any]) -> None:
+    """Like :ref:`save_columnar` but the file only appears at :p:`path` once
+    it is complete, so concurrent readers and writers never see a partial
+    file.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{id(data)}.tmp"
+    try:
+        save_columnar(tmp_path, data)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def decoded_cache_path(cache_dir: str, path: str, namespace: str) -> str:
+    """Path of the decoded binary copy of the dataset file :p:`path` in
+    :p:`cache_dir`. The key includes the modification time and size of the
+    file so modified files are decoded again.
+
+    :param cache_dir: directory of the cache.
+    :param path: path of the source dataset file.
+    :param namespace: distinguishes the formats of different dataset
+        classes decoding the same file.
+    """
+    stat = os.stat(path)
+    key = ":".join(
+        [
+            namespace,
+            os.path.abspath(path),
+            str(stat.st_mtime_ns),
+            str(stat.st_size),
+        ]
+    )
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    name = os.path.basename(path).split(".")[0]
+    return os.path.join(cache_dir, f"{name}-{digest}{BINARY_DATASET_EXT}")
+
+
+def split_shards(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Splits a binary dataset dict written by :ref:`ColumnarWriter` in one
+    dict per shard. A dict without shards is returned as is.
+    """
+    meta = data[META_KEY]
+    if SHARDS_KEY not in meta:
+        return [data]
+
+    shards: List[Dict[str, Any]] = [
+        {META_KEY: meta} for _ in range(meta[SHARDS_KEY])
+    ]
+    for key, value in data.items():
+        if key == META_KEY:
+            continue
+        shard, _, name = key.partition("/")
+        shards[int(shard)][name] = value
+    return shards
+
+
+def _open_member_array(
+    f: Any, info: zipfile.ZipInfo, path: str, mmap: bool
+) -> np.ndarray:
+    f.seek(info.header_offset)
+    fields = _ZIP_LOCAL_HEADER.unpack(f.read(_ZIP_LOCAL_HEADER.size))
+    filename_length, extra_length = fields[10], fields[11]
+    f.seek(
+        info.header_offset
+        + _ZIP_LOCAL_HEADER.size
+        + filename_length
+        + extra_length
+    )
+    version = np.lib.format.read_magic(f)
+    if version == (1, 0):
+        shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+    else:
+        shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+    offset = f.tell()
+
+    if not mmap or int(np.prod(shape)) == 0:
+        arr = np.fromfile(
+            f, dtype=dtype, count=int(np.prod(shape, dtype=np.int64))
+        )
+        return arr.reshape(shape, order="F" if fortran_order else "C")
+
+    return np.memmap(
+        path,
+        dtype=dtype,
+        mode="r",
+        offset=offset,
+        shape=shape,
+        order="F" if fortran_order else "C",
+    )
+
+
+def load_columnar(path: str, mmap: bool = True) -> Dict[str, Any]:
+    """Loads a binary dataset dict written by :ref:`save_columnar`.
+
+    :param path: path to the :py:`.npz` file.
+    :param mmap: if true, the arrays are memory mapped read-only instead of
+        being read, so only the pages of the episodes that are used are
+        loaded and they are shared between processes.
+    """
+    data: Dict[str, Any] = {}
+    with zipfile.ZipFile(path) as zf, open(path, "rb") as f:
+        for info in zf.infolist():
+            key = info.filename[: -len(".npy")]
+            if info.compress_type != zipfile.ZIP_STORED:
+                with zf.open(info) as member:
+                    data[key] = np.lib.format.read_array(member)
+            else:
+                data[key] = _open_member_array(f, info, path, mmap)
+
+    data[META_KEY] = json.loads(
+        np.asarray(data[META_KEY]).tobytes().decode("utf-8")
+    )
+    return data
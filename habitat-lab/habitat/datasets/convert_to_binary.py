@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Meta Platforms, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+"""
+Converts a PointNav or ObjectNav dataset split from :py:`.json.gz` to the
+memory mapped :py:`.npz` binary format. The main file and every per-scene
+content file are converted next to the originals, and the main file points to
+the converted content files, so the split can be loaded by pointing
+:py:`habitat.dataset.data_path` to the :py:`.npz` main file:
+
+.. code:: sh
+
+    python -m habitat.datasets.convert_to_binary \\
+        --type PointNav-v1 \\
+        --data-path data/datasets/pointnav/habitat-test-scenes/v1/train/train.json.gz
+"""
+
+import argparse
+import glob
+import os
+
+from tqdm import tqdm
+
+from habitat.core.registry import registry
+from habitat.datasets.binary_format import BINARY_DATASET_EXT, save_columnar
+from habitat.datasets.pointnav.pointnav_dataset import PointNavDatasetV1
+
+JSON_DATASET_EXT = ".json.gz"
+
+
+def _binary_path(path: str) -> str:
+    assert path.endswith(JSON_DATASET_EXT), path
+    return path[: -len(JSON_DATASET_EXT)] + BINARY_DATASET_EXT
+
+
+def _convert_file(
+    template: PointNavDatasetV1, src: str, content_scenes_path: str
+) -> None:
+    dataset = template._empty_copy()
+    dataset._load_from_file(src, scenes_dir=None)
+    dataset.content_scenes_path = content_scenes_path
+    save_columnar(_binary_path(src), dataset.to_binary())
+
+
+def convert_dataset(dataset_type: str, data_path: str) -> None:
+    dataset_cls = registry.get_dataset(dataset_type)
+    assert dataset_cls is not None and issubclass(
+        dataset_cls, PointNavDatasetV1
+    ), f"Unsupported dataset type {dataset_type}"
+
+    dataset = dataset_cls()
+    dataset._load_from_file(data_path, scenes_dir=None)
+    content_scenes_path = _binary_path(dataset.content_scenes_path)
+    _convert_file(dataset, data_path, content_scenes_path)
+
+    content_dir = os.path.join(os.path.dirname(data_path), "content")
+    for content_path in tqdm(
+        sorted(glob.glob(os.path.join(content_dir, "*" + JSON_DATASET_EXT)))
+    ):
+        _convert_file(dataset, content_path, content_scenes_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--type",
+        type=str,
+        default="PointNav-v1",
+        help="Registered name of the dataset class",
+    )
+    parser.add_argument(
+        "--data-path",
+        type=str,
+        required=True,
+        help="Path to the .json.gz main file of the split",
+    )
+    args = parser.parse_args()
+
+    convert_dataset(args.type, args.data_path)
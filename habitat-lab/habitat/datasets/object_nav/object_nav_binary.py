@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Meta Platforms, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+"""
+Columnar binary codec for the goals shared between ObjectNav episodes. The
+goals of every goals key are stored in flat arrays next to the episode
+columns of :ref:`habitat.datasets.pointnav.pointnav_binary` and are only
+built the first time a goals key is requested.
+"""
+
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    MutableMapping,
+    Optional,
+    Sequence,
+)
+
+import attr
+import numpy as np
+
+from habitat.core.simulator import AgentState
+from habitat.core.utils import DatasetJSONEncoder
+from habitat.datasets.binary_format import (
+    StringInterner,
+    decode_json_blob,
+    encode_json_blob,
+    float_row_to_list,
+    float_rows,
+    ragged_offsets,
+    to_float_list,
+)
+from habitat.tasks.nav.object_nav_task import ObjectGoal, ObjectViewLocation
+
+# Goal fields stored in dedicated columns
+_GOAL_COLUMNS = {"position", "radius", "view_points"}
+
+
+def _goal_extras(goal: ObjectGoal) -> Dict[str, Any]:
+    extras = {
+        field.name: getattr(goal, field.name)
+        for field in attr.fields(type(goal))
+        if field.init and field.name not in _GOAL_COLUMNS
+    }
+    if goal.view_points is None:
+        extras["view_points"] = None
+    return extras
+
+
+def encode_object_goals(
+    goals_by_category: Dict[str, Sequence[ObjectGoal]]
+) -> Dict[str, Any]:
+    r"""Encodes the goals of an ObjectNav dataset to the columnar binary
+    format.
+
+    :param goals_by_category: goals of each goals key.
+    :return: arrays to merge in the dict of
+        :ref:`habitat.datasets.pointnav.pointnav_binary.encode_navigation_episodes`.
+    """
+    key_interner = StringInterner()
+    goals: List[ObjectGoal] = []
+    goal_lengths = []
+    for key, key_goals in goals_by_category.items():
+        key_interner(key)
+        for goal in key_goals:
+            if type(goal) is not ObjectGoal:
+                raise NotImplementedError(
+                    f"Binary format does not support goals of type {type(goal)}"
+                )
+        goals.extend(key_goals)
+        goal_lengths.append(len(key_goals))
+
+    view_points = [vp for g in goals for vp in (g.view_points or [])]
+    extras_blob, extras_offsets = encode_json_blob(
+        [_goal_extras(g) for g in goals], cls=DatasetJSONEncoder
+    )
+
+    return {
+        "goal_key_table": key_interner.table(),
+        "goal_key_offsets": ragged_offsets(goal_lengths),
+        "goal_position": float_rows(
+            [to_float_list(g.position) for g in goals], 3
+        ),
+        "goal_radius": np.array(
+            [np.nan if g.radius is None else g.radius for g in goals],
+            dtype=np.float64,
+        ),
+        "goal_extras_blob": extras_blob,
+        "goal_extras_offsets": extras_offsets,
+        "view_point_offsets": ragged_offsets(
+            len(g.view_points or []) for g in goals
+        ),
+        "view_point_position": float_rows(
+            [to_float_list(vp.agent_state.position) for vp in view_points], 3
+        ),
+        "view_point_rotation": float_rows(
+            [to_float_list(vp.agent_state.rotation) for vp in view_points], 4
+        ),
+        "view_point_iou": np.array(
+            [np.nan if vp.iou is None else vp.iou for vp in view_points],
+            dtype=np.float64,
+        ),
+    }
+
+
+class ObjectGoalsSource:
+    r"""Builds the goals of a goals key on demand from the arrays of
+    :ref:`encode_object_goals`, which may be memory mapped.
+    """
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        self._data = data
+        self._key_to_index: Dict[str, int] = {
+            key: i for i, key in enumerate(data["goal_key_table"].tolist())
+        }
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._key_to_index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._key_to_index)
+
+    def _view_points(self, goal_index: int) -> List[ObjectViewLocation]:
+        data = self._data
+        start, end = data["view_point_offsets"][goal_index : goal_index + 2]
+        return [
+            ObjectViewLocation(
+                agent_state=AgentState(
+                    position=position.tolist(),
+                    rotation=float_row_to_list(rotation),
+                ),
+                iou=None if np.isnan(iou) else float(iou),
+            )
+            for position, rotation, iou in zip(
+                data["view_point_position"][start:end],
+                data["view_point_rotation"][start:end],
+                data["view_point_iou"][start:end],
+            )
+        ]
+
+    def load(self, key: str) -> List[ObjectGoal]:
+        data = self._data
+        key_index = self._key_to_index[key]
+        goals = []
+        for i in range(*data["goal_key_offsets"][key_index : key_index + 2]):
+            extras = decode_json_blob(
+                data["goal_extras_blob"], data["goal_extras_offsets"], i
+            )
+            radius = data["goal_radius"][i]
+            if "view_points" not in extras:
+                extras["view_points"] = self._view_points(i)
+            goals.append(
+                ObjectGoal(
+                    position=data["goal_position"][i].tolist(),
+                    radius=None if np.isnan(radius) else float(radius),
+                    **extras,
+                )
+            )
+        return goals
+
+
+class LazyGoalsByCategory(MutableMapping[str, Sequence[ObjectGoal]]):
+    r"""A :py:`goals_by_category` mapping that builds the goals of the binary
+    sources it was given the first time they are accessed. Goals added
+    directly take precedence over the sources. The keys of the sources are
+    part of the mapping even before their goals are built.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        self._goals: Dict[str, Sequence[ObjectGoal]] = dict(*args, **kwargs)
+        self._sources: List[ObjectGoalsSource] = []
+
+    def add_source(self, source: ObjectGoalsSource) -> None:
+        self._sources.append(source)
+
+    def _find_source(self, key: object) -> Optional[ObjectGoalsSource]:
+        for source in self._sources:
+            if key in source:
+                return source
+        return None
+
+    def __getitem__(self, key: str) -> Sequence[ObjectGoal]:
+        if key in self._goals:
+            return self._goals[key]
+        source = self._find_source(key)
+        if source is None:
+            raise KeyError(key)
+        goals = source.load(key)
+        self._goals[key] = goals
+        return goals
+
+    def __setitem__(self, key: str, goals: Sequence[ObjectGoal]) -> None:
+        self._goals[key] = goals
+
+    def __delitem__(self, key: str) -> None:
+        # Keys of the sources can't be removed, they would be loaded again
+        if self._find_source(key) is not None:
+            raise TypeError(f"Cannot delete the goals of source key {key}")
+        del self._goals[key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._goals or self._find_source(key) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._goals
+        for i, source in enumerate(self._sources):
+            for key in source:
+                if key not in self._goals and all(
+                    key not in prev for prev in self._sources[:i]
+                ):
+                    yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def materialize(self) -> Dict[str, Sequence[ObjectGoal]]:
+        """Builds the goals of every source and returns them as a plain
+        dict.
+        """
+        return {key: self[key] for key in self}
@@ -5,15 +5,25 @@
 # LICENSE file in the root directory of this source tree.
 
 import json
-import os
+from functools import partial
 from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
 
+from habitat.core.dataset import LazyEpisodeSequence
 from habitat.core.registry import registry
 from habitat.core.simulator import AgentState, ShortestPathPoint
 from habitat.core.utils import DatasetFloatJSONEncoder
+from habitat.datasets.binary_format import META_KEY
+from habitat.datasets.object_nav.object_nav_binary import (
+    LazyGoalsByCategory,
+    ObjectGoalsSource,
+    encode_object_goals,
+)
+from habitat.datasets.pointnav.pointnav_binary import (
+    NavigationEpisodeSource,
+    encode_navigation_episodes,
+)
 from habitat.datasets.pointnav.pointnav_dataset import (
     CONTENT_SCENES_PATH_FIELD,
-    DEFAULT_SCENE_PATH_PREFIX,
     PointNavDatasetV1,
 )
 from habitat.tasks.nav.object_nav_task import (
@@ -34,6 +44,7 @@ class ObjectNavDatasetV1(PointNavDatasetV1):
     episodes: List[ObjectGoalNavEpisode] = []  # type: ignore
     content_scenes_path: str = "{data_path}/content/{scene}.json.gz"
     goals_by_category: Dict[str, Sequence[ObjectGoal]]
+    _binary_episode_cls = ObjectGoalNavEpisode
 
     @staticmethod
     def dedup_goals(dataset: Dict[str, Any]) -> Dict[str, Any]:
@@ -58,6 +69,16 @@ class ObjectNavDatasetV1(PointNavDatasetV1):
         return dataset
 
     def to_json(self) -> str:
+        if isinstance(self.episodes, LazyEpisodeSequence) or isinstance(
+            self.goals_by_category, LazyGoalsByCategory
+        ):
+            dataset = self._with_built_episodes()
+            if isinstance(self.goals_by_category, LazyGoalsByCategory):
+                dataset.goals_by_category = (  # type: ignore[attr-defined]
+                    self.goals_by_category.materialize()
+                )
+            return dataset.to_json()
+
         for i in range(len(self.episodes)):
             self.episodes[i].goals = []
 
@@ -71,10 +92,16 @@ class ObjectNavDatasetV1(PointNavDatasetV1):
 
         return result
 
+    def _empty_copy(self) -> "ObjectNavDatasetV1":
+        dataset = super()._empty_copy()
+        dataset.goals_by_category = {}
+        return dataset  # type: ignore[return-value]
+
     def __init__(self, config: Optional["DictConfig"] = None) -> None:
         self.goals_by_category = {}
         super().__init__(config)
-        self.episodes = list(self.episodes)
+        if not isinstance(self.episodes, LazyEpisodeSequence):
+            self.episodes = list(self.episodes)
 
     @staticmethod
     def __deserialize_goal(serialized_goal: Dict[str, Any]) -> ObjectGoal:
@@ -87,13 +114,7 @@ class ObjectNavDatasetV1(PointNavDatasetV1):
 
         return g
 
-    def from_json(
-        self, json_str: str, scenes_dir: Optional[str] = None
-    ) -> None:
-        deserialized = json.loads(json_str)
-        if CONTENT_SCENES_PATH_FIELD in deserialized:
-            self.content_scenes_path = deserialized[CONTENT_SCENES_PATH_FIELD]
-
+    def _set_category_mappings(self, deserialized: Dict[str, Any]) -> None:
         if "category_to_task_category_id" in deserialized:
             self.category_to_task_category_id = deserialized[
                 "category_to_task_category_id"
@@ -117,6 +138,62 @@ class ObjectNavDatasetV1(PointNavDatasetV1):
             self.category_to_scene_annotation_category_id.keys()
         ), "category_to_task and category_to_mp3d must have the same keys"
 
+    def to_binary(self) -> Dict[str, Any]:
+        self._check_binary_episode_types()
+        data = encode_navigation_episodes(self.episodes, encode_goals=False)
+        goals_by_category = self.goals_by_category
+        if isinstance(goals_by_category, LazyGoalsByCategory):
+            goals_by_category = goals_by_category.materialize()
+        data.update(encode_object_goals(goals_by_category))
+        data[META_KEY].update(
+            {
+                CONTENT_SCENES_PATH_FIELD: self.content_scenes_path,
+                "category_to_task_category_id": self.category_to_task_category_id,
+                "category_to_scene_annotation_category_id": self.category_to_scene_annotation_category_id,
+            }
+        )
+        return data
+
+    def from_binary(
+        self, data_dict: Dict[str, Any], scenes_dir: Optional[str] = None
+    ) -> None:
+        meta = data_dict[META_KEY]
+        if CONTENT_SCENES_PATH_FIELD in meta:
+            self.content_scenes_path = meta[CONTENT_SCENES_PATH_FIELD]
+
+        self._set_category_mappings(meta)
+
+        if len(data_dict["episode_id"]) == 0:
+            return
+
+        if not isinstance(self.goals_by_category, LazyGoalsByCategory):
+            self.goals_by_category = LazyGoalsByCategory(
+                self.goals_by_category
+            )
+        self.goals_by_category.add_source(ObjectGoalsSource(data_dict))
+
+        self._add_episode_source(
+            NavigationEpisodeSource(
+                data_dict,
+                self._binary_episode_cls,
+                scene_id_fn=partial(
+                    self._resolve_scene_id, scenes_dir=scenes_dir
+                ),
+                goals_fn=lambda episode: self.goals_by_category[
+                    episode.goals_key  # type: ignore[attr-defined]
+                ],
+            )
+        )
+
+    def from_json(
+        self, json_str: str, scenes_dir: Optional[str] = None
+    ) -> None:
+        deserialized = json.loads(json_str)
+        if CONTENT_SCENES_PATH_FIELD in deserialized:
+            self.content_scenes_path = deserialized[CONTENT_SCENES_PATH_FIELD]
+
+        self._set_category_mappings(deserialized)
+
         if len(deserialized["episodes"]) == 0:
             return
 
@@ -129,14 +206,9 @@ class ObjectNavDatasetV1(PointNavDatasetV1):
         for i, episode in enumerate(deserialized["episodes"]):
             episode = ObjectGoalNavEpisode(**episode)
             episode.episode_id = str(i)
-
-            if scenes_dir is not None:
-                if episode.scene_id.startswith(DEFAULT_SCENE_PATH_PREFIX):
-                    episode.scene_id = episode.scene_id[
-                        len(DEFAULT_SCENE_PATH_PREFIX) :
-                    ]
-
-                episode.scene_id = os.path.join(scenes_dir, episode.scene_id)
+            episode.scene_id = self._resolve_scene_id(
+                episode.scene_id, scenes_dir
+            )
 
             episode.goals = self.goals_by_category[episode.goals_key]
 
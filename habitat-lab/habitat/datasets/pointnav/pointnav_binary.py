@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Meta Platforms, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+"""
+Columnar binary codec for :ref:`NavigationEpisode` datasets. Positions,
+rotations, shortest paths and goal radii are stored in flat :py:`float64`
+arrays so that decoding is lossless, scene ids and scene dataset configs are
+interned and the remaining episode fields are stored as a per-episode JSON
+blob. Episodes are only built when they are accessed, see
+:ref:`NavigationEpisodeSource`.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Sequence, Type
+
+import numpy as np
+
+from habitat.core.dataset import EpisodeSource
+from habitat.core.simulator import ShortestPathPoint
+from habitat.core.utils import DatasetJSONEncoder
+from habitat.datasets.binary_format import (
+    META_KEY,
+    StringInterner,
+    attr_extras,
+    decode_json_blob,
+    encode_json_blob,
+    float_row_to_list,
+    float_rows,
+    ragged_offsets,
+    to_float_list,
+)
+from habitat.tasks.nav.nav import NavigationEpisode, NavigationGoal
+
+BINARY_FORMAT_NAME = "habitat-nav-columnar"
+BINARY_FORMAT_VERSION = 1
+
+# Episode fields stored in dedicated columns, every other field of the
+# episode class goes to the per-episode JSON blob.
+_EPISODE_COLUMNS = {
+    "episode_id",
+    "scene_id",
+    "scene_dataset_config",
+    "start_position",
+    "start_rotation",
+    "goals",
+    "shortest_paths",
+}
+_NO_ACTION = -1
+
+
+def encode_navigation_episodes(
+    episodes: Sequence[NavigationEpisode], encode_goals: bool = True
+) -> Dict[str, Any]:
+    r"""Encodes episodes to the columnar binary format.
+
+    :param episodes: episodes to encode.
+    :param encode_goals: whether to store the goals of each episode. Datasets
+        sharing goals between episodes (like ObjectNav) store them
+        separately.
+    :return: a pickle and :ref:`save_columnar` compatible dict.
+    """
+    scene_interner = StringInterner()
+    config_interner = StringInterner()
+
+    goals: List[NavigationGoal] = []
+    goal_lengths = []
+    paths: List[List[ShortestPathPoint]] = []
+    path_lengths = []
+    has_paths = np.zeros(len(episodes), dtype=bool)
+    for i, ep in enumerate(episodes):
+        if encode_goals:
+            for goal in ep.goals:
+                if type(goal) is not NavigationGoal:
+                    raise NotImplementedError(
+                        f"Binary format does not support goals of type {type(goal)}"
+                    )
+            goals.extend(ep.goals)
+            goal_lengths.append(len(ep.goals))
+        if ep.shortest_paths is not None:
+            has_paths[i] = True
+            paths.extend(ep.shortest_paths)
+            path_lengths.append(len(ep.shortest_paths))
+        else:
+            path_lengths.append(0)
+
+    points = [point for path in paths for point in path]
+    for point in points:
+        if point.action is not None and not isinstance(
+            point.action, (int, np.integer)
+        ):
+            raise NotImplementedError(
+                f"Binary format only supports integer actions, got {point.action}"
+            )
+
+    extras = [attr_extras(ep, _EPISODE_COLUMNS) for ep in episodes]
+    for ep, ep_extras in zip(episodes, extras):
+        # The episode_id column holds strings, keep the other ids as is
+        if not isinstance(ep.episode_id, str):
+            ep_extras["episode_id"] = ep.episode_id
+    extras_blob, extras_offsets = encode_json_blob(
+        extras, cls=DatasetJSONEncoder
+    )
+
+    data: Dict[str, Any] = {
+        META_KEY: {
+            "format": BINARY_FORMAT_NAME,
+            "version": BINARY_FORMAT_VERSION,
+        },
+        "episode_id": np.array(
+            [str(ep.episode_id) for ep in episodes], dtype=np.str_
+        ),
+        "scene_index": np.array(
+            [scene_interner(ep.scene_id) for ep in episodes], dtype=np.int32
+        ),
+        "scene_dataset_config_index": np.array(
+            [config_interner(ep.scene_dataset_config) for ep in episodes],
+            dtype=np.int32,
+        ),
+        "start_position": float_rows(
+            [to_float_list(ep.start_position) for ep in episodes], 3
+        ),
+        "start_rotation": float_rows(
+            [to_float_list(ep.start_rotation) for ep in episodes], 4
+        ),
+        "extras_blob": extras_blob,
+        "extras_offsets": extras_offsets,
+        "has_shortest_paths": has_paths,
+        "path_offsets": ragged_offsets(path_lengths),
+        "point_offsets": ragged_offsets(map(len, paths)),
+        "point_position": float_rows(
+            [to_float_list(p.position) for p in points], 3
+        ),
+        "point_rotation": float_rows(
+            [to_float_list(p.rotation) for p in points], 4
+        ),
+        "point_action": np.array(
+            [_NO_ACTION if p.action is None else p.action for p in points],
+            dtype=np.int32,
+        ),
+    }
+    data["scene_table"] = scene_interner.table()
+    data["scene_dataset_config_table"] = config_interner.table()
+    if encode_goals:
+        data["goal_offsets"] = ragged_offsets(goal_lengths)
+        data["goal_position"] = float_rows(
+            [to_float_list(g.position) for g in goals], 3
+        )
+        data["goal_radius"] = np.array(
+            [np.nan if g.radius is None else g.radius for g in goals],
+            dtype=np.float64,
+        )
+
+    return data
+
+
+def check_binary_format(data: Dict[str, Any]) -> None:
+    meta = data[META_KEY]
+    if (
+        meta.get("format", None) != BINARY_FORMAT_NAME
+        or meta.get("version", None) != BINARY_FORMAT_VERSION
+    ):
+        raise ValueError(
+            f"Unsupported binary dataset format {meta.get('format', None)} "
+            f"version {meta.get('version', None)}"
+        )
+
+
+class NavigationEpisodeSource(EpisodeSource[NavigationEpisode]):
+    r"""Builds :ref:`NavigationEpisode` on demand from the arrays of
+    :ref:`encode_navigation_episodes`, which may be memory mapped.
+
+    :param data: the binary dataset dict.
+    :param episode_cls: class of the episodes to build.
+    :param scene_id_fn: applied once to each interned scene id, used to
+        prepend the scenes directory.
+    :param goals_fn: if not :py:`None`, returns the goals of a built episode
+        instead of reading them from :p:`data`.
+    """
+
+    def __init__(
+        self,
+        data: Dict[str, Any],
+        episode_cls: Type[NavigationEpisode] = NavigationEpisode,
+        scene_id_fn: Optional[Callable[[str], str]] = None,
+        goals_fn: Optional[
+            Callable[[NavigationEpisode], List[NavigationGoal]]
+        ] = None,
+    ) -> None:
+        check_binary_format(data)
+        self._data = data
+        self._episode_cls = episode_cls
+        self._goals_fn = goals_fn
+        scene_table = data["scene_table"].tolist()
+        if scene_id_fn is not None:
+            scene_table = [scene_id_fn(s) for s in scene_table]
+        self._scene_table: List[str] = scene_table
+        self._config_table: List[str] = data[
+            "scene_dataset_config_table"
+        ].tolist()
+
+    def __len__(self) -> int:
+        return len(self._data["episode_id"])
+
+    def scene_id(self, index: int) -> str:
+        return self._scene_table[self._data["scene_index"][index]]
+
+    def episode_id(self, index: int) -> str:
+        return str(self._data["episode_id"][index])
+
+    def _shortest_paths(
+        self, index: int
+    ) -> Optional[List[List[ShortestPathPoint]]]:
+        data = self._data
+        if not data["has_shortest_paths"][index]:
+            return None
+
+        point_offsets = data["point_offsets"]
+        paths = []
+        for path_index in range(
+            data["path_offsets"][index], data["path_offsets"][index + 1]
+        ):
+            start, end = (
+                point_offsets[path_index],
+                point_offsets[path_index + 1],
+            )
+            actions = data["point_action"][start:end].tolist()
+            paths.append(
+                [
+                    ShortestPathPoint(
+                        position=float_row_to_list(position),
+                        rotation=float_row_to_list(rotation),
+                        action=None if action == _NO_ACTION else action,
+                    )
+                    for position, rotation, action in zip(
+                        data["point_position"][start:end],
+                        data["point_rotation"][start:end],
+                        actions,
+                    )
+                ]
+            )
+        return paths
+
+    def _goals(self, index: int) -> List[NavigationGoal]:
+        data = self._data
+        start, end = data["goal_offsets"][index : index + 2]
+        return [
+            NavigationGoal(
+                position=position.tolist(),
+                radius=None if np.isnan(radius) else float(radius),
+            )
+            for position, radius in zip(
+                data["goal_position"][start:end],
+                data["goal_radius"][start:end],
+            )
+        ]
+
+    def load(self, index: int) -> NavigationEpisode:
+        data = self._data
+        extras = decode_json_blob(
+            data["extras_blob"], data["extras_offsets"], index
+        )
+        episode = self._episode_cls(
+            episode_id=extras.pop("episode_id", self.episode_id(index)),
+            scene_id=self.scene_id(index),
+            scene_dataset_config=self._config_table[
+                data["scene_dataset_config_index"][index]
+            ],
+            start_position=data["start_position"][index].tolist(),
+            start_rotation=data["start_rotation"][index].tolist(),
+            goals=[] if self._goals_fn is not None else self._goals(index),
+            shortest_paths=self._shortest_paths(index),
+            **extras,
+        )
+        if self._goals_fn is not None:
+            episode.goals = self._goals_fn(episode)
+        return episode
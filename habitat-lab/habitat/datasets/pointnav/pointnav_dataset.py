@@ -4,15 +4,38 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+import copy
 import gzip
 import json
 import os
 import pickle
-from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from functools import partial
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Type
 
 from habitat.config import read_write
-from habitat.core.dataset import ALL_SCENES_MASK, Dataset
+from habitat.core.dataset import (
+    ALL_SCENES_MASK,
+    Dataset,
+    EpisodeSource,
+    LazyEpisodeSequence,
+)
 from habitat.core.registry import registry
+from habitat.datasets.binary_format import (
+    BINARY_DATASET_EXT,
+    META_KEY,
+    decoded_cache_path,
+    load_columnar,
+    save_columnar_atomic,
+)
+from habitat.datasets.pointnav.pointnav_binary import (
+    NavigationEpisodeSource,
+    encode_navigation_episodes,
+)
 from habitat.tasks.nav.nav import (
     NavigationEpisode,
     NavigationGoal,
@@ -25,6 +48,31 @@ if TYPE_CHECKING:
 
 CONTENT_SCENES_PATH_FIELD = "content_scenes_path"
 DEFAULT_SCENE_PATH_PREFIX = "data/scene_datasets/"
+LOAD_WORKERS_TYPES = ("thread", "process")
+
+
+def _decode_to_binary(
+    template: "PointNavDatasetV1", fname: str
+) -> Optional[Dict[str, Any]]:
+    """Decodes a dataset file to the binary format, scene ids are kept
+    relative. Returns :py:`None` if the dataset has no binary format.
+    """
+    dataset = template._empty_copy()
+    dataset._load_from_file(fname, scenes_dir=None)
+    try:
+        return dataset.to_binary()
+    except NotImplementedError:
+        return None
+
+
+def _write_decoded_cache(
+    template: "PointNavDatasetV1", fname: str, cache_path: str
+) -> bool:
+    data = _decode_to_binary(template, fname)
+    if data is None:
+        return False
+    save_columnar_atomic(cache_path, data)
+    return True
 
 
 @registry.register_dataset(name="PointNav-v1")
@@ -33,6 +81,8 @@ class PointNavDatasetV1(Dataset):
 
     episodes: List[NavigationEpisode]
     content_scenes_path: str = "{data_path}/content/{scene}.json.gz"
+    # Class of the episodes stored in the binary format
+    _binary_episode_cls: Type[NavigationEpisode] = NavigationEpisode
 
     @staticmethod
     def check_config_paths_exist(config: "DictConfig") -> bool:
@@ -91,20 +141,123 @@ class PointNavDatasetV1(Dataset):
         scenes.sort()
         return scenes
 
+    @staticmethod
+    def _resolve_scene_id(scene_id: str, scenes_dir: Optional[str]) -> str:
+        if scenes_dir is None:
+            return scene_id
+
+        if scene_id.startswith(DEFAULT_SCENE_PATH_PREFIX):
+            scene_id = scene_id[len(DEFAULT_SCENE_PATH_PREFIX) :]
+
+        return os.path.join(scenes_dir, scene_id)
+
     def _load_from_file(self, fname: str, scenes_dir: str) -> None:
         """
-        Load the data from a file into `self.episodes`. This can load `.pickle`
-        or `.json.gz` file formats.
+        Load the data from a file into `self.episodes`. This can load `.pickle`,
+        `.npz` (memory mapped binary format) or `.json.gz` file formats.
         """
 
         if fname.endswith(".pickle"):
-            # NOTE: not implemented for pointnav
             with open(fname, "rb") as f:
                 self.from_binary(pickle.load(f), scenes_dir=scenes_dir)
+        elif fname.endswith(BINARY_DATASET_EXT):
+            self.from_binary(load_columnar(fname), scenes_dir=scenes_dir)
         else:
             with gzip.open(fname, "rt") as f:
                 self.from_json(f.read(), scenes_dir=scenes_dir)
 
+    def _empty_copy(self) -> "PointNavDatasetV1":
+        """Shallow copy of the dataset without episodes, used as a template
+        to decode dataset files in workers.
+        """
+        dataset = copy.copy(self)
+        dataset.episodes = []
+        return dataset
+
+    @staticmethod
+    def _make_load_executor(
+        config: "DictConfig", num_workers: int
+    ) -> Optional[Executor]:
+        if num_workers <= 1:
+            return None
+        if config.load_workers_type == "thread":
+            return ThreadPoolExecutor(num_workers)
+        elif config.load_workers_type == "process":
+            return ProcessPoolExecutor(num_workers)
+        raise ValueError(
+            f"Unknown load_workers_type '{config.load_workers_type}', "
+            f"expected one of {LOAD_WORKERS_TYPES}"
+        )
+
+    def _load_from_files(
+        self, fnames: List[str], config: "DictConfig"
+    ) -> None:
+        """
+        Load the data from several files, in order. With
+        `config.num_load_workers` > 1 the files are decoded in parallel to
+        the binary format, and with `config.decoded_cache_dir` the decoded
+        files are kept on disk so that later loads, from any process, only
+        memory map them.
+        """
+        use_cache = config.decoded_cache_dir is not None
+        num_workers = min(config.num_load_workers, len(fnames))
+        if not use_cache and num_workers <= 1:
+            for fname in fnames:
+                self._load_from_file(fname, config.scenes_dir)
+            return
+
+        template = self._empty_copy()
+        executor = self._make_load_executor(config, num_workers)
+        map_fn = executor.map if executor is not None else map
+        try:
+            if use_cache:
+                self._load_through_cache(fnames, config, template, map_fn)
+            else:
+                for fname, data in zip(
+                    fnames,
+                    map_fn(partial(_decode_to_binary, template), fnames),
+                ):
+                    if data is None:
+                        self._load_from_file(fname, config.scenes_dir)
+                    else:
+                        self.from_binary(data, scenes_dir=config.scenes_dir)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def _load_through_cache(
+        self,
+        fnames: List[str],
+        config: "DictConfig",
+        template: "PointNavDatasetV1",
+        map_fn: Any,
+    ) -> None:
+        os.makedirs(config.decoded_cache_dir, exist_ok=True)
+        namespace = f"{type(self).__module__}.{type(self).__qualname__}"
+        cache_paths: List[Optional[str]] = [
+            None
+            if fname.endswith((BINARY_DATASET_EXT, ".pickle"))
+            else decoded_cache_path(config.decoded_cache_dir, fname, namespace)
+            for fname in fnames
+        ]
+        missing = [
+            (fname, cache_path)
+            for fname, cache_path in zip(fnames, cache_paths)
+            if cache_path is not None and not os.path.exists(cache_path)
+        ]
+        if len(missing) > 0:
+            list(
+                map_fn(
+                    partial(_write_decoded_cache, template),
+                    *zip(*missing),
+                )
+            )
+
+        for fname, cache_path in zip(fnames, cache_paths):
+            if cache_path is not None and os.path.exists(cache_path):
+                fname = cache_path
+            self._load_from_file(fname, config.scenes_dir)
+
     def __init__(self, config: Optional["DictConfig"] = None) -> None:
         self.episodes = []
 
@@ -113,7 +266,7 @@ class PointNavDatasetV1(Dataset):
 
         datasetfile_path = config.data_path.format(split=config.split)
 
-        self._load_from_file(datasetfile_path, config.scenes_dir)
+        self._load_from_files([datasetfile_path], config)
 
         # Read separate file for each scene
         dataset_dir = os.path.dirname(datasetfile_path)
@@ -130,25 +283,79 @@ class PointNavDatasetV1(Dataset):
                     dataset_dir=dataset_dir,
                 )
 
-            for scene in scenes:
-                scene_filename = self.content_scenes_path.format(
-                    data_path=dataset_dir, scene=scene
-                )
-
-                self._load_from_file(scene_filename, config.scenes_dir)
+            self._load_from_files(
+                [
+                    self.content_scenes_path.format(
+                        data_path=dataset_dir, scene=scene
+                    )
+                    for scene in scenes
+                ],
+                config,
+            )
 
+        elif isinstance(self.episodes, LazyEpisodeSequence):
+            self.episodes = self.episodes.filter_scenes(
+                self.build_content_scenes_filter(config)
+            )
         else:
             self.episodes = list(
                 filter(self.build_content_scenes_filter(config), self.episodes)
             )
 
+    def _add_episode_source(self, source: EpisodeSource) -> None:
+        """Appends the episodes of :p:`source` to `self.episodes` without
+        building them.
+        """
+        lazy_episodes: LazyEpisodeSequence = LazyEpisodeSequence([source])
+        if isinstance(self.episodes, LazyEpisodeSequence):
+            self.episodes.extend(lazy_episodes)
+        elif len(self.episodes) == 0:
+            self.episodes = lazy_episodes  # type: ignore[assignment]
+        else:
+            episodes: LazyEpisodeSequence = LazyEpisodeSequence()
+            episodes.extend(self.episodes)
+            episodes.extend(lazy_episodes)
+            self.episodes = episodes  # type: ignore[assignment]
+
+    def _check_binary_episode_types(self) -> None:
+        for episode in self.episodes:
+            if type(episode) is not self._binary_episode_cls:
+                raise NotImplementedError(
+                    f"{type(self).__name__} binary format does not support "
+                    f"episodes of type {type(episode)}"
+                )
+
     def to_binary(self) -> Dict[str, Any]:
-        raise NotImplementedError()
+        """
+        Serialize the dataset to the columnar binary format. The returned dict
+        can be pickled or written with
+        :ref:`habitat.datasets.binary_format.save_columnar`.
+        """
+        self._check_binary_episode_types()
+        data = encode_navigation_episodes(self.episodes)
+        data[META_KEY][CONTENT_SCENES_PATH_FIELD] = self.content_scenes_path
+        return data
 
     def from_binary(
         self, data_dict: Dict[str, Any], scenes_dir: Optional[str] = None
     ) -> None:
-        raise NotImplementedError()
+        """
+        Load the dataset from the columnar binary format. Episodes are built
+        lazily when they are accessed.
+        """
+        meta = data_dict[META_KEY]
+        if CONTENT_SCENES_PATH_FIELD in meta:
+            self.content_scenes_path = meta[CONTENT_SCENES_PATH_FIELD]
+
+        self._add_episode_source(
+            NavigationEpisodeSource(
+                data_dict,
+                self._binary_episode_cls,
+                scene_id_fn=partial(
+                    self._resolve_scene_id, scenes_dir=scenes_dir
+                ),
+            )
+        )
 
     def from_json(
         self, json_str: str, scenes_dir: Optional[str] = None
@@ -159,14 +366,9 @@ class PointNavDatasetV1(Dataset):
 
         for episode in deserialized["episodes"]:
             episode = NavigationEpisode(**episode)
-
-            if scenes_dir is not None:
-                if episode.scene_id.startswith(DEFAULT_SCENE_PATH_PREFIX):
-                    episode.scene_id = episode.scene_id[
-                        len(DEFAULT_SCENE_PATH_PREFIX) :
-                    ]
-
-                episode.scene_id = os.path.join(scenes_dir, episode.scene_id)
+            episode.scene_id = self._resolve_scene_id(
+                episode.scene_id, scenes_dir
+            )
 
             for g_index, goal in enumerate(episode.goals):
                 episode.goals[g_index] = NavigationGoal(**goal)
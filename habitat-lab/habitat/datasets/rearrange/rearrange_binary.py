@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Meta Platforms, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+"""
+Columnar binary codec for :ref:`RearrangeEpisode` datasets. Every object,
+receptacle, marker and link name is interned in a per-shard name table, all
+the transforms of a shard are stored in a single :py:`[N, 4, 4]` array and
+the per-episode lists (rigid objects, targets, articulated object states,
+markers, receptacles) are stored as ragged arrays. The remaining episode
+fields are stored as a per-episode JSON blob. Values are kept in
+:py:`float64` so that decoding is lossless.
+
+Episodes are only built when accessed, see :ref:`RearrangeEpisodeSource`, and
+:ref:`RearrangeBinaryWriter` streams shards of episodes to a file.
+"""
+
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Sequence,
+    Tuple,
+    Type,
+)
+
+import numpy as np
+
+from habitat.core.dataset import EpisodeSource
+from habitat.core.utils import DatasetJSONEncoder
+from habitat.datasets.binary_format import (
+    META_KEY,
+    ColumnarWriter,
+    StringInterner,
+    attr_extras,
+    decode_json_blob,
+    encode_json_blob,
+    float_row_to_list,
+    float_rows,
+    ragged_offsets,
+    to_float_list,
+)
+
+if TYPE_CHECKING:
+    from habitat.datasets.rearrange.rearrange_dataset import RearrangeEpisode
+
+BINARY_FORMAT_NAME = "habitat-rearrange-columnar"
+BINARY_FORMAT_VERSION = 1
+
+# Episode fields stored in dedicated columns, every other field goes to the
+# per-episode JSON blob.
+_EPISODE_COLUMNS = {
+    "episode_id",
+    "scene_id",
+    "scene_dataset_config",
+    "start_position",
+    "start_rotation",
+    "rigid_objs",
+    "targets",
+    "ao_states",
+    "markers",
+    "name_to_receptacle",
+}
+
+
+def binary_format_meta() -> Dict[str, Any]:
+    return {"format": BINARY_FORMAT_NAME, "version": BINARY_FORMAT_VERSION}
+
+
+def is_binary_format(data: Dict[str, Any]) -> bool:
+    meta = data.get(META_KEY, None)
+    return isinstance(meta, dict) and meta.get("format") == BINARY_FORMAT_NAME
+
+
+def encode_rearrange_episodes(
+    episodes: Iterable["RearrangeEpisode"],
+) -> Dict[str, Any]:
+    r"""Encodes episodes to the columnar binary format. Interning is O(1)
+    per name, so encoding is linear in the size of the episodes.
+
+    :param episodes: episodes to encode.
+    :return: a pickle and :ref:`save_columnar` compatible dict.
+    """
+    names = StringInterner()
+    scenes = StringInterner()
+    configs = StringInterner()
+
+    scene_index: List[int] = []
+    config_index: List[int] = []
+    start_position: List[Any] = []
+    start_rotation: List[Any] = []
+    extras: List[Dict[str, Any]] = []
+    transforms: List[Any] = []
+
+    rigid_obj_lengths: List[int] = []
+    rigid_obj_name: List[int] = []
+    rigid_obj_transform: List[int] = []
+    target_lengths: List[int] = []
+    target_name: List[int] = []
+    target_transform: List[int] = []
+    ao_state_lengths: List[int] = []
+    ao_state_name: List[int] = []
+    ao_state_link: List[int] = []
+    ao_state_value: List[float] = []
+    marker_lengths: List[int] = []
+    marker_name: List[int] = []
+    marker_type: List[int] = []
+    marker_link: List[int] = []
+    marker_object: List[int] = []
+    marker_offset: List[Any] = []
+    receptacle_lengths: List[int] = []
+    receptacle_object: List[int] = []
+    receptacle_name: List[int] = []
+
+    for ep in episodes:
+        scene_index.append(scenes(ep.scene_id))
+        config_index.append(configs(ep.scene_dataset_config))
+        start_position.append(to_float_list(ep.start_position))
+        start_rotation.append(to_float_list(ep.start_rotation))
+        extras.append(attr_extras(ep, _EPISODE_COLUMNS))
+
+        rigid_obj_lengths.append(len(ep.rigid_objs))
+        for name, transform in ep.rigid_objs:
+            rigid_obj_name.append(names(name))
+            rigid_obj_transform.append(len(transforms))
+            transforms.append(transform)
+
+        target_lengths.append(len(ep.targets))
+        for name, transform in ep.targets.items():
+            target_name.append(names(name))
+            target_transform.append(len(transforms))
+            transforms.append(transform)
+
+        ao_state_lengths.append(
+            sum(len(states) for states in ep.ao_states.values())
+        )
+        for name, states in ep.ao_states.items():
+            for link, value in states.items():
+                ao_state_name.append(names(name))
+                ao_state_link.append(int(link))
+                ao_state_value.append(value)
+
+        marker_lengths.append(len(ep.markers))
+        for marker in ep.markers:
+            marker_name.append(names(marker["name"]))
+            marker_type.append(names(marker["type"]))
+            marker_link.append(names(marker["params"]["link"]))
+            marker_object.append(names(marker["params"]["object"]))
+            marker_offset.append(to_float_list(marker["params"]["offset"]))
+
+        receptacle_lengths.append(len(ep.name_to_receptacle))
+        for name, receptacle in ep.name_to_receptacle.items():
+            receptacle_object.append(names(name))
+            receptacle_name.append(names(receptacle))
+
+    extras_blob, extras_offsets = encode_json_blob(
+        extras, cls=DatasetJSONEncoder
+    )
+    return {
+        META_KEY: binary_format_meta(),
+        "name_table": names.table(),
+        "scene_table": scenes.table(),
+        "scene_index": np.array(scene_index, dtype=np.int32),
+        "scene_dataset_config_table": configs.table(),
+        "scene_dataset_config_index": np.array(config_index, dtype=np.int32),
+        "start_position": float_rows(start_position, 3, np.float64),
+        "start_rotation": float_rows(start_rotation, 4, np.float64),
+        "extras_blob": extras_blob,
+        "extras_offsets": extras_offsets,
+        "transforms": np.array(transforms, dtype=np.float64).reshape(-1, 4, 4),
+        "rigid_obj_offsets": ragged_offsets(rigid_obj_lengths),
+        "rigid_obj_name": np.array(rigid_obj_name, dtype=np.int32),
+        "rigid_obj_transform": np.array(rigid_obj_transform, dtype=np.int64),
+        "target_offsets": ragged_offsets(target_lengths),
+        "target_name": np.array(target_name, dtype=np.int32),
+        "target_transform": np.array(target_transform, dtype=np.int64),
+        "ao_state_offsets": ragged_offsets(ao_state_lengths),
+        "ao_state_name": np.array(ao_state_name, dtype=np.int32),
+        "ao_state_link": np.array(ao_state_link, dtype=np.int32),
+        "ao_state_value": np.array(ao_state_value, dtype=np.float64),
+        "marker_offsets": ragged_offsets(marker_lengths),
+        "marker_name": np.array(marker_name, dtype=np.int32),
+        "marker_type": np.array(marker_type, dtype=np.int32),
+        "marker_link": np.array(marker_link, dtype=np.int32),
+        "marker_object": np.array(marker_object, dtype=np.int32),
+        "marker_offset": float_rows(marker_offset, 3, np.float64),
+        "receptacle_offsets": ragged_offsets(receptacle_lengths),
+        "receptacle_object": np.array(receptacle_object, dtype=np.int32),
+        "receptacle_name": np.array(receptacle_name, dtype=np.int32),
+    }
+
+
+class RearrangeEpisodeSource(EpisodeSource["RearrangeEpisode"]):
+    r"""Builds :ref:`RearrangeEpisode` on demand from the arrays of
+    :ref:`encode_rearrange_episodes`, which may be memory mapped.
+
+    :param data: the arrays of a single shard.
+    :param episode_cls: class of the episodes to build.
+    :param episode_id_offset: the episode ids of the shard start at this
+        value. Like the JSON format, episode ids are the index of the
+        episode in the file.
+    """
+
+    def __init__(
+        self,
+        data: Dict[str, Any],
+        episode_cls: Type["RearrangeEpisode"],
+        episode_id_offset: int = 0,
+    ) -> None:
+        if not is_binary_format(data):
+            raise ValueError("Unsupported rearrange binary dataset format")
+        self._data = data
+        self._episode_cls = episode_cls
+        self._episode_id_offset = episode_id_offset
+        self._names: List[str] = data["name_table"].tolist()
+        self._scene_table: List[str] = data["scene_table"].tolist()
+        self._config_table: List[str] = data[
+            "scene_dataset_config_table"
+        ].tolist()
+
+    def __len__(self) -> int:
+        return len(self._data["scene_index"])
+
+    def scene_id(self, index: int) -> str:
+        return self._scene_table[self._data["scene_index"][index]]
+
+    def episode_id(self, index: int) -> str:
+        return str(self._episode_id_offset + index)
+
+    def _span(self, column: str, index: int) -> Tuple[int, int]:
+        offsets = self._data[column]
+        return int(offsets[index]), int(offsets[index + 1])
+
+    def _named_transforms(
+        self, prefix: str, index: int
+    ) -> List[Tuple[str, np.ndarray]]:
+        data = self._data
+        start, end = self._span(f"{prefix}_offsets", index)
+        return [
+            (self._names[name], np.array(data["transforms"][transform]))
+            for name, transform in zip(
+                data[f"{prefix}_name"][start:end].tolist(),
+                data[f"{prefix}_transform"][start:end].tolist(),
+            )
+        ]
+
+    def _ao_states(self, index: int) -> Dict[str, Dict[int, float]]:
+        data = self._data
+        start, end = self._span("ao_state_offsets", index)
+        ao_states: Dict[str, Dict[int, float]] = {}
+        for name, link, value in zip(
+            data["ao_state_name"][start:end].tolist(),
+            data["ao_state_link"][start:end].tolist(),
+            data["ao_state_value"][start:end].tolist(),
+        ):
+            ao_states.setdefault(self._names[name], {})[link] = value
+        return ao_states
+
+    def _markers(self, index: int) -> List[Dict[str, Any]]:
+        data = self._data
+        names = self._names
+        start, end = self._span("marker_offsets", index)
+        return [
+            {
+                "name": names[name],
+                "type": names[mtype],
+                "params": {
+                    "offset": np.array(offset),
+                    "link": names[link],
+                    "object": names[obj],
+                },
+            }
+            for name, mtype, link, obj, offset in zip(
+                data["marker_name"][start:end].tolist(),
+                data["marker_type"][start:end].tolist(),
+                data["marker_link"][start:end].tolist(),
+                data["marker_object"][start:end].tolist(),
+                data["marker_offset"][start:end],
+            )
+        ]
+
+    def _name_to_receptacle(self, index: int) -> Dict[str, str]:
+        data = self._data
+        start, end = self._span("receptacle_offsets", index)
+        return {
+            self._names[name]: self._names[receptacle]
+            for name, receptacle in zip(
+                data["receptacle_object"][start:end].tolist(),
+                data["receptacle_name"][start:end].tolist(),
+            )
+        }
+
+    def load(self, index: int) -> "RearrangeEpisode":
+        data = self._data
+        extras = decode_json_blob(
+            data["extras_blob"], data["extras_offsets"], index
+        )
+        return self._episode_cls(
+            episode_id=self.episode_id(index),
+            scene_id=self.scene_id(index),
+            scene_dataset_config=self._config_table[
+                data["scene_dataset_config_index"][index]
+            ],
+            start_position=float_row_to_list(data["start_position"][index]),
+            start_rotation=float_row_to_list(data["start_rotation"][index]),
+            rigid_objs=self._named_transforms("rigid_obj", index),
+            targets=dict(self._named_transforms("target", index)),
+            ao_states=self._ao_states(index),
+            markers=self._markers(index),
+            name_to_receptacle=self._name_to_receptacle(index),
+            **extras,
+        )
+
+
+class RearrangeBinaryWriter:
+    r"""Streams episodes to a binary :py:`.npz` dataset file, one shard at a
+    time, so that large datasets never need to be held in memory. Each shard
+    has its own name table and is decoded independently.
+
+    .. code:: py
+
+        with RearrangeBinaryWriter("dataset.npz") as writer:
+            for episodes in episode_shards:
+                writer.write_shard(episodes)
+    """
+
+    def __init__(self, path: str) -> None:
+        self._writer = ColumnarWriter(path)
+
+    @property
+    def num_shards(self) -> int:
+        return self._writer.num_shards
+
+    def write_shard(self, episodes: Sequence["RearrangeEpisode"]) -> None:
+        self._writer.write_shard(encode_rearrange_episodes(episodes))
+
+    def close(self) -> None:
+        self._writer.close(binary_format_meta())
+
+    def __enter__(self) -> "RearrangeBinaryWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
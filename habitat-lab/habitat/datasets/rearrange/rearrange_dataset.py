@@ -10,10 +10,16 @@ from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 import attr
 import numpy as np
 
-from habitat.core.dataset import Episode
+from habitat.core.dataset import Episode, LazyEpisodeSequence
 from habitat.core.registry import registry
 from habitat.core.utils import DatasetFloatJSONEncoder
+from habitat.datasets.binary_format import split_shards
 from habitat.datasets.pointnav.pointnav_dataset import PointNavDatasetV1
+from habitat.datasets.rearrange.rearrange_binary import (
+    RearrangeEpisodeSource,
+    encode_rearrange_episodes,
+    is_binary_format,
+)
 from habitat.datasets.utils import check_and_gen_physics_config
 
 if TYPE_CHECKING:
@@ -49,6 +55,8 @@ class RearrangeDatasetV0(PointNavDatasetV1):
     content_scenes_path: str = "{data_path}/content/{scene}.json.gz"
 
     def to_json(self) -> str:
+        if isinstance(self.episodes, LazyEpisodeSequence):
+            return self._with_built_episodes().to_json()
         result = DatasetFloatJSONEncoder().encode(self)
         return result
 
@@ -77,89 +85,37 @@ class RearrangeDatasetV0(PointNavDatasetV1):
 
     def to_binary(self) -> Dict[str, Any]:
         """
-        Serialize the dataset to a pickle compatible Dict.
+        Serialize the dataset to a pickle compatible Dict. The Dict can also
+        be written with :ref:`habitat.datasets.binary_format.save_columnar`
+        and loaded lazily from a :py:`.npz` file. Use
+        :ref:`habitat.datasets.rearrange.rearrange_binary.RearrangeBinaryWriter`
+        to write large datasets in shards.
         """
-
-        def access_idx(k, name_to_idx):
-            if len(name_to_idx) == 0:
-                name_to_idx[k] = 0
-            if k not in name_to_idx:
-                name_to_idx[k] = max(name_to_idx.values()) + 1
-            return name_to_idx[k]
-
-        def encode_name_dict(d, name_to_idx):
-            ret_d = {}
-            for k, v in d.items():
-                ret_d[access_idx(k, name_to_idx)] = v
-            return ret_d
-
-        all_transforms: List[Any] = []
-        name_to_idx: Dict[str, int] = {}
-        all_eps = []
-
-        for ep in self.episodes:
-            new_ep_data = attr.asdict(ep)
-            rigid_objs = []
-            for name, T in ep.rigid_objs:
-                rigid_objs.append(
-                    [access_idx(name, name_to_idx), len(all_transforms)]
-                )
-                all_transforms.append(T)
-
-            name_to_recep = []
-            for name, recep in ep.name_to_receptacle.items():
-                name_to_recep.append(
-                    [
-                        access_idx(name, name_to_idx),
-                        access_idx(recep, name_to_idx),
-                    ]
-                )
-            new_ep_data["rigid_objs"] = np.array(rigid_objs)
-            new_ep_data["ao_states"] = encode_name_dict(
-                ep.ao_states, name_to_idx
-            )
-            new_ep_data["name_to_receptacle"] = np.array(name_to_recep)
-            new_ep_data["additional_obj_config_paths"] = list(
-                new_ep_data["additional_obj_config_paths"]
-            )
-            del new_ep_data["_shortest_path_cache"]
-
-            new_markers = []
-            for marker_data in ep.markers:
-                new_markers.append(
-                    [
-                        access_idx(marker_data["name"], name_to_idx),
-                        access_idx(marker_data["type"], name_to_idx),
-                        np.array(marker_data["params"]["offset"]),
-                        access_idx(marker_data["params"]["link"], name_to_idx),
-                        access_idx(
-                            marker_data["params"]["object"], name_to_idx
-                        ),
-                    ]
-                )
-
-            new_ep_data["markers"] = new_markers
-
-            all_eps.append(new_ep_data)
-
-        idx_to_name = {}
-        for k, v in name_to_idx.items():
-            # idx_to_name should define a 1-1 mapping between the name and the
-            # name index.
-            assert v not in idx_to_name
-            idx_to_name[v] = k
-
-        return {
-            "all_transforms": np.array(all_transforms),
-            "idx_to_name": idx_to_name,
-            "all_eps": all_eps,
-        }
+        return encode_rearrange_episodes(self.episodes)
 
     def from_binary(
         self, data_dict: Dict[str, Any], scenes_dir: Optional[str] = None
     ) -> None:
         """
-        Load the dataset from a pickle compatible Dict.
+        Load the dataset from a pickle compatible Dict. Episodes are built
+        lazily when they are accessed.
+        """
+        if not is_binary_format(data_dict):
+            self._from_legacy_binary(data_dict)
+            return
+
+        episode_id_offset = 0
+        for shard in split_shards(data_dict):
+            source = RearrangeEpisodeSource(
+                shard, RearrangeEpisode, episode_id_offset
+            )
+            episode_id_offset += len(source)
+            self._add_episode_source(source)
+
+    def _from_legacy_binary(self, data_dict: Dict[str, Any]) -> None:
+        """
+        Load the dataset from the Dict format written before the columnar
+        binary format.
         """
         all_T = data_dict["all_transforms"]
         idx_to_name = data_dict["idx_to_name"]
@@ -74,6 +74,7 @@ class RearrangeEpisodeGenerator:
         debug_visualization: bool = False,
         limit_scene_set: Optional[str] = None,
         num_episodes: int = 1,
+        sim_seed: Optional[int] = None,
     ) -> None:
         """
         Initialize the generator object for a particular configuration.
@@ -83,11 +84,15 @@ class RearrangeEpisodeGenerator:
         :param debug_visualization: Whether or not to generate debug images and videos.
         :param limit_scene_set: Option to limit all generation to a single scene set.
         :param num_episodes: The number of episodes which this RearrangeEpisodeGenerator will generate. Accuracy required only for BalancedSceneSampler.
+        :param sim_seed: If set, the Simulator is seeded each time a scene is initialized from a RNG with this seed, which makes navmesh point sampling reproducible. The global python RNG is left untouched.
         """
         # load and cache the config
         self.cfg = cfg
         self.start_cfg = self.cfg.copy()
         self._limit_scene_set = limit_scene_set
+        self._sim_rng: Optional[random.Random] = (
+            None if sim_seed is None else random.Random(sim_seed)
+        )
 
         # debug visualization settings
         self._render_debug_obs = self._make_debug_video = debug_visualization
@@ -430,6 +435,8 @@ class RearrangeEpisodeGenerator:
         cur_scene_name = self._scene_sampler.sample()
         logger.info(f"Initializing scene {cur_scene_name}")
         self.initialize_sim(cur_scene_name, self.cfg.dataset_path)
+        if self._sim_rng is not None:
+            self.sim.seed(self._sim_rng.randrange(2**31))
 
         return cur_scene_name
 
@@ -450,10 +457,17 @@ class RearrangeEpisodeGenerator:
             self.dbv.debug_obs.append(self.dbv.get_observation())
 
     def generate_episodes(
-        self, num_episodes: int = 1, verbose: bool = False
+        self,
+        num_episodes: int = 1,
+        verbose: bool = False,
+        episode_offset: int = 0,
     ) -> List[RearrangeEpisode]:
         """
         Generate a fixed number of episodes.
+
+        :param num_episodes: The number of episodes to generate.
+        :param verbose: Whether or not to display a progress bar.
+        :param episode_offset: Index of the first generated episode in the full set of episodes. Used by the BalancedSceneSampler to pick the scenes when the episodes are generated in several parts.
         """
         generated_episodes: List[RearrangeEpisode] = []
         failed_episodes = 0
@@ -461,7 +475,9 @@ class RearrangeEpisodeGenerator:
             pbar = tqdm(total=num_episodes)
         while len(generated_episodes) < num_episodes:
             try:
-                self._scene_sampler.set_cur_episode(len(generated_episodes))
+                self._scene_sampler.set_cur_episode(
+                    episode_offset + len(generated_episodes)
+                )
                 new_episode = self.generate_single_episode()
             except Exception:
                 new_episode = None
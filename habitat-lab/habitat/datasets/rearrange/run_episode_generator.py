@@ -4,16 +4,20 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+import gzip
+import multiprocessing
 import os
 import os.path as osp
 import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Any, List
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 import numpy as np
 from omegaconf import OmegaConf
 
 from habitat.core.logging import logger
+from habitat.datasets.rearrange.combine_datasets import combine_datasets
 from habitat.datasets.rearrange.rearrange_dataset import RearrangeDatasetV0
 from habitat.datasets.rearrange.rearrange_generator import (
     RearrangeEpisodeGenerator,
@@ -285,6 +289,162 @@ def print_metadata_mediator(ep_gen):
     logger.info("==================================")
 
 
+def get_output_path(output_path: Optional[str]) -> str:
+    """
+    Normalize the requested output path to a '.json.gz' file path.
+    """
+    if output_path is None:
+        # default
+        output_path = "rearrange_ep_dataset.json.gz"
+    elif osp.isdir(output_path) or output_path.endswith("/"):
+        # append a default filename
+        output_path = (
+            osp.abspath(output_path) + "/rearrange_ep_dataset.json.gz"
+        )
+    else:
+        # filename
+        if not output_path.endswith(".json.gz"):
+            output_path += ".json.gz"
+    return output_path
+
+
+def write_dataset(dataset: RearrangeDatasetV0, output_path: str) -> None:
+    """
+    Serialize the dataset to a '.json.gz' file. The file is written to a temporary path first so that interrupted runs never leave a partial file.
+    """
+    if (
+        not osp.exists(osp.dirname(output_path))
+        and len(osp.dirname(output_path)) > 0
+    ):
+        os.makedirs(osp.dirname(output_path))
+    tmp_path = output_path + ".tmp"
+    with gzip.open(tmp_path, "wt") as f:
+        f.write(dataset.to_json())
+    os.replace(tmp_path, output_path)
+
+
+def get_shard_seed(seed: int, shard_index: int) -> int:
+    """
+    Seed of a shard of a parallel generation run. Only depends on the run seed and the shard index, so the results do not depend on the number of workers or on which worker generates the shard.
+    """
+    return int(
+        np.random.SeedSequence([seed, shard_index]).generate_state(1)[0]
+    )
+
+
+# The RearrangeEpisodeGenerator arguments of a parallel generation worker process, set once per process by _init_worker.
+_worker_ep_gen_kwargs: Optional[Dict[str, Any]] = None
+_worker_db_output: Optional[str] = None
+
+
+def _init_worker(
+    cfg: "DictConfig",
+    debug: bool,
+    db_output: str,
+    limit_scene_set: Optional[str],
+    num_episodes: int,
+) -> None:
+    global _worker_ep_gen_kwargs, _worker_db_output
+    _worker_ep_gen_kwargs = dict(
+        cfg=cfg,
+        debug_visualization=debug,
+        limit_scene_set=limit_scene_set,
+        num_episodes=num_episodes,
+    )
+    os.makedirs(db_output, exist_ok=True)
+    _worker_db_output = osp.abspath(db_output)
+
+
+def _generate_shard(
+    shard_path: str,
+    seed: int,
+    episode_offset: int,
+    num_episodes: int,
+) -> str:
+    assert _worker_ep_gen_kwargs is not None
+    random.seed(seed)
+    np.random.seed(seed)
+
+    dataset = RearrangeDatasetV0()
+    # The generator and its Simulator are closed when the shard is done.
+    with RearrangeEpisodeGenerator(
+        **_worker_ep_gen_kwargs, sim_seed=seed
+    ) as ep_gen:
+        ep_gen.dbv.output_path = _worker_db_output
+        dataset.episodes += ep_gen.generate_episodes(
+            num_episodes, episode_offset=episode_offset
+        )
+    write_dataset(dataset, shard_path)
+    return shard_path
+
+
+def generate_episodes_parallel(
+    cfg: "DictConfig",
+    output_path: str,
+    num_episodes: int,
+    num_workers: int,
+    episodes_per_shard: int,
+    seed: int,
+    limit_scene_set: Optional[str] = None,
+    debug: bool = False,
+    db_output: str = "rearrange_ep_gen_output/",
+) -> None:
+    """
+    Generate episodes with a pool of worker processes, each with its own RearrangeEpisodeGenerator and Simulator.
+
+    The episodes are split into shards of consecutive episodes which are generated independently, each with a seed derived from the run seed and the shard index, and written to '<output>_shards/' as soon as they are done. The shards are then merged into the output file with combine_datasets. Shards which already exist for the same seed are not generated again, so an interrupted run can be resumed by running the same command.
+
+    :param cfg: The RearrangeEpisodeGeneratorConfig.
+    :param output_path: The '.json.gz' path of the merged dataset.
+    :param num_episodes: The total number of episodes to generate.
+    :param num_workers: The number of worker processes.
+    :param episodes_per_shard: The number of episodes of each shard.
+    :param seed: The seed the seed of each shard is derived from.
+    :param limit_scene_set: Option to limit all generation to a single scene set.
+    :param debug: Whether or not to generate debug images and videos.
+    :param db_output: The directory of the debug images and videos.
+    """
+    assert episodes_per_shard > 0, "episodes_per_shard must be positive."
+    shard_dir = output_path[: -len(".json.gz")] + "_shards"
+    os.makedirs(shard_dir, exist_ok=True)
+
+    shard_paths: List[str] = []
+    jobs = []
+    for shard_index, episode_offset in enumerate(
+        range(0, num_episodes, episodes_per_shard)
+    ):
+        shard_path = osp.join(
+            shard_dir, f"shard_{seed}_{shard_index:05d}.json.gz"
+        )
+        shard_paths.append(shard_path)
+        if osp.exists(shard_path):
+            logger.info(f"Reusing existing shard '{shard_path}'")
+            continue
+        jobs.append(
+            (
+                shard_path,
+                get_shard_seed(seed, shard_index),
+                episode_offset,
+                min(episodes_per_shard, num_episodes - episode_offset),
+            )
+        )
+
+    if len(jobs) > 0:
+        with ProcessPoolExecutor(
+            max_workers=min(num_workers, len(jobs)),
+            mp_context=multiprocessing.get_context("forkserver"),
+            initializer=_init_worker,
+            initargs=(cfg, debug, db_output, limit_scene_set, num_episodes),
+        ) as executor:
+            futures = [executor.submit(_generate_shard, *job) for job in jobs]
+            for num_done, future in enumerate(as_completed(futures), 1):
+                logger.info(
+                    f"Generated shard '{future.result()}' ({num_done}/{len(futures)})"
+                )
+
+    combine_datasets(shard_paths, output_path)
+
+
 def get_arg_parser():
     import argparse
 
@@ -346,6 +506,18 @@ def get_arg_parser():
         help="The number of episodes to generate.",
     )
     parser.add_argument("--seed", type=int)
+    parser.add_argument(
+        "--num-workers",
+        type=int,
+        default=0,
+        help="If positive, generate the episodes in parallel with this number of worker processes, each with its own Simulator.",
+    )
+    parser.add_argument(
+        "--episodes-per-shard",
+        type=int,
+        default=100,
+        help="The number of episodes generated and saved together by a worker when --num-workers is positive.",
+    )
     return parser
 
 
@@ -369,62 +541,68 @@ if __name__ == "__main__":
 
     logger.info(f"\n\nModified Config:\n{cfg}\n\n")
 
-    dataset = RearrangeDatasetV0()
-    with RearrangeEpisodeGenerator(
-        cfg=cfg,
-        debug_visualization=args.debug,
-        limit_scene_set=args.limit_scene_set,
-        num_episodes=args.num_episodes,
-    ) as ep_gen:
-        if not osp.isdir(args.db_output):
-            os.makedirs(args.db_output)
-        ep_gen.dbv.output_path = osp.abspath(args.db_output)
-
-        # Simulator has been initialized and SceneDataset is populated
-        if args.list:
-            # NOTE: you can retrieve a string CSV rep of the full SceneDataset with ep_gen.sim.metadata_mediator.dataset_report()
-            print_metadata_mediator(ep_gen)
-        else:
-            import time
-
-            start_time = time.time()
-            dataset.episodes += ep_gen.generate_episodes(
-                args.num_episodes, args.verbose
-            )
-            output_path = args.out
-            if output_path is None:
-                # default
-                output_path = "rearrange_ep_dataset.json.gz"
-            elif osp.isdir(output_path) or output_path.endswith("/"):
-                # append a default filename
-                output_path = (
-                    osp.abspath(output_path) + "/rearrange_ep_dataset.json.gz"
-                )
+    if args.run and args.num_workers > 0:
+        import time
+
+        start_time = time.time()
+        seed = args.seed
+        if seed is None:
+            seed = random.randrange(2**31)
+            logger.info(f"Using seed {seed}")
+        output_path = get_output_path(args.out)
+        generate_episodes_parallel(
+            cfg,
+            output_path,
+            num_episodes=args.num_episodes,
+            num_workers=args.num_workers,
+            episodes_per_shard=args.episodes_per_shard,
+            seed=seed,
+            limit_scene_set=args.limit_scene_set,
+            debug=args.debug,
+            db_output=args.db_output,
+        )
+        logger.info(
+            f"RearrangeEpisodeGenerator generated {args.num_episodes} episodes with {args.num_workers} workers in {time.time()-start_time} seconds."
+        )
+        logger.info(
+            f"RearrangeDatasetV0 saved to '{osp.abspath(output_path)}'"
+        )
+    else:
+        dataset = RearrangeDatasetV0()
+        with RearrangeEpisodeGenerator(
+            cfg=cfg,
+            debug_visualization=args.debug,
+            limit_scene_set=args.limit_scene_set,
+            num_episodes=args.num_episodes,
+        ) as ep_gen:
+            if not osp.isdir(args.db_output):
+                os.makedirs(args.db_output)
+            ep_gen.dbv.output_path = osp.abspath(args.db_output)
+
+            # Simulator has been initialized and SceneDataset is populated
+            if args.list:
+                # NOTE: you can retrieve a string CSV rep of the full SceneDataset with ep_gen.sim.metadata_mediator.dataset_report()
+                print_metadata_mediator(ep_gen)
             else:
-                # filename
-                if not output_path.endswith(".json.gz"):
-                    output_path += ".json.gz"
-
-            if (
-                not osp.exists(osp.dirname(output_path))
-                and len(osp.dirname(output_path)) > 0
-            ):
-                os.makedirs(osp.dirname(output_path))
-            # serialize the dataset
-            import gzip
-
-            with gzip.open(output_path, "wt") as f:
-                f.write(dataset.to_json())
-
-            logger.info(
-                "=============================================================="
-            )
-            logger.info(
-                f"RearrangeEpisodeGenerator generated {args.num_episodes} episodes in {time.time()-start_time} seconds."
-            )
-            logger.info(
-                f"RearrangeDatasetV0 saved to '{osp.abspath(output_path)}'"
-            )
-            logger.info(
-                "=============================================================="
-            )
+                import time
+
+                start_time = time.time()
+                dataset.episodes += ep_gen.generate_episodes(
+                    args.num_episodes, args.verbose
+                )
+                output_path = get_output_path(args.out)
+                # serialize the dataset
+                write_dataset(dataset, output_path)
+
+                logger.info(
+                    "=============================================================="
+                )
+                logger.info(
+                    f"RearrangeEpisodeGenerator generated {args.num_episodes} episodes in {time.time()-start_time} seconds."
+                )
+                logger.info(
+                    f"RearrangeDatasetV0 saved to '{osp.abspath(output_path)}'"
+                )
+                logger.info(
+                    "=============================================================="
+                )
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Meta Platforms, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import math
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+# Height of the horizontal layers of the grid. Vertices are only
+# interpolated within a layer, so that floors are never mixed.
+LAYER_HEIGHT = 0.5
+
+
+class GeodesicDistanceField:
+    r"""Geodesic distances to a fixed set of goals, sampled on a horizontal
+    grid over the navmesh.
+
+    The distance at each grid vertex is an exact pathfinder query, computed
+    the first time the vertex is needed and then cached, so the field is
+    shared by all the episodes with the same goals. The distance at a
+    position is bilinearly interpolated from the four surrounding vertices.
+    The exact query is used instead when a vertex is not navigable or not
+    connected to the goals, and when the position is within
+    :p:`exact_radius` of the goals, so that success checks are not affected
+    by the interpolation.
+
+    :param cell_size: the spacing of the grid vertices, in meters.
+    :param exact_radius: interpolated distances below this value are
+        replaced by exact queries.
+    """
+
+    def __init__(self, cell_size: float, exact_radius: float) -> None:
+        assert cell_size > 0, "The cell size must be positive"
+        self._cell_size = cell_size
+        self._exact_radius = exact_radius
+        # Distance of each vertex, None when the vertex is not navigable
+        self._vertices: Dict[Tuple[int, int, int], Optional[float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._vertices)
+
+    def _vertex_distance(
+        self,
+        key: Tuple[int, int, int],
+        pathfinder: Any,
+        exact_distance: Callable[[np.ndarray], float],
+    ) -> Optional[float]:
+        if key in self._vertices:
+            return self._vertices[key]
+
+        point = np.array(
+            [
+                key[0] * self._cell_size,
+                key[1] * LAYER_HEIGHT,
+                key[2] * self._cell_size,
+            ],
+            dtype=np.float32,
+        )
+        distance: Optional[float] = None
+        if pathfinder.is_navigable(point):
+            distance = float(exact_distance(point))
+            if not math.isfinite(distance):
+                distance = None
+        self._vertices[key] = distance
+        return distance
+
+    def get_distance(
+        self,
+        position: np.ndarray,
+        pathfinder: Any,
+        exact_distance: Callable[[np.ndarray], float],
+    ) -> float:
+        r"""Returns the geodesic distance from :p:`position` to the goals.
+
+        :param position: the position of the agent.
+        :param pathfinder: the pathfinder of the scene, used to check that
+            the vertices are navigable.
+        :param exact_distance: computes the exact distance from a position
+            to the goals.
+        """
+        x = position[0] / self._cell_size
+        z = position[2] / self._cell_size
+        ix = math.floor(x)
+        iz = math.floor(z)
+        iy = round(position[1] / LAYER_HEIGHT)
+        tx = x - ix
+        tz = z - iz
+
+        distance = 0.0
+        for dx, dz, weight in (
+            (0, 0, (1 - tx) * (1 - tz)),
+            (1, 0, tx * (1 - tz)),
+            (0, 1, (1 - tx) * tz),
+            (1, 1, tx * tz),
+        ):
+            vertex_distance = self._vertex_distance(
+                (ix + dx, iy, iz + dz), pathfinder, exact_distance
+            )
+            if vertex_distance is None:
+                return exact_distance(position)
+            distance += weight * vertex_distance
+
+        if distance < self._exact_radius:
+            return exact_distance(position)
+        return distance
+
+
+class GeodesicDistanceFieldCache:
+    r"""Least recently used cache of :ref:`GeodesicDistanceField`, keyed by
+    the scene and the goals of the episodes.
+
+    :param cell_size: the spacing of the grid vertices of the fields.
+    :param exact_radius: see :ref:`GeodesicDistanceField`.
+    :param max_size: the maximum number of cached fields.
+    """
+
+    def __init__(
+        self, cell_size: float, exact_radius: float, max_size: int
+    ) -> None:
+        self._cell_size = cell_size
+        self._exact_radius = exact_radius
+        self._max_size = max_size
+        self._fields: "OrderedDict[Hashable, GeodesicDistanceField]" = (
+            OrderedDict()
+        )
+
+    def get(self, scene_id: str, goals: np.ndarray) -> GeodesicDistanceField:
+        key = (
+            scene_id,
+            goals.shape,
+            np.ascontiguousarray(goals, dtype=np.float32).tobytes(),
+        )
+        if key in self._fields:
+            self._fields.move_to_end(key)
+            return self._fields[key]
+
+        field = GeodesicDistanceField(self._cell_size, self._exact_radius)
+        self._fields[key] = field
+        while len(self._fields) > max(self._max_size, 1):
+            self._fields.popitem(last=False)
+        return field
@@ -35,6 +35,10 @@ from habitat.core.simulator import (
 from habitat.core.spaces import ActionSpace
 from habitat.core.utils import not_none_validator
 from habitat.sims.habitat_simulator.actions import HabitatSimActions
+from habitat.tasks.nav.geodesic_distance_field import (
+    GeodesicDistanceField,
+    GeodesicDistanceFieldCache,
+)
 from habitat.tasks.utils import cartesian_to_polar
 from habitat.utils.geometry_utils import (
     quaternion_from_coeff,
@@ -698,6 +702,12 @@ class TopDownMap(Measure):
         self._previous_xy_location: List[Optional[Tuple[int, int]]] = None
         self._top_down_map: Optional[np.ndarray] = None
         self._shortest_path_points: Optional[List[Tuple[int, int]]] = None
+        # Maps of the navmesh, shared by the measures of this process
+        self._map_cache = maps.get_topdown_map_cache(
+            config.map_cache_size, config.map_cache_dir
+        )
+        self._fog_of_war_table: Optional[fog_of_war.FogOfWarRayTable] = None
+        self._fog_of_war_views: List[Optional[fog_of_war.FogOfWarView]] = []
         self.line_thickness = int(
             np.round(self._map_resolution * 2 / MAP_THICKNESS_SCALAR)
         )
@@ -714,10 +724,18 @@ class TopDownMap(Measure):
             self._sim,
             map_resolution=self._map_resolution,
             draw_border=self._config.draw_border,
+            cache=self._map_cache,
         )
 
         if self._config.fog_of_war.draw:
             self._fog_of_war_mask = np.zeros_like(top_down_map)
+            self._fog_of_war_table = fog_of_war.get_fog_of_war_ray_table(
+                self._config.fog_of_war.fov,
+                self._config.fog_of_war.visibility_dist
+                / maps.calculate_meters_per_pixel(
+                    self._map_resolution, sim=self._sim
+                ),
+            )
         else:
             self._fog_of_war_mask = None
 
@@ -850,6 +868,9 @@ class TopDownMap(Measure):
         self._previous_xy_location = [
             None for _ in range(len(self._sim.habitat_config.agents))
         ]
+        self._fog_of_war_views = [
+            None for _ in range(len(self._sim.habitat_config.agents))
+        ]
 
         if hasattr(episode, "goals"):
             # draw source and target parts last to avoid overlap
@@ -915,23 +936,23 @@ class TopDownMap(Measure):
                     thickness=thickness,
                 )
         angle = TopDownMap.get_polar_angle(agent_state)
-        self.update_fog_of_war_mask(np.array([a_x, a_y]), angle)
+        self.update_fog_of_war_mask(np.array([a_x, a_y]), angle, agent_index)
 
         self._previous_xy_location[agent_index] = (a_y, a_x)
         return a_x, a_y
 
-    def update_fog_of_war_mask(self, agent_position, angle):
+    def update_fog_of_war_mask(self, agent_position, angle, agent_index=0):
         if self._config.fog_of_war.draw:
-            self._fog_of_war_mask = fog_of_war.reveal_fog_of_war(
+            # Reveals the fog-of-war in place, only walking the rays that
+            # were not walked from the same position before.
+            self._fog_of_war_views[
+                agent_index
+            ] = self._fog_of_war_table.reveal(
                 self._top_down_map,
                 self._fog_of_war_mask,
                 agent_position,
                 angle,
-                fov=self._config.fog_of_war.fov,
-                max_line_len=self._config.fog_of_war.visibility_dist
-                / maps.calculate_meters_per_pixel(
-                    self._map_resolution, sim=self._sim
-                ),
+                self._fog_of_war_views[agent_index],
             )
 
 
@@ -952,6 +973,17 @@ class DistanceToGoal(Measure):
         ] = None
         self._distance_to = self._config.distance_to
 
+        # Cached distance fields of the episode goals, see
+        # GeodesicDistanceField
+        self._distance_fields: Optional[GeodesicDistanceFieldCache] = None
+        self._distance_field: Optional[GeodesicDistanceField] = None
+        if self._config.distance_field_cell_size > 0:
+            self._distance_fields = GeodesicDistanceFieldCache(
+                cell_size=self._config.distance_field_cell_size,
+                exact_radius=self._config.distance_field_exact_radius,
+                max_size=self._config.distance_field_cache_size,
+            )
+
         super().__init__(**kwargs)
 
     def _get_uuid(self, *args: Any, **kwargs: Any) -> str:
@@ -965,8 +997,23 @@ class DistanceToGoal(Measure):
                 for goal in episode.goals
                 for view_point in goal.view_points
             ]
+        if self._distance_fields is not None:
+            self._distance_field = self._distance_fields.get(
+                episode.scene_id, np.array(self._get_targets(episode))
+            )
         self.update_metric(episode=episode, *args, **kwargs)  # type: ignore
 
+    def _get_targets(self, episode: NavigationEpisode) -> List[Any]:
+        if self._distance_to == "POINT":
+            return [goal.position for goal in episode.goals]
+        elif self._distance_to == "VIEW_POINTS":
+            assert self._episode_view_points is not None
+            return self._episode_view_points
+        else:
+            raise ValueError(
+                f"Non valid distance_to parameter was provided: {self._distance_to }"
+            )
+
     def update_metric(
         self, episode: NavigationEpisode, *args: Any, **kwargs: Any
     ):
@@ -975,7 +1022,16 @@ class DistanceToGoal(Measure):
         if self._previous_position is None or not np.allclose(
             self._previous_position, current_position, atol=1e-4
         ):
-            if self._distance_to == "POINT":
+            if self._distance_field is not None:
+                targets = self._get_targets(episode)
+                distance_to_target = self._distance_field.get_distance(
+                    current_position,
+                    self._sim.pathfinder,
+                    lambda position: self._sim.geodesic_distance(
+                        position, targets, episode
+                    ),
+                )
+            elif self._distance_to == "POINT":
                 distance_to_target = self._sim.geodesic_distance(
                     current_position,
                     [goal.position for goal in episode.goals],
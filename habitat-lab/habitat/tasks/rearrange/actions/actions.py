@@ -504,6 +504,7 @@ class BaseVelAction(ArticulatedAgentAction):
             target_rigid_state.rotation.to_matrix(), end_pos
         )
         self.cur_articulated_agent.sim_obj.transformation = target_trans
+        self._sim.invalidate_obj_state_cache()
 
         if not self._allow_dyn_slide:
             # Check if in the new articulated_agent state the arm collides with anything.
@@ -681,6 +682,7 @@ class BaseVelNonCylinderAction(ArticulatedAgentAction):
         )
         # Update the base
         self.cur_articulated_agent.sim_obj.transformation = new_target_trans
+        self._sim.invalidate_obj_state_cache()
 
         if self.cur_grasp_mgr.snap_idx is not None:
             # Holding onto an object, also kinematically update the object.
@@ -156,6 +156,7 @@ class HumanoidPickAction(HumanoidJointAction):
                             obj_grabbed.transformation = (
                                 mn.Matrix4.translation(object_coord)
                             )
+                            self._sim.invalidate_obj_state_cache()
             else:
                 should_rest = True
 
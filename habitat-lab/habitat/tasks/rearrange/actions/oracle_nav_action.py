@@ -15,10 +15,35 @@ from habitat.tasks.rearrange.actions.actions import (
     BaseVelAction,
     HumanoidJointAction,
 )
+from habitat.tasks.rearrange.actions.oracle_nav_path_cache import (
+    OracleNavPathCache,
+)
 from habitat.tasks.rearrange.utils import place_agent_at_dist_from_pos
 from habitat.tasks.utils import get_angle
 
 
+def _find_path(pathfinder, start, end):
+    path = habitat_sim.ShortestPath()
+    path.requested_start = start
+    path.requested_end = end
+    if not pathfinder.find_path(path):
+        return None
+    return path.points
+
+
+def _create_path_cache(sim, config) -> OracleNavPathCache:
+    return OracleNavPathCache(
+        lambda start, end: _find_path(sim.pathfinder, start, end),
+        config.path_corridor_radius,
+        config.path_waypoint_radius,
+    )
+
+
+def _get_navmesh_key(sim):
+    pathfinder = sim.pathfinder
+    return (id(pathfinder), pathfinder.navigable_area)
+
+
 @registry.register_task_action
 class OracleNavAction(BaseVelAction, HumanoidJointAction):
     """
@@ -52,6 +77,7 @@ class OracleNavAction(BaseVelAction, HumanoidJointAction):
         self._prev_ep_id = None
         self.skill_done = False
         self._targets = {}
+        self.path_cache = _create_path_cache(self._sim, config)
 
     def lazy_inst_humanoid_controller(self, task, config):
         # Lazy instantiation of humanoid controller
@@ -111,6 +137,7 @@ class OracleNavAction(BaseVelAction, HumanoidJointAction):
             self._targets = {}
             self._prev_ep_id = self._task._episode_id
             self.skill_done = False
+        self.path_cache.reset()
 
     def _get_target_for_idx(self, nav_to_target_idx: int):
         if nav_to_target_idx not in self._targets:
@@ -145,14 +172,11 @@ class OracleNavAction(BaseVelAction, HumanoidJointAction):
         :param point: Vector3 indicating the target point
         """
         agent_pos = self.cur_articulated_agent.base_pos
-
-        path = habitat_sim.ShortestPath()
-        path.requested_start = agent_pos
-        path.requested_end = point
-        found_path = self._sim.pathfinder.find_path(path)
-        if not found_path:
-            return [agent_pos, point]
-        return path.points
+        # The path is only planned again when the agent leaves the path, or
+        # when the point or the navmesh changes. See OracleNavPathCache.
+        return self.path_cache.get_path(
+            agent_pos, point, _get_navmesh_key(self._sim)
+        )
 
     def step(self, *args, **kwargs):
         self.skill_done = False
@@ -273,6 +297,11 @@ class OracleNavCoordinateAction(BaseVelAction, HumanoidJointAction):  # type: ig
 
         else:
             raise ValueError("Unrecognized motion type for oracle nav  action")
+        self.path_cache = _create_path_cache(self._sim, config)
+
+    def reset(self, *args, **kwargs):
+        super().reset(*args, **kwargs)
+        self.path_cache.reset()
 
     def lazy_inst_humanoid_controller(self, task, config):
         # Lazy instantiation of humanoid controller
@@ -371,14 +400,11 @@ class OracleNavCoordinateAction(BaseVelAction, HumanoidJointAction):  # type: ig
         :param point: Vector3 indicating the target point
         """
         agent_pos = self.cur_articulated_agent.base_pos
-
-        path = habitat_sim.ShortestPath()
-        path.requested_start = agent_pos
-        path.requested_end = point
-        found_path = self._sim.pathfinder.find_path(path)
-        if not found_path:
-            return [agent_pos, point]
-        return path.points
+        # The path is only planned again when the agent leaves the path, or
+        # when the point or the navmesh changes. See OracleNavPathCache.
+        return self.path_cache.get_path(
+            agent_pos, point, _get_navmesh_key(self._sim)
+        )
 
     def step(self, *args, **kwargs):
         # mode = 0,1,2
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Meta Platforms, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from typing import Any, Callable, List, Optional
+
+import numpy as np
+
+# Finds the path between a start and an end position, or returns None if
+# there is no path.
+FindPathFn = Callable[[np.ndarray, np.ndarray], Optional[List[Any]]]
+
+
+def _dist_to_segment_2d(
+    pos: np.ndarray, seg_start: np.ndarray, seg_end: np.ndarray
+) -> float:
+    """
+    Horizontal distance between `pos` and the segment from `seg_start` to
+    `seg_end`.
+    """
+    seg = (seg_end - seg_start)[[0, 2]]
+    rel_pos = (pos - seg_start)[[0, 2]]
+    seg_len_sq = float(np.dot(seg, seg))
+    if seg_len_sq == 0.0:
+        return float(np.linalg.norm(rel_pos))
+    t = np.clip(np.dot(rel_pos, seg) / seg_len_sq, 0.0, 1.0)
+    return float(np.linalg.norm(rel_pos - t * seg))
+
+
+class OracleNavPathCache:
+    """
+    Follows the shortest path to a target without planning it again at every
+    step.
+
+    The waypoints of the path are kept and the next waypoint is advanced once
+    the agent is within `waypoint_radius` of it or past it. The path is
+    planned again when the target or the navmesh changes, or when the agent
+    leaves the corridor of width `2 * corridor_radius` around the current
+    segment of the path. A `corridor_radius` of 0 plans the path at every
+    step.
+
+    :property num_hits: Number of paths returned from the cache.
+    :property num_replans: Number of paths planned.
+    """
+
+    def __init__(
+        self,
+        find_path: FindPathFn,
+        corridor_radius: float,
+        waypoint_radius: float,
+    ):
+        self._find_path = find_path
+        self._corridor_radius = corridor_radius
+        self._waypoint_radius = waypoint_radius
+        self.num_hits = 0
+        self.num_replans = 0
+        self.reset()
+
+    def reset(self) -> None:
+        self._target: Optional[np.ndarray] = None
+        self._navmesh_key: Any = None
+        self._waypoints: List[np.ndarray] = []
+        # Index of the next waypoint to reach.
+        self._next_idx = 0
+
+    def _advance(self, agent_pos: np.ndarray) -> None:
+        while self._next_idx < len(self._waypoints) - 1:
+            prev_wp = self._waypoints[self._next_idx - 1]
+            next_wp = self._waypoints[self._next_idx]
+            seg = (next_wp - prev_wp)[[0, 2]]
+            rel_pos = (agent_pos - prev_wp)[[0, 2]]
+            reached = (
+                np.linalg.norm((next_wp - agent_pos)[[0, 2]])
+                < self._waypoint_radius
+            )
+            passed = np.dot(rel_pos, seg) >= np.dot(seg, seg)
+            if not (reached or passed):
+                break
+            self._next_idx += 1
+
+    def _is_valid(
+        self, agent_pos: np.ndarray, target: np.ndarray, navmesh_key: Any
+    ) -> bool:
+        if (
+            self._corridor_radius <= 0.0
+            or len(self._waypoints) == 0
+            or navmesh_key != self._navmesh_key
+            or not np.array_equal(target, self._target)
+        ):
+            return False
+        self._advance(agent_pos)
+        return (
+            _dist_to_segment_2d(
+                agent_pos,
+                self._waypoints[self._next_idx - 1],
+                self._waypoints[self._next_idx],
+            )
+            <= self._corridor_radius
+        )
+
+    def get_path(
+        self, agent_pos: np.ndarray, target: np.ndarray, navmesh_key: Any
+    ) -> List[np.ndarray]:
+        """
+        Returns the path from `agent_pos` to `target`, starting with
+        `agent_pos` and followed by the next waypoint to reach.
+
+        :param navmesh_key: Identifies the navmesh, the path is planned again
+            when it changes.
+        """
+        agent_pos = np.asarray(agent_pos, dtype=np.float64)
+        target = np.array(target, dtype=np.float64)
+        if self._is_valid(agent_pos, target, navmesh_key):
+            self.num_hits += 1
+            return [agent_pos] + self._waypoints[self._next_idx :]
+
+        self.num_replans += 1
+        points = self._find_path(agent_pos, target)
+        if points is None:
+            self.reset()
+            return [agent_pos, target]
+
+        self._target = target
+        self._navmesh_key = navmesh_key
+        self._waypoints = [np.array(p, dtype=np.float64) for p in points]
+        if len(self._waypoints) == 1:
+            self._waypoints.append(self._waypoints[0])
+        self._next_idx = 1
+        return [agent_pos] + self._waypoints[self._next_idx :]
@@ -50,6 +50,12 @@ class PddlAction:
     def post_cond(self) -> List[Predicate]:
         return self._post_cond
 
+    @property
+    def post_cond_search(
+        self,
+    ) -> Optional[List[Dict[PddlEntity, PddlEntity]]]:
+        return self._post_cond_search
+
     def set_post_cond_search(
         self, post_cond_search: List[Dict[PddlEntity, PddlEntity]]
     ) -> None:
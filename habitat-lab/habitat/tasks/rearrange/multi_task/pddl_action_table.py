@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Meta Platforms, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import itertools
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from habitat.tasks.rearrange.multi_task.pddl_action import PddlAction
+from habitat.tasks.rearrange.multi_task.pddl_logical_expr import (
+    LogicalExpr,
+    LogicalExprType,
+)
+from habitat.tasks.rearrange.multi_task.pddl_predicate import Predicate
+from habitat.tasks.rearrange.multi_task.rearrange_pddl import PddlEntity
+
+# A compiled logical expression is either the bit of a predicate, or the
+# expression type, the mask of the predicate sub-expressions and the other
+# compiled sub-expressions.
+_CompiledExpr = Union[int, Tuple[LogicalExprType, int, List["_CompiledExpr"]]]
+
+
+class GroundedActionTable:
+    """
+    All the groundings of a set of PDDL actions with the entities of an
+    episode, in the order of `PddlDomain.get_possible_actions`.
+
+    The groundings are enumerated once and indexed by entity. The
+    preconditions are compiled to operations on a bitset of the true
+    predicates, so filtering the actions by entity and precondition does not
+    clone any action or compare any predicate.
+    """
+
+    def __init__(
+        self, actions: Iterable[PddlAction], entities: List[PddlEntity]
+    ):
+        self._entities = entities
+        self._entity_ids: Dict[str, int] = {
+            entity.name: i for i, entity in enumerate(entities)
+        }
+        # Bit of each predicate appearing in a precondition.
+        self._pred_bits: Dict[str, int] = {}
+
+        self._actions: List[PddlAction] = []
+        self._action_names: List[str] = []
+        self._preconds: List[_CompiledExpr] = []
+        self._entity_rows: List[List[int]] = [[] for _ in entities]
+
+        for action in actions:
+            slot_candidates = [
+                [
+                    i
+                    for i, entity in enumerate(entities)
+                    if entity.expr_type.is_subtype_of(param.expr_type)
+                ]
+                for param in action.params
+            ]
+            # Same order as iterating over the permutations of each
+            # combination of entities.
+            entity_inputs = sorted(
+                (
+                    entity_ids
+                    for entity_ids in itertools.product(*slot_candidates)
+                    if len(set(entity_ids)) == len(entity_ids)
+                ),
+                key=lambda entity_ids: (sorted(entity_ids), entity_ids),
+            )
+            for entity_ids in entity_inputs:
+                row = len(self._actions)
+                new_action = action.clone()
+                new_action.set_param_values([entities[i] for i in entity_ids])
+                self._actions.append(new_action)
+                self._action_names.append(action.name)
+                self._preconds.append(self._compile(new_action.precond))
+                for i in entity_ids:
+                    self._entity_rows[i].append(row)
+
+    def __len__(self) -> int:
+        return len(self._actions)
+
+    def _compile(self, expr: Union[LogicalExpr, Predicate]) -> _CompiledExpr:
+        if isinstance(expr, Predicate):
+            return self._pred_bits.setdefault(
+                expr.compact_str, len(self._pred_bits)
+            )
+
+        mask = 0
+        sub_exprs: List[_CompiledExpr] = []
+        for sub_expr in expr.sub_exprs:
+            compiled = self._compile(sub_expr)
+            if isinstance(compiled, int):
+                mask |= 1 << compiled
+            else:
+                sub_exprs.append(compiled)
+        return (expr.expr_type, mask, sub_exprs)
+
+    @staticmethod
+    def _is_true(expr: _CompiledExpr, true_bits: int) -> bool:
+        if isinstance(expr, int):
+            return bool((true_bits >> expr) & 1)
+
+        expr_type, mask, sub_exprs = expr
+        if expr_type in (LogicalExprType.AND, LogicalExprType.NAND):
+            result = (true_bits & mask) == mask and all(
+                GroundedActionTable._is_true(e, true_bits) for e in sub_exprs
+            )
+        else:
+            result = (true_bits & mask) != 0 or any(
+                GroundedActionTable._is_true(e, true_bits) for e in sub_exprs
+            )
+        if expr_type in (LogicalExprType.NAND, LogicalExprType.NOR):
+            result = not result
+        return result
+
+    def get_true_bits(self, true_preds: List[Predicate]) -> int:
+        """
+        The bitset of the predicates of `true_preds` used by the
+        preconditions.
+        """
+        true_bits = 0
+        for pred in true_preds:
+            bit = self._pred_bits.get(pred.compact_str)
+            if bit is not None:
+                true_bits |= 1 << bit
+        return true_bits
+
+    def get_actions(
+        self,
+        filter_entities: List[PddlEntity],
+        allowed_action_names: Optional[List[str]],
+        restricted_action_names: List[str],
+        true_preds: Optional[List[Predicate]],
+    ) -> List[PddlAction]:
+        """
+        See `PddlDomain.get_possible_actions`. The returned actions are shared
+        and must not be modified.
+        """
+
+        if len(filter_entities) == 0:
+            rows: Iterable[int] = range(len(self._actions))
+        else:
+            filter_rows = []
+            for entity in filter_entities:
+                entity_id = self._entity_ids.get(entity.name)
+                if entity_id is None or self._entities[entity_id] != entity:
+                    return []
+                filter_rows.append(self._entity_rows[entity_id])
+            filter_rows.sort(key=len)
+            other_rows = [set(r) for r in filter_rows[1:]]
+            rows = [
+                row
+                for row in filter_rows[0]
+                if all(row in r for r in other_rows)
+            ]
+
+        true_bits = None
+        if true_preds is not None:
+            true_bits = self.get_true_bits(true_preds)
+
+        matching_actions = []
+        for row in rows:
+            name = self._action_names[row]
+            if (
+                allowed_action_names is not None
+                and name not in allowed_action_names
+            ):
+                continue
+            if name in restricted_action_names:
+                continue
+            if true_bits is not None and not self._is_true(
+                self._preconds[row], true_bits
+            ):
+                continue
+            matching_actions.append(self._actions[row])
+
+        if true_preds is not None:
+            # Set the sub-expression truth values of the preconditions, which
+            # `PddlAction.apply` uses to ground quantified post conditions.
+            for action in matching_actions:
+                if action.post_cond_search is not None:
+                    action.is_precond_satisfied_from_predicates(true_preds)
+        return matching_actions
@@ -5,7 +5,6 @@
 # LICENSE file in the root directory of this source tree.
 
 import importlib
-import itertools
 import os.path as osp
 import time
 from functools import partial
@@ -18,19 +17,25 @@ from typing import (
     Optional,
     Tuple,
     Union,
-    cast,
 )
 
+import numpy as np
 import yaml  # type: ignore[import]
 
 from habitat.config.default import get_full_habitat_config_path
 from habitat.tasks.rearrange.multi_task.pddl_action import PddlAction
+from habitat.tasks.rearrange.multi_task.pddl_action_table import (
+    GroundedActionTable,
+)
 from habitat.tasks.rearrange.multi_task.pddl_logical_expr import (
     LogicalExpr,
     LogicalExprType,
     LogicalQuantifierType,
 )
 from habitat.tasks.rearrange.multi_task.pddl_predicate import Predicate
+from habitat.tasks.rearrange.multi_task.pddl_predicate_index import (
+    GroundedPredicateIndex,
+)
 from habitat.tasks.rearrange.multi_task.rearrange_pddl import (
     ExprType,
     PddlEntity,
@@ -80,6 +85,11 @@ class PddlDomain:
 
         self._added_entities: Dict[str, PddlEntity] = {}
         self._added_expr_types: Dict[str, ExprType] = {}
+        # Groundings of the predicates with the current entities, built on
+        # first use and cleared when the entities or types change.
+        self._ordered_pred_index: Optional[GroundedPredicateIndex] = None
+        self._unordered_pred_index: Optional[GroundedPredicateIndex] = None
+        self._action_table: Optional[GroundedActionTable] = None
 
         self._parse_expr_types(domain_def)
         self._parse_constants(domain_def)
@@ -93,6 +103,7 @@ class PddlDomain:
     def set_actions(self, actions: Dict[str, PddlAction]) -> None:
         self._orig_actions = actions
         self._actions = dict(actions)
+        self._action_table = None
 
     def _parse_actions(self, domain_def) -> None:
         """
@@ -175,6 +186,7 @@ class PddlDomain:
         Add a type to `self.expr_types`. Clears every episode
         """
         self._added_expr_types[expr_type.name] = expr_type
+        self._clear_pred_indices()
 
     def register_episode_entity(self, pddl_entity: PddlEntity) -> None:
         """
@@ -183,6 +195,30 @@ class PddlDomain:
         overide the existing object with that name.
         """
         self._added_entities[pddl_entity.name] = pddl_entity
+        self._clear_pred_indices()
+
+    def _clear_pred_indices(self) -> None:
+        self._ordered_pred_index = None
+        self._unordered_pred_index = None
+        self._action_table = None
+
+    def _get_pred_index(self, ordered: bool) -> GroundedPredicateIndex:
+        if ordered:
+            if self._ordered_pred_index is None:
+                self._ordered_pred_index = GroundedPredicateIndex(
+                    self.predicates.values(),
+                    list(self.all_entities.values()),
+                    ordered=True,
+                )
+            return self._ordered_pred_index
+        else:
+            if self._unordered_pred_index is None:
+                self._unordered_pred_index = GroundedPredicateIndex(
+                    self.predicates.values(),
+                    list(self.all_entities.values()),
+                    ordered=False,
+                )
+            return self._unordered_pred_index
 
     def _parse_expr_types(self, domain_def):
         """
@@ -326,6 +362,7 @@ class PddlDomain:
 
         self._added_entities = {}
         self._added_expr_types = {}
+        self._clear_pred_indices()
 
         id_to_name = {}
         for k, i in sim.handle_to_object_id.items():
@@ -370,6 +407,7 @@ class PddlDomain:
                 new_ac.set_post_cond_search(assigns)
 
             self._actions[k] = new_ac
+        self._action_table = None
 
     @property
     def sim_info(self) -> PddlSimInfo:
@@ -399,44 +437,44 @@ class PddlDomain:
     def get_true_predicates(self) -> List[Predicate]:
         """
         Get all the predicates that are true in the current simulator state.
+        The returned predicates are shared and must not be modified.
         """
 
-        all_entities = self.all_entities.values()
-        true_preds: List[Predicate] = []
-        for pred in self.predicates.values():
-            for entity_input in itertools.permutations(
-                all_entities, pred.n_args
-            ):
-                if not pred.are_args_compatible(list(entity_input)):
-                    continue
+        pred_index = self._get_pred_index(ordered=True)
+        truth = pred_index.evaluate(self.sim_info)
+        return [pred_index.predicates[i] for i in np.flatnonzero(truth)]
 
-                use_pred = pred.clone()
-                use_pred.set_param_values(entity_input)
+    def are_predicates_true(self, preds: List[Predicate]) -> np.ndarray:
+        """
+        Get the truth values of grounded predicates in the current simulator
+        state as a bool array. Faster than calling `is_true` on each
+        predicate since the truth values are shared with
+        `get_true_predicates`.
+        """
 
-                if use_pred.is_true(self.sim_info):
-                    true_preds.append(use_pred)
-        return true_preds
+        pred_index = self._get_pred_index(ordered=True)
+        truth = pred_index.evaluate(self.sim_info)
+        result = np.zeros(len(preds), dtype=bool)
+        for i, pred in enumerate(preds):
+            pred_id = pred_index.get_id(pred)
+            if pred_id is None:
+                result[i] = pred.is_true(self.sim_info)
+            else:
+                result[i] = truth[pred_id]
+        return result
 
     def get_possible_predicates(self) -> List[Predicate]:
         """
         Get all predicates that COULD be true. This is independent of the
         simulator state and is the set of compatible predicate and entity
         arguments. The same ordering of predicates is returned every time.
+        The returned predicates are shared and must not be modified.
         """
 
-        all_entities = self.all_entities.values()
-        poss_preds: List[Predicate] = []
-        for pred in self.predicates.values():
-            for entity_input in itertools.combinations(
-                all_entities, pred.n_args
-            ):
-                if not pred.are_args_compatible(entity_input):
-                    continue
-
-                use_pred = pred.clone()
-                use_pred.set_param_values(entity_input)
-                poss_preds.append(use_pred)
-        return sorted(poss_preds, key=lambda pred: pred.compact_str)
+        return sorted(
+            self._get_pred_index(ordered=False).predicates,
+            key=lambda pred: pred.compact_str,
+        )
 
     def get_possible_actions(
         self,
@@ -446,55 +484,31 @@ class PddlDomain:
         true_preds: Optional[List[Predicate]] = None,
     ) -> List[PddlAction]:
         """
-        Get all actions that can be applied.
+        Get all actions that can be applied. The groundings of the actions
+        are computed once per episode, so the returned actions are shared and
+        must not be modified.
         :param filter_entities: ONLY actions with entities that contain all
             entities in `filter_entities` are allowed.
         :param allowed_action_names: ONLY action names allowed.
         :param restricted_action_names: Action names NOT allowed.
+        :param true_preds: If specified, ONLY actions with preconditions
+            satisfied by these predicates are allowed.
         """
         if filter_entities is None:
             filter_entities = []
         if restricted_action_names is None:
             restricted_action_names = []
 
-        all_entities = list(self.all_entities.values())
-        matching_actions = []
-        for action in self.actions.values():
-            if (
-                allowed_action_names is not None
-                and action.name not in allowed_action_names
-            ):
-                continue
-
-            if action.name in restricted_action_names:
-                continue
-
-            for entity_input in itertools.combinations(
-                all_entities, action.n_args
-            ):
-                # Check that all the filter_entities are in entity_input
-                matches_filter = all(
-                    filter_entity in entity_input
-                    for filter_entity in filter_entities
-                )
-                if not matches_filter:
-                    continue
-
-                for entity_input_perm in itertools.permutations(entity_input):
-                    entity_inputs = cast(List[PddlEntity], entity_input_perm)
-                    if not action.are_args_compatible(entity_inputs):
-                        continue
-                    new_action = action.clone()
-                    new_action.set_param_values(entity_inputs)
-                    if (
-                        true_preds is not None
-                        and not new_action.is_precond_satisfied_from_predicates(
-                            true_preds
-                        )
-                    ):
-                        continue
-                    matching_actions.append(new_action)
-        return matching_actions
+        if self._action_table is None:
+            self._action_table = GroundedActionTable(
+                self.actions.values(), list(self.all_entities.values())
+            )
+        return self._action_table.get_actions(
+            filter_entities,
+            allowed_action_names,
+            restricted_action_names,
+            true_preds,
+        )
 
     def get_ordered_actions(self) -> List[PddlAction]:
         """
@@ -2,7 +2,8 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
-
+import inspect
+from functools import partial
 from typing import Callable, Dict, List, Optional
 
 from habitat.tasks.rearrange.multi_task.rearrange_pddl import (
@@ -66,10 +67,36 @@ class Predicate:
     def n_args(self):
         return len(self._args)
 
+    @property
+    def args(self) -> List[PddlEntity]:
+        return self._args
+
     @property
     def name(self):
         return self._name
 
+    @property
+    def reads_default_agent(self) -> bool:
+        """
+        If `is_valid_fn` takes a `robot` parameter that is neither a predicate
+        argument nor set in the domain, in which case it reads the default
+        agent.
+        """
+
+        if self._is_valid_fn is None:
+            return False
+        if isinstance(self._is_valid_fn, partial) and (
+            "robot" in self._is_valid_fn.keywords
+        ):
+            return False
+        if any(arg.name == "robot" for arg in self._args):
+            return False
+        try:
+            params = inspect.signature(self._is_valid_fn).parameters
+        except (TypeError, ValueError):
+            return False
+        return "robot" in params
+
     def sub_in(self, sub_dict: Dict[PddlEntity, PddlEntity]) -> "Predicate":
         self._arg_values = [
             sub_dict.get(entity, entity) for entity in self._arg_values
@@ -121,6 +148,7 @@ class Predicate:
         """
         if self._set_state_fn is not None:
             self._set_state_fn(sim_info=sim_info, **self._create_kwargs())
+            sim_info.sim.invalidate_obj_state_cache()
 
     def _create_kwargs(self):
         return {
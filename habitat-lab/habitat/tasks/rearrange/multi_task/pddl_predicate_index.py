@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Meta Platforms, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import itertools
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from habitat.tasks.rearrange.multi_task.pddl_predicate import Predicate
+from habitat.tasks.rearrange.multi_task.rearrange_pddl import (
+    PddlEntity,
+    PddlSimInfo,
+    SimulatorObjectType,
+)
+
+
+class GroundedPredicateIndex:
+    """
+    All the groundings of a set of predicates with the entities of an
+    episode, each with an integer id.
+
+    The type compatible argument tuples are enumerated once, and the truth
+    values of all the groundings are evaluated together and cached for the
+    current simulator state. When the simulator state changes, only the
+    groundings with an entity whose state changed are evaluated again.
+    """
+
+    def __init__(
+        self,
+        predicates: Iterable[Predicate],
+        entities: List[PddlEntity],
+        ordered: bool,
+    ):
+        """
+        :param predicates: The ungrounded predicates.
+        :param entities: The entities the predicates are grounded with.
+        :param ordered: If True, every ordering of distinct entities is a
+            grounding, like `itertools.permutations`. Otherwise only the
+            orderings following `entities` are, like `itertools.combinations`.
+        """
+
+        self._entities = entities
+        self.predicates: List[Predicate] = []
+        self._compact_str_to_id: Dict[str, int] = {}
+        entity_to_preds: List[List[int]] = [[] for _ in entities]
+        # Predicates with no arguments, or reading the default agent which is
+        # not an argument, are evaluated at every change.
+        always_eval: List[int] = []
+
+        for pred in predicates:
+            slot_candidates = [
+                [
+                    i
+                    for i, entity in enumerate(entities)
+                    if entity.expr_type.is_subtype_of(arg.expr_type)
+                ]
+                for arg in pred.args
+            ]
+            for entity_ids in itertools.product(*slot_candidates):
+                if ordered:
+                    if len(set(entity_ids)) != len(entity_ids):
+                        continue
+                elif any(a >= b for a, b in zip(entity_ids, entity_ids[1:])):
+                    continue
+
+                pred_id = len(self.predicates)
+                grounded = pred.clone()
+                grounded.set_param_values([entities[i] for i in entity_ids])
+                self.predicates.append(grounded)
+                self._compact_str_to_id[grounded.compact_str] = pred_id
+                if len(entity_ids) == 0 or grounded.reads_default_agent:
+                    always_eval.append(pred_id)
+                for i in set(entity_ids):
+                    entity_to_preds[i].append(pred_id)
+
+        self._entity_to_preds = [
+            np.array(pred_ids, dtype=np.int64) for pred_ids in entity_to_preds
+        ]
+        self._always_eval = np.array(always_eval, dtype=np.int64)
+
+        self._truth = np.zeros(len(self.predicates), dtype=bool)
+        self._entity_states: List[Optional[np.ndarray]] = [None] * len(
+            entities
+        )
+        self._evaluated = False
+        self._state_version: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.predicates)
+
+    def get_id(self, pred: Predicate) -> Optional[int]:
+        """
+        The id of a grounded predicate, or None if it is not in the index.
+        """
+        return self._compact_str_to_id.get(pred.compact_str)
+
+    def _get_entity_state(
+        self, sim_info: PddlSimInfo, entity: PddlEntity
+    ) -> Optional[np.ndarray]:
+        """
+        The part of the simulator state the predicates of `entity` depend on.
+        None if it is unknown, in which case the entity is always considered
+        changed.
+        """
+
+        sim = sim_info.sim
+        if sim_info.check_type_matches(
+            entity, SimulatorObjectType.ROBOT_ENTITY.value
+        ):
+            agent_data = sim.get_agent_data(sim_info.robot_ids[entity.name])
+            snap_idx = agent_data.grasp_mgr.snap_idx
+            return np.array(
+                [
+                    *agent_data.articulated_agent.base_pos,
+                    float(agent_data.articulated_agent.base_rot),
+                    -1 if snap_idx is None else snap_idx,
+                ]
+            )
+        if sim_info.check_type_matches(
+            entity, SimulatorObjectType.ARTICULATED_RECEPTACLE_ENTITY.value
+        ):
+            marker = sim_info.marker_handles[entity.name]
+            return np.concatenate(
+                [
+                    marker.get_current_position(),
+                    marker.ao_parent.joint_positions,
+                ]
+            )
+        if sim_info.check_type_matches(
+            entity, SimulatorObjectType.GOAL_ENTITY.value
+        ):
+            # The goals are fixed for the episode.
+            return np.zeros(0)
+        if sim_info.check_type_matches(
+            entity, SimulatorObjectType.MOVABLE_ENTITY.value
+        ):
+            return np.array(sim.get_scene_pos()[sim_info.obj_ids[entity.name]])
+        if sim_info.check_type_matches(
+            entity, SimulatorObjectType.STATIC_RECEPTACLE_ENTITY.value
+        ):
+            return np.zeros(0)
+        return None
+
+    def evaluate(self, sim_info: PddlSimInfo) -> np.ndarray:
+        """
+        Returns the truth value of every grounded predicate, indexed by id.
+        The returned array must not be modified.
+        """
+
+        state_version = sim_info.sim.obj_state_version
+        if self._evaluated and state_version == self._state_version:
+            return self._truth
+
+        changed = np.zeros(len(self.predicates), dtype=bool)
+        changed[self._always_eval] = True
+        for i, entity in enumerate(self._entities):
+            state = self._get_entity_state(sim_info, entity)
+            prev_state = self._entity_states[i]
+            if (
+                not self._evaluated
+                or state is None
+                or prev_state is None
+                or not np.array_equal(state, prev_state)
+            ):
+                changed[self._entity_to_preds[i]] = True
+            self._entity_states[i] = state
+
+        if not self._evaluated:
+            changed[:] = True
+        for pred_id in np.flatnonzero(changed):
+            self._truth[pred_id] = self.predicates[pred_id].is_true(sim_info)
+
+        self._evaluated = True
+        self._state_version = state_version
+        return self._truth
@@ -316,6 +316,7 @@ class RearrangeGraspManager:
         self.snap_rigid_obj.transformation = (
             self._managed_articulated_agent.ee_transform(self.ee_index) @ rel_T
         )
+        self._sim.invalidate_obj_state_cache()
 
     def snap_to_obj(
         self,
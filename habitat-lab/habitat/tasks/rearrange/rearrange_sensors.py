@@ -592,11 +592,7 @@ class EndEffectorToGoalDistance(UsesArticulatedAgentInterface, Measure):
         self.update_metric(*args, episode=episode, **kwargs)
 
     def update_metric(self, *args, observations, **kwargs):
-        ee_pos = (
-            self._sim.get_agent_data(self.agent_id)
-            .articulated_agent.ee_transform()
-            .translation
-        )
+        ee_pos = self._sim.get_agent_ee_pos(self.agent_id)
 
         goals = self._sim.get_targets()[1]
 
@@ -631,11 +627,7 @@ class EndEffectorToObjectDistance(UsesArticulatedAgentInterface, Measure):
         self.update_metric(*args, episode=episode, **kwargs)
 
     def update_metric(self, *args, episode, **kwargs):
-        ee_pos = (
-            self._sim.get_agent_data(self.agent_id)
-            .articulated_agent.ee_transform()
-            .translation
-        )
+        ee_pos = self._sim.get_agent_ee_pos(self.agent_id)
 
         idxs, _ = self._sim.get_targets()
         scene_pos = self._sim.get_scene_pos()
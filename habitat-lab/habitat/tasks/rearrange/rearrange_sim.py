@@ -53,6 +53,7 @@ from habitat.tasks.rearrange.utils import (
     rearrange_collision,
     rearrange_logger,
 )
+from habitat.utils.profiler import get_profiler
 from habitat_sim.logging import logger
 from habitat_sim.nav import NavMeshSettings
 from habitat_sim.sim import SimulatorBackend
@@ -109,6 +110,13 @@ class RearrangeSim(HabitatSim):
         self._handle_to_object_id: Dict[str, int] = {}
         self._markers: Dict[str, MarkerInfo] = {}
         self._targets: Dict[str, mn.Matrix4] = {}
+        # Snapshot of the object and end-effector states of the current
+        # step, shared by all the sensors and measures. Cleared whenever the
+        # simulation state changes, see `invalidate_obj_state_cache`.
+        self._obj_state_cache: Dict[Any, np.ndarray] = {}
+        self._obj_state_version = 0
+        # The targets only change with the episode.
+        self._targets_cache: Optional[Tuple[np.ndarray, np.ndarray]] = None
 
         self._viz_templates: Dict[str, Any] = {}
         self._viz_handle_to_template: Dict[str, float] = {}
@@ -283,11 +291,14 @@ class RearrangeSim(HabitatSim):
         # auto-sleep rigid objects as optimization
         if self._auto_sleep:
             self._sleep_all_objects()
+        self.invalidate_obj_state_cache()
 
     @add_perf_timing_func()
     def reconfigure(
         self, config: "SimulatorConfig", ep_info: RearrangeEpisode
     ):
+        self.invalidate_obj_state_cache()
+        self._targets_cache = None
         self._handle_to_goal_name = ep_info.info["object_labels"]
 
         self.ep_info = ep_info
@@ -452,10 +463,12 @@ class RearrangeSim(HabitatSim):
             rearrange_logger.warning(
                 f"Could not find a collision free start for {self.ep_info.episode_id}"
             )
+        self.invalidate_obj_state_cache()
         return start_pos, start_rot
 
     def _setup_targets(self, ep_info: RearrangeEpisode):
         self._targets = {}
+        self._targets_cache = None
         for target_handle, transform in ep_info.targets.items():
             self._targets[target_handle] = mn.Matrix4(
                 [[transform[j][i] for j in range(4)] for i in range(4)]
@@ -865,6 +878,8 @@ class RearrangeSim(HabitatSim):
         for p, ao in zip(state["art_pos"], self.art_objs):
             ao.joint_positions = p
 
+        self.invalidate_obj_state_cache()
+
         if set_hold:
             if state["obj_hold"] is not None:
                 for obj_hold_state, grasp_mgr in zip(
@@ -981,6 +996,7 @@ class RearrangeSim(HabitatSim):
         """
         if self._update_articulated_agent:
             self.agents_mgr.update_agents()
+            self.invalidate_obj_state_cache()
 
     def visualize_position(
         self,
@@ -1026,6 +1042,31 @@ class RearrangeSim(HabitatSim):
         # Optionally step physics and update the articulated_agent for benchmarking purposes
         if self._step_physics:
             self.step_world(dt)
+        self.invalidate_obj_state_cache()
+
+    def invalidate_obj_state_cache(self) -> None:
+        """
+        Clears the cached object states returned by `get_scene_pos`,
+        `get_scene_rot` and `get_agent_ee_pos`. The simulator does this after
+        every physics step and state change, code that directly moves
+        objects in between must call it.
+        """
+        self._obj_state_cache.clear()
+        self._obj_state_version += 1
+
+    @property
+    def obj_state_version(self) -> int:
+        """
+        Incremented every time the object state cache is invalidated, so other
+        caches can be keyed by the simulation state.
+        """
+        return self._obj_state_version
+
+    def _cache_obj_state(self, key: Any, value: np.ndarray) -> np.ndarray:
+        # The arrays are shared by all the callers, so they are read only.
+        value.setflags(write=False)
+        self._obj_state_cache[key] = value
+        return value
 
     def get_targets(self) -> Tuple[np.ndarray, np.ndarray]:
         """Get a mapping of object ids to goal positions for rearrange targets.
@@ -1033,17 +1074,23 @@ class RearrangeSim(HabitatSim):
         :return: ([idx: int], [goal_pos: list]) The index of the target object
           in self._scene_obj_ids and the 3D goal position, rotation is IGNORED.
           Note that goal_pos is the desired position of the object, not the
-          starting position.
+          starting position. The arrays are cached until the next episode and
+          are read only.
         """
+        if self._targets_cache is not None:
+            return self._targets_cache
+
         target_trans = self._get_target_trans()
         if len(target_trans) == 0:
-            return np.array([]), np.array([])
-        targ_idx, targ_trans = list(zip(*self._get_target_trans()))
-
-        a, b = np.array(targ_idx), [
-            np.array(x.translation) for x in targ_trans
-        ]
-        return a, np.array(b)
+            a, b = np.array([]), np.array([])
+        else:
+            targ_idx, targ_trans = list(zip(*target_trans))
+            a = np.array(targ_idx)
+            b = np.array([np.array(x.translation) for x in targ_trans])
+        a.setflags(write=False)
+        b.setflags(write=False)
+        self._targets_cache = (a, b)
+        return self._targets_cache
 
     def get_n_targets(self) -> int:
         """Get the number of rearrange targets."""
@@ -1054,21 +1101,75 @@ class RearrangeSim(HabitatSim):
         return self.target_start_pos
 
     def get_scene_pos(self) -> np.ndarray:
-        """Get the positions of all clutter RigidObjects in the scene as a numpy array."""
-        rom = self.get_rigid_object_manager()
-        return np.array(
-            [
-                rom.get_object_by_id(idx).translation
+        """Get the positions of all clutter RigidObjects in the scene as a numpy array.
+
+        The array is cached until the simulation state changes and is read only.
+        """
+        scene_pos = self._obj_state_cache.get("scene_pos")
+        if scene_pos is None:
+            rom = self.get_rigid_object_manager()
+            scene_pos = self._cache_obj_state(
+                "scene_pos",
+                np.array(
+                    [
+                        rom.get_object_by_id(idx).translation
+                        for idx in self._scene_obj_ids
+                    ]
+                ),
+            )
+        return scene_pos
+
+    def get_scene_rot(self) -> np.ndarray:
+        """Get the rotations of all clutter RigidObjects in the scene as a
+        `[N, 4]` array of `(x, y, z, w)` quaternions.
+
+        The array is cached until the simulation state changes and is read only.
+        """
+        scene_rot = self._obj_state_cache.get("scene_rot")
+        if scene_rot is None:
+            rom = self.get_rigid_object_manager()
+            rotations = [
+                rom.get_object_by_id(idx).rotation
                 for idx in self._scene_obj_ids
             ]
-        )
+            scene_rot = self._cache_obj_state(
+                "scene_rot",
+                np.array(
+                    [[*q.vector, q.scalar] for q in rotations],
+                    dtype=np.float32,
+                ).reshape(-1, 4),
+            )
+        return scene_rot
+
+    def get_agent_ee_pos(self, agent_idx: Optional[int]) -> np.ndarray:
+        """Get the position of the end-effector of an agent as a numpy array.
+
+        The array is cached until the simulation state changes and is read only.
+        """
+        key = ("ee_pos", agent_idx)
+        ee_pos = self._obj_state_cache.get(key)
+        if ee_pos is None:
+            ee_pos = self._cache_obj_state(
+                key,
+                np.array(
+                    self.get_agent_data(agent_idx)
+                    .articulated_agent.ee_transform()
+                    .translation
+                ),
+            )
+        return ee_pos
 
     def add_perf_timing(self, desc: str, t_start: float) -> None:
         """
         Records a duration since `t_start` into the perf stats. Note that this
         is additive, so times between successive calls accumulate, not reset.
         Also note that this will only log if `self._perf_logging_enabled=True`.
+        Durations with a `desc` are also recorded as a scope of the profiler,
+        nested in the current profiler scope; the whole methods are recorded
+        by `add_perf_timing_func`.
         """
+        if desc != "":
+            get_profiler().record(desc, time.time() - t_start)
         if not self._perf_logging_enabled:
             return
 
@@ -230,6 +230,7 @@ class RearrangeTask(NavigationTask):
         ).articulated_agent
         articulated_agent.base_pos = articulated_agent_pos
         articulated_agent.base_rot = articulated_agent_rot
+        self._sim.invalidate_obj_state_cache()
 
     @add_perf_timing_func()
     def reset(self, episode: Episode, fetch_observations: bool = True):
@@ -117,6 +117,7 @@ class PddlSocialNavTask(PddlTask):
             ).articulated_agent.base_rot = (
                 self._nav_to_info.articulated_agent_start_angle
             )
+        self._sim.invalidate_obj_state_cache()
 
         super().reset(episode)
 
@@ -149,6 +149,7 @@ class SetArticulatedObjectTask(RearrangeTask):
             noise = np.random.normal(0.0, self._config.base_angle_noise)
             self._sim.articulated_agent.base_rot = angle_to_obj + noise
             self._sim.articulated_agent.base_pos = base_pos
+            self._sim.invalidate_obj_state_cache()
 
             articulated_agent_T = (
                 self._sim.articulated_agent.base_transformation
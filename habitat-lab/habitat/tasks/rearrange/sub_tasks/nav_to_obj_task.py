@@ -130,6 +130,7 @@ class DynNavRLEnv(RearrangeTask):
         self._sim.articulated_agent.base_rot = (
             self._nav_to_info.articulated_agent_start_angle
         )
+        self._sim.invalidate_obj_state_cache()
 
         if self._nav_to_info.start_hold_obj_idx is not None:
             if self._sim.grasp_mgr.is_grasped:
@@ -121,6 +121,7 @@ class RearrangePickTaskV1(RearrangeTask):
         set_agent_base_via_obj_trans(
             start_pos, start_rot, sim.articulated_agent
         )
+        sim.invalidate_obj_state_cache()
 
         self._targ_idx = sel_idx
 
@@ -24,6 +24,7 @@ from habitat.articulated_agents.robots.spot_robot import SpotRobot
 from habitat.articulated_agents.robots.stretch_robot import StretchRobot
 from habitat.core.logging import HabitatLogger
 from habitat.tasks.utils import get_angle
+from habitat.utils.profiler import get_profiler
 from habitat_sim.physics import MotionType
 
 if TYPE_CHECKING:
@@ -585,11 +586,13 @@ def _get_robot_spawns(
             # found a feasible state: reset state and return proposed stated
             agent.base_pos = start_position
             agent.base_rot = start_rotation
+            sim.invalidate_obj_state_cache()
             return candidate_navmesh_position, angle_to_object, False
 
     # failure to sample a feasible state: reset state and return initial conditions
     agent.base_pos = start_position
     agent.base_rot = start_rotation
+    sim.invalidate_obj_state_cache()
     return start_position, start_rotation, True
 
 
@@ -621,7 +624,8 @@ def add_perf_timing_func(name: Optional[str] = None):
     objects that contain `self._sim` so this decorator can access the
     underlying `RearrangeSim` instance to log the speed. This scopes the
     logging name so nested function calls will include the outer perf timing
-    name separate by a ".".
+    name separate by a ".". The method is also timed as a scope of the
+    profiler, see `habitat.utils.profiler`.
 
     :param name: The name of the performance logging key. If unspecified, this
         defaults to "ModuleName[FuncName]"
@@ -647,11 +651,12 @@ def add_perf_timing_func(name: Optional[str] = None):
                 # Does not support logging.
                 return f(self, *args, **kwargs)
 
-            sim.cur_runtime_perf_scope.append(use_name)
-            t_start = time.time()
-            ret = f(self, *args, **kwargs)
-            sim.add_perf_timing("", t_start)
-            sim.cur_runtime_perf_scope.pop()
+            with get_profiler().scope(use_name):
+                sim.cur_runtime_perf_scope.append(use_name)
+                t_start = time.time()
+                ret = f(self, *args, **kwargs)
+                sim.add_perf_timing("", t_start)
+                sim.cur_runtime_perf_scope.pop()
             return ret
 
         return wrapper
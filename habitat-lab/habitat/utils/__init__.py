@@ -10,5 +10,6 @@ __all__ = [
     "common",
     "env_utils",
     "pickle5_multiprocessing",
+    "profiler",
     "profiling_wrapper",
 ]
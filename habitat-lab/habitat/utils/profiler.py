@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Meta Platforms, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+r"""Low overhead hierarchical profiler.
+
+Scopes are nested per thread and named by the path of their enclosing scopes
+joined with ".". Each scope path keeps a histogram of its durations, from
+which percentiles are computed. The states of profilers in several processes,
+e.g. the :ref:`VectorEnv` workers, can be merged into one. Optionally, every
+scope is also recorded as an event that can be exported as a Chrome trace,
+viewable in Perfetto or ``chrome://tracing``.
+
+The global profiler is configured with environment variables:
+export HABITAT_PROFILER=1  # enable the profiler
+export HABITAT_PROFILER_TRACE=trace.json  # also export the trace to trace.json
+
+When the profiler is disabled, a scope costs a function call and entering an
+empty context manager.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional
+
+# Number of log-spaced histogram buckets per power of two of the durations. The
+# percentiles are the geometric centers of the buckets, so their relative error
+# is at most 2 ** (1 / 16) - 1, about 4.4%.
+BUCKETS_PER_OCTAVE = 8
+# Smallest duration recorded in the histograms, in seconds.
+MIN_DURATION = 1e-9
+
+
+class ScopeStats:
+    r"""Count, total, extrema and log-scale histogram of the durations of a
+    scope.
+    """
+
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.buckets: Dict[int, int] = {}
+
+    def add(self, duration: float) -> None:
+        duration = max(duration, MIN_DURATION)
+        self.count += 1
+        self.total += duration
+        if duration < self.min:
+            self.min = duration
+        if duration > self.max:
+            self.max = duration
+        mantissa, exponent = math.frexp(duration)
+        sub_bucket = min(
+            int(math.log2(2.0 * mantissa) * BUCKETS_PER_OCTAVE),
+            BUCKETS_PER_OCTAVE - 1,
+        )
+        bucket = exponent * BUCKETS_PER_OCTAVE + sub_bucket
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    @property
+    def mean(self) -> float:
+        return self.total / max(self.count, 1)
+
+    def percentile(self, q: float) -> float:
+        r"""Approximate `q` percentile of the durations, with `q` in
+        [0, 100].
+        """
+        if self.count == 0:
+            return 0.0
+        rank = q / 100.0 * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                break
+        exponent, sub_bucket = divmod(bucket, BUCKETS_PER_OCTAVE)
+        # Geometric center of the bucket.
+        mantissa = 0.5 * 2.0 ** ((sub_bucket + 0.5) / BUCKETS_PER_OCTAVE)
+        return min(max(math.ldexp(mantissa, exponent), self.min), self.max)
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "buckets": dict(self.buckets),
+        }
+
+    def merge_state(self, state: Dict[str, Any]) -> None:
+        self.count += state["count"]
+        self.total += state["total"]
+        self.min = min(self.min, state["min"])
+        self.max = max(self.max, state["max"])
+        for bucket, count in state["buckets"].items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.mean,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+
+class _NullScope:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+_NULL_SCOPE = _NullScope()
+
+
+class _Scope:
+    __slots__ = ("_profiler", "_name", "_path", "_start")
+
+    def __init__(self, profiler: "Profiler", name: str) -> None:
+        self._profiler = profiler
+        self._name = name
+
+    def __enter__(self) -> "_Scope":
+        stack = self._profiler._get_stack()
+        self._path = (
+            self._name if len(stack) == 0 else f"{stack[-1]}.{self._name}"
+        )
+        stack.append(self._path)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        end = time.perf_counter()
+        self._profiler._get_stack().pop()
+        self._profiler._add(self._path, self._start, end - self._start)
+
+
+class Profiler:
+    r"""Hierarchical profiler, see the module documentation.
+
+    :param enabled: Whether scopes are recorded.
+    :param trace_path: If set, the scopes are also recorded as events to
+        export as a Chrome trace to this path.
+    :param max_trace_events: Maximum number of events kept for the trace, the
+        later events are dropped.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        trace_path: Optional[str] = None,
+        max_trace_events: int = 1_000_000,
+    ) -> None:
+        self.enabled = enabled
+        self.trace_path = trace_path
+        self.max_trace_events = max_trace_events
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats: Dict[str, ScopeStats] = {}
+        self._events: List[Dict[str, Any]] = []
+
+    def _get_stack(self) -> List[str]:
+        try:
+            return self._local.stack
+        except AttributeError:
+            self._local.stack = []
+            return self._local.stack
+
+    def _add(self, path: str, start: float, duration: float) -> None:
+        with self._lock:
+            stats = self._stats.get(path)
+            if stats is None:
+                stats = self._stats[path] = ScopeStats()
+            stats.add(duration)
+            if (
+                self.trace_path is not None
+                and len(self._events) < self.max_trace_events
+            ):
+                self._events.append(
+                    {
+                        "name": path.rsplit(".", 1)[-1],
+                        "cat": path,
+                        "ph": "X",
+                        "ts": start * 1e6,
+                        "dur": duration * 1e6,
+                        "pid": os.getpid(),
+                        "tid": threading.get_ident(),
+                    }
+                )
+
+    def scope(self, name: str):
+        r"""Context manager timing a scope nested in the current scope of the
+        thread.
+        """
+        if not self.enabled:
+            return _NULL_SCOPE
+        return _Scope(self, name)
+
+    def profile(self, name: Optional[str] = None) -> Callable:
+        r"""Function decorator timing each call in a scope. The scope name
+        defaults to the qualified name of the function.
+        """
+
+        def decorator(f):
+            scope_name = f.__qualname__ if name is None else name
+
+            @wraps(f)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return f(*args, **kwargs)
+                with _Scope(self, scope_name):
+                    return f(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def record(self, name: str, duration: float) -> None:
+        r"""Records a scope that ended now and lasted `duration` seconds,
+        nested in the current scope of the thread.
+        """
+        if not self.enabled:
+            return
+        stack = self._get_stack()
+        path = name if len(stack) == 0 else f"{stack[-1]}.{name}"
+        self._add(path, time.perf_counter() - duration, duration)
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        r"""Count, total, mean, p50, p95, p99 and max duration of each scope
+        path, in seconds.
+        """
+        with self._lock:
+            return {
+                path: stats.summary()
+                for path, stats in sorted(self._stats.items())
+            }
+
+    def get_state(self, reset: bool = False) -> Dict[str, Any]:
+        r"""Picklable state of the profiler, to merge in another profiler with
+        :ref:`merge_state`. With `reset`, the profiler is then cleared so the
+        same scopes are not merged twice.
+        """
+        with self._lock:
+            state = {
+                "stats": {
+                    path: stats.get_state()
+                    for path, stats in self._stats.items()
+                },
+                "events": self._events,
+            }
+            if reset:
+                self._stats = {}
+                self._events = []
+            else:
+                state["events"] = list(self._events)
+        return state
+
+    def merge_state(self, state: Dict[str, Any]) -> None:
+        with self._lock:
+            for path, stats_state in state["stats"].items():
+                stats = self._stats.get(path)
+                if stats is None:
+                    stats = self._stats[path] = ScopeStats()
+                stats.merge_state(stats_state)
+            num_events = self.max_trace_events - len(self._events)
+            self._events.extend(state["events"][: max(num_events, 0)])
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats = {}
+            self._events = []
+
+    def export_chrome_trace(self, path: Optional[str] = None) -> None:
+        r"""Writes the recorded events in the Chrome trace event format.
+
+        :param path: Defaults to `trace_path`.
+        """
+        if path is None:
+            path = self.trace_path
+        assert path is not None, "No trace path to export to"
+        with self._lock:
+            events = list(self._events)
+        trace = {"traceEvents": events, "displayTimeUnit": "ms"}
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(trace, f)
+        os.replace(tmp_path, path)
+
+
+_trace_path = os.environ.get("HABITAT_PROFILER_TRACE") or None
+_profiler = Profiler(
+    enabled=os.environ.get("HABITAT_PROFILER", "0") not in ("", "0")
+    or _trace_path is not None,
+    trace_path=_trace_path,
+)
+
+
+def get_profiler() -> Profiler:
+    r"""The profiler of the process, configured with the `HABITAT_PROFILER`
+    and `HABITAT_PROFILER_TRACE` environment variables.
+    """
+    return _profiler
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Meta Platforms, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Optional, Sequence, Tuple, Union
+
+import attr
+import numpy as np
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class SharedActionLayout:
+    r"""Picklable description of a :ref:`SharedActionBuffer`, sent to the
+    worker processes so that they can attach to it.
+
+    :property shm_name: name of the shared memory block.
+    :property shape: shape of the buffer, one row per environment worker.
+    :property dtype: dtype of the actions.
+    """
+    shm_name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+class SharedActionBuffer:
+    r"""Array of actions in shared memory with one row per environment
+    worker. The main process writes the actions of all the environments with
+    a single array operation and each worker reads its own row, so only a
+    small step command goes through the pipe of each worker.
+
+    Rows are indexed by the rank of the worker, which does not change when
+    environments are paused.
+    """
+
+    def __init__(
+        self, shm: SharedMemory, layout: SharedActionLayout, owner: bool
+    ) -> None:
+        self._shm: Optional[SharedMemory] = shm
+        self._layout = layout
+        self._owner = owner
+        self._array: Optional[np.ndarray] = np.ndarray(
+            layout.shape, dtype=np.dtype(layout.dtype), buffer=shm.buf
+        )
+
+    @classmethod
+    def create(
+        cls, num_workers: int, action_shape: Tuple[int, ...], dtype: Any
+    ) -> "SharedActionBuffer":
+        r"""Allocates a buffer for :p:`num_workers` actions of shape
+        :p:`action_shape`.
+        """
+        dtype = np.dtype(dtype)
+        shape = (num_workers, *action_shape)
+        shm = SharedMemory(
+            create=True,
+            size=max(int(np.prod(shape, dtype=np.int64)) * dtype.itemsize, 1),
+        )
+        layout = SharedActionLayout(
+            shm_name=shm.name, shape=shape, dtype=dtype.str
+        )
+        return cls(shm, layout, owner=True)
+
+    @classmethod
+    def attach(cls, layout: SharedActionLayout) -> "SharedActionBuffer":
+        r"""Attaches to a buffer created in another process."""
+        return cls(SharedMemory(name=layout.shm_name), layout, owner=False)
+
+    @property
+    def layout(self) -> SharedActionLayout:
+        return self._layout
+
+    def matches(self, actions: np.ndarray) -> bool:
+        r"""Whether the buffer can hold a batch of :p:`actions`."""
+        return actions.shape[1:] == self._layout.shape[
+            1:
+        ] and actions.dtype == np.dtype(self._layout.dtype)
+
+    def write(
+        self,
+        rows: Union[slice, Sequence[int]],
+        actions: np.ndarray,
+        low: Optional[Any] = None,
+        high: Optional[Any] = None,
+    ) -> None:
+        r"""Writes :p:`actions` to :p:`rows`. If :p:`low` or :p:`high` is
+        given, the actions are clipped while they are written.
+        """
+        assert self._array is not None
+        if low is None and high is None:
+            self._array[rows] = actions
+        elif isinstance(rows, slice):
+            np.clip(actions, low, high, out=self._array[rows])
+        else:
+            self._array[rows] = np.clip(actions, low, high)
+
+    def read(self, row: int) -> Union[int, float, bool, np.ndarray]:
+        r"""Reads the action of a worker. Scalar actions are returned as
+        python scalars, like :py:`Tensor.item()`, other actions as a copy.
+        """
+        assert self._array is not None
+        action = self._array[row]
+        if action.ndim == 0:
+            return action.item()
+        return action.copy()
+
+    def close(self) -> None:
+        if self._shm is None:
+            return
+
+        self._array = None
+        shm = self._shm
+        self._shm = None
+        shm.close()
+        if self._owner:
+            shm.unlink()
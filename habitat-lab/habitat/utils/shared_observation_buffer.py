@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Meta Platforms, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, Optional, Tuple
+
+import attr
+import numpy as np
+from gym import spaces
+
+# Offsets of every observation inside a slot are aligned to this many bytes
+_ALIGNMENT = 64
+
+
+def _align(nbytes: int) -> int:
+    return (nbytes + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+@attr.s(auto_attribs=True, frozen=True)
+class SharedObservationLayout:
+    r"""Picklable description of a :ref:`SharedObservationBuffer`. It is sent
+    to the worker process so that it can attach to the buffer created by the
+    main process.
+
+    :property shm_name: name of the shared memory block.
+    :property ring_size: number of observation slots in the ring.
+    :property slot_nbytes: size in bytes of a single slot.
+    :property entries: maps an observation key to its offset inside a slot,
+        its shape and its dtype.
+    """
+    shm_name: str
+    ring_size: int
+    slot_nbytes: int
+    entries: Dict[str, Tuple[int, Tuple[int, ...], str]]
+
+
+@attr.s(auto_attribs=True, slots=True)
+class SharedObservations:
+    r"""Small header sent over the pipe in place of an observation dict whose
+    arrays were written into a :ref:`SharedObservationBuffer`.
+
+    :property slot: ring slot the arrays were written to.
+    :property shared_keys: keys whose values live in the shared buffer.
+    :property observations: the observation dict, with the values of
+        :py:`shared_keys` set to :py:`None` to preserve the key order.
+        It is always a plain :py:`dict`.
+    """
+    slot: int
+    shared_keys: Tuple[str, ...]
+    observations: Dict[str, Any]
+
+
+class SharedObservationBuffer:
+    r"""Ring of preallocated observation slots in shared memory, laid out from
+    an observation space. One buffer is created per environment worker.
+
+    The worker writes the :ref:`spaces.Box` observations of each step into the
+    next slot of the ring and only sends a :ref:`SharedObservations` header
+    back to the main process, which turns it back into an observation dict of
+    zero-copy views into the slot. Observations that do not match the layout
+    (other spaces, unexpected shape or dtype, or non-numpy values such as
+    CUDA tensors) are still sent through the pipe.
+
+    The views returned by :ref:`read` are only valid until the worker has
+    written :py:`ring_size` more observations, so they must be copied (for
+    example by :py:`batch_obs`) if they are needed for longer than
+    :py:`ring_size - 1` steps.
+    """
+
+    def __init__(
+        self, shm: SharedMemory, layout: SharedObservationLayout, owner: bool
+    ) -> None:
+        self._shm: Optional[SharedMemory] = shm
+        self._layout = layout
+        self._owner = owner
+        self._next_slot = 0
+        self._slots = [
+            {
+                k: np.ndarray(
+                    shape,
+                    dtype=np.dtype(dtype),
+                    buffer=shm.buf,
+                    offset=slot * layout.slot_nbytes + offset,
+                )
+                for k, (offset, shape, dtype) in layout.entries.items()
+            }
+            for slot in range(layout.ring_size)
+        ]
+
+    @classmethod
+    def create(
+        cls, observation_space: spaces.Dict, ring_size: int = 2
+    ) -> Optional["SharedObservationBuffer"]:
+        r"""Allocates a buffer for the :ref:`spaces.Box` entries of
+        :p:`observation_space`.
+
+        :param observation_space: the observation space of the environment.
+        :param ring_size: number of slots in the ring.
+        :return: the buffer, or :py:`None` if no observation can be shared.
+        """
+        assert ring_size >= 1, "ring_size must be at least 1"
+        entries: Dict[str, Tuple[int, Tuple[int, ...], str]] = {}
+        slot_nbytes = 0
+        for k, space in observation_space.spaces.items():
+            if not isinstance(space, spaces.Box):
+                continue
+            dtype = np.dtype(space.dtype)
+            entries[k] = (slot_nbytes, tuple(space.shape), dtype.str)
+            slot_nbytes += _align(
+                int(np.prod(space.shape, dtype=np.int64)) * dtype.itemsize
+            )
+
+        if len(entries) == 0 or slot_nbytes == 0:
+            return None
+
+        shm = SharedMemory(create=True, size=slot_nbytes * ring_size)
+        layout = SharedObservationLayout(
+            shm_name=shm.name,
+            ring_size=ring_size,
+            slot_nbytes=slot_nbytes,
+            entries=entries,
+        )
+        return cls(shm, layout, owner=True)
+
+    @classmethod
+    def attach(
+        cls, layout: SharedObservationLayout
+    ) -> "SharedObservationBuffer":
+        r"""Attaches to a buffer created in another process."""
+        return cls(SharedMemory(name=layout.shm_name), layout, owner=False)
+
+    @property
+    def layout(self) -> SharedObservationLayout:
+        return self._layout
+
+    def write(self, observations: Dict[str, Any]) -> SharedObservations:
+        r"""Copies the observations matching the layout into the next slot.
+
+        :param observations: observation dict of a single environment.
+        :return: the header to send to the main process instead of
+            :p:`observations`.
+        """
+        slot = self._next_slot
+        self._next_slot = (slot + 1) % self._layout.ring_size
+        dst = self._slots[slot]
+
+        shared_keys = []
+        remaining = {}
+        for k, v in observations.items():
+            buf = dst.get(k, None)
+            if (
+                buf is not None
+                and isinstance(v, np.ndarray)
+                and v.shape == buf.shape
+                and v.dtype == buf.dtype
+            ):
+                np.copyto(buf, v)
+                shared_keys.append(k)
+                remaining[k] = None
+            else:
+                remaining[k] = v
+
+        return SharedObservations(slot, tuple(shared_keys), remaining)
+
+    def read(self, header: SharedObservations) -> Dict[str, Any]:
+        r"""Rebuilds the observation dict from a header, the shared entries
+        are views into the slot the worker wrote to.
+        """
+        observations = header.observations
+        src = self._slots[header.slot]
+        for k in header.shared_keys:
+            observations[k] = src[k]
+
+        return observations
+
+    def resolve(self, result: Any) -> Any:
+        r"""Replaces a :ref:`SharedObservations` header in the result of a
+        worker command (either a reset result or a step tuple) by the
+        observation dict it describes.
+        """
+        if isinstance(result, SharedObservations):
+            return self.read(result)
+        if (
+            isinstance(result, tuple)
+            and len(result) > 0
+            and isinstance(result[0], SharedObservations)
+        ):
+            return (self.read(result[0]),) + result[1:]
+
+        return result
+
+    def close(self) -> None:
+        if self._shm is None:
+            return
+
+        # Views must be released before the memory can be closed
+        self._slots = []
+        shm = self._shm
+        self._shm = None
+        try:
+            shm.close()
+        except BufferError:
+            # Some views are still referenced by the user, the mapping is
+            # released when they are garbage collected.
+            pass
+        if self._owner:
+            shm.unlink()
@@ -4,6 +4,9 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+from functools import lru_cache
+from typing import Optional, Tuple
+
 import numba
 import numpy as np
 
@@ -161,3 +164,142 @@ def reveal_fog_of_war(
     )
 
     return fog_of_war_mask
+
+
+@numba.jit(nopython=True)
+def _draw_rays(
+    top_down_map,
+    fog_of_war_mask,
+    x0,
+    y0,
+    ray_offsets,
+    ray_starts,
+    rays,
+):
+    for ray in rays:
+        for i in range(ray_starts[ray], ray_starts[ray + 1]):
+            x = x0 + ray_offsets[i, 0]
+            y = y0 + ray_offsets[i, 1]
+
+            if x < 0 or x >= fog_of_war_mask.shape[0]:
+                break
+
+            if y < 0 or y >= fog_of_war_mask.shape[1]:
+                break
+
+            if top_down_map[x, y] == maps.MAP_INVALID_POINT:
+                break
+
+            fog_of_war_mask[x, y] = 1
+
+
+# (x, y, first ray) of the last revealed view, see FogOfWarRayTable.reveal
+FogOfWarView = Tuple[int, int, int]
+
+
+class FogOfWarRayTable:
+    r"""Precomputed fog-of-war rays for a field of view and a visibility
+    distance.
+
+    The rays of :py:`reveal_fog_of_war` only depend on their angle, not on the
+    position of the agent. The rays of a full turn, spaced by the same
+    angle step, are drawn once with :py:`bresenham_supercover_line` and
+    stored as cell offsets. Revealing the fog-of-war then only walks the
+    rays of the current view direction, snapped to the closest ray. If the
+    agent did not move since the previous view, only the rays that were not
+    part of the previous view are walked.
+    """
+
+    def __init__(self, fov: float = 90, max_line_len: float = 100):
+        self.fov = fov
+        self.max_line_len = max_line_len
+
+        self._num_rays = max(int(np.ceil(2 * np.pi * max_line_len)), 1)
+        self._ray_angle = 2 * np.pi / self._num_rays
+        self._num_view_rays = min(
+            int(np.ceil(np.deg2rad(fov) / self._ray_angle)), self._num_rays
+        )
+
+        origin = np.zeros(2, dtype=np.int64)
+        rays = []
+        for ray in range(self._num_rays):
+            angle = ray * self._ray_angle
+            rays.append(
+                np.array(
+                    bresenham_supercover_line(
+                        origin,
+                        max_line_len
+                        * np.array([np.cos(angle), np.sin(angle)]),
+                    ),
+                    dtype=np.int32,
+                ).reshape(-1, 2)
+            )
+        self._ray_offsets = np.concatenate(rays)
+        self._ray_starts = np.zeros(self._num_rays + 1, dtype=np.int64)
+        self._ray_starts[1:] = np.cumsum([len(r) for r in rays])
+
+    def reveal(
+        self,
+        top_down_map: np.ndarray,
+        fog_of_war_mask: np.ndarray,
+        current_point: np.ndarray,
+        current_angle: float,
+        previous_view: Optional[FogOfWarView] = None,
+    ) -> FogOfWarView:
+        r"""Reveals the fog-of-war at the current location, in place.
+
+        :param top_down_map: The current top down map. Used for respecting
+            walls when revealing.
+        :param fog_of_war_mask: The fog-of-war mask to reveal the
+            fog-of-war on.
+        :param current_point: The current location of the agent on the
+            fog_of_war_mask.
+        :param current_angle: The current look direction of the agent on the
+            fog_of_war_mask.
+        :param previous_view: The view returned by the previous call with the
+            same fog_of_war_mask, if the walls of the top down map did not
+            change since.
+
+        :return: The current view, to pass to the next call.
+        """
+        x0, y0 = int(current_point[0]), int(current_point[1])
+        first_ray = (
+            int(
+                np.round(
+                    (float(current_angle) - np.deg2rad(self.fov) / 2)
+                    / self._ray_angle
+                )
+            )
+            % self._num_rays
+        )
+        view = (x0, y0, first_ray)
+        if previous_view == view:
+            return view
+
+        rays = (first_ray + np.arange(self._num_view_rays)) % self._num_rays
+        if previous_view is not None and previous_view[:2] == (x0, y0):
+            # The rays of the previous view were already walked from this
+            # point.
+            rays = rays[
+                (rays - previous_view[2]) % self._num_rays
+                >= self._num_view_rays
+            ]
+
+        _draw_rays(
+            top_down_map,
+            fog_of_war_mask,
+            x0,
+            y0,
+            self._ray_offsets,
+            self._ray_starts,
+            rays,
+        )
+        return view
+
+
+@lru_cache(maxsize=8)
+def get_fog_of_war_ray_table(
+    fov: float, max_line_len: float
+) -> FogOfWarRayTable:
+    r"""Returns a shared :py:`FogOfWarRayTable`, built on first use."""
+    return FogOfWarRayTable(fov, max_line_len)
@@ -4,8 +4,11 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+import hashlib
 import os
-from typing import Any, Dict, List, Optional, Sequence, Tuple
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 import imageio
 import numpy as np
@@ -323,25 +326,144 @@ def get_topdown_map(
     return np.ascontiguousarray(top_down_map)
 
 
+def get_navmesh_hash(pathfinder) -> str:
+    r"""Returns a hash of the vertices of the navmesh of a pathfinder."""
+    vertices = np.asarray(
+        pathfinder.build_navmesh_vertices(), dtype=np.float32
+    )
+    return hashlib.sha1(vertices.tobytes()).hexdigest()
+
+
+class TopDownMapCache:
+    r"""Least recently used cache of rasterized top-down maps, keyed by their
+    content: the scene, the hash of the navmesh, the height and the
+    rasterization parameters.
+
+    If :p:`cache_dir` is set, the maps are also saved to this directory and
+    loaded from it on a miss, so that the maps are shared by processes, e.g.
+    the workers of a VectorEnv, and by successive runs.
+
+    :param max_size: the maximum number of maps kept in memory, 0 disables
+        the in-memory cache.
+    :param cache_dir: optional directory of the maps saved to disk.
+    """
+
+    def __init__(self, max_size: int = 8, cache_dir: Optional[str] = None):
+        self._max_size = max_size
+        self._cache_dir = cache_dir
+        self._maps: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._navmesh_hash_key: Optional[Tuple[Any, ...]] = None
+        self._navmesh_hash = ""
+        self.num_hits = 0
+        self.num_misses = 0
+
+    def get_navmesh_hash(self, scene: str, pathfinder) -> str:
+        r"""Returns :ref:`get_navmesh_hash` of :p:`pathfinder`, only computed
+        again when the scene, the pathfinder or its navigable area change.
+        """
+        key = (scene, id(pathfinder), pathfinder.navigable_area)
+        if key != self._navmesh_hash_key:
+            self._navmesh_hash = get_navmesh_hash(pathfinder)
+            self._navmesh_hash_key = key
+        return self._navmesh_hash
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(
+            self._cache_dir,
+            hashlib.sha1(key.encode("utf-8")).hexdigest() + ".npy",
+        )
+
+    def get_or_compute(
+        self, key: str, compute_map: Callable[[], np.ndarray]
+    ) -> np.ndarray:
+        r"""Returns a copy of the map of :p:`key`, computed with
+        :p:`compute_map` if it is neither in memory nor on disk.
+        """
+        if key in self._maps:
+            self._maps.move_to_end(key)
+            self.num_hits += 1
+            return self._maps[key].copy()
+
+        top_down_map = None
+        if self._cache_dir is not None:
+            path = self._get_path(key)
+            if os.path.exists(path):
+                try:
+                    top_down_map = np.load(path)
+                except (OSError, ValueError):
+                    top_down_map = None
+
+        if top_down_map is None:
+            self.num_misses += 1
+            top_down_map = compute_map()
+            if self._cache_dir is not None:
+                os.makedirs(self._cache_dir, exist_ok=True)
+                # Write then rename, so that concurrent processes never read
+                # a partial file.
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    np.save(f, top_down_map)
+                os.replace(tmp_path, path)
+        else:
+            self.num_hits += 1
+
+        if self._max_size > 0:
+            self._maps[key] = top_down_map
+            while len(self._maps) > self._max_size:
+                self._maps.popitem(last=False)
+        return top_down_map.copy()
+
+
+@lru_cache(maxsize=None)
+def get_topdown_map_cache(
+    max_size: int = 8, cache_dir: Optional[str] = None
+) -> TopDownMapCache:
+    r"""Returns the :ref:`TopDownMapCache` of the current process for these
+    parameters.
+    """
+    return TopDownMapCache(max_size, cache_dir)
+
+
 def get_topdown_map_from_sim(
     sim: "HabitatSim",
     map_resolution: int = 1024,
     draw_border: bool = True,
     meters_per_pixel: Optional[float] = None,
     agent_id: int = 0,
+    cache: Optional[TopDownMapCache] = None,
 ) -> np.ndarray:
     r"""Wrapper around :py:`get_topdown_map` that retrieves that pathfinder and heigh from the current simulator
 
     :param sim: Simulator instance.
     :param agent_id: The agent ID
+    :param cache: Optional cache of the maps, see :ref:`TopDownMapCache`.
     """
-    return get_topdown_map(
-        sim.pathfinder,
-        sim.get_agent(agent_id).state.position[1],
-        map_resolution,
-        draw_border,
-        meters_per_pixel,
+    height = sim.get_agent(agent_id).state.position[1]
+
+    def compute_map() -> np.ndarray:
+        return get_topdown_map(
+            sim.pathfinder,
+            height,
+            map_resolution,
+            draw_border,
+            meters_per_pixel,
+        )
+
+    if cache is None:
+        return compute_map()
+
+    scene = str(sim.habitat_config.scene)
+    key = "|".join(
+        [
+            scene,
+            cache.get_navmesh_hash(scene, sim.pathfinder),
+            repr(float(height)),
+            str(map_resolution),
+            str(draw_border),
+            repr(meters_per_pixel),
+        ]
     )
+    return cache.get_or_compute(key, compute_map)
 
 
 def colorize_topdown_map(
@@ -152,6 +152,44 @@ def test_ver_trainer(
             torch.distributed.destroy_process_group()
 
 
+@pytest.mark.skipif(
+    not baseline_installed, reason="baseline sub-module not installed"
+)
+def test_ver_action_plugin():
+    import numpy as np
+    from gym import spaces
+
+    from habitat_baselines.rl.ver.environment_worker import (
+        build_action_plugin_from_policy_action_space,
+    )
+
+    # Continuous actions are clipped for the whole batch by the inference
+    # worker, and copied out of the transfer buffer by the env workers
+    plugin = build_action_plugin_from_policy_action_space(
+        spaces.Box(low=-1.0, high=1.0, shape=(3,), dtype=np.float32)
+    )
+    transfer_actions = np.zeros((4, 3), dtype=np.float32)
+    new_reqs = np.array([0, 2])
+    transfer_actions[new_reqs] = plugin.transform_batch(
+        np.array([[2.0, -3.0, 0.5], [0.25, 1.5, -0.75]], dtype=np.float32)
+    )
+    actions = [plugin(transfer_actions[env_idx]) for env_idx in new_reqs]
+    expected_actions = [[1.0, -1.0, 0.5], [0.25, 1.0, -0.75]]
+    assert np.array_equal(actions, expected_actions)
+    # The next inference step overwrites the slots of the actions sent
+    transfer_actions[:] = 0.125
+    assert np.array_equal(actions, expected_actions)
+    assert not any(np.shares_memory(a, transfer_actions) for a in actions)
+
+    plugin = build_action_plugin_from_policy_action_space(spaces.Discrete(4))
+    transfer_actions = np.zeros((4, 1), dtype=np.int64)
+    transfer_actions[new_reqs] = plugin.transform_batch(np.array([[3], [1]]))
+    actions = [plugin(transfer_actions[env_idx]) for env_idx in new_reqs]
+    transfer_actions[:] = 0
+    assert actions == [3, 1]
+    assert all(isinstance(a, int) for a in actions)
+
+
 def test_cpca():
     cfg = get_config(
         "test/config/habitat_baselines/ppo_pointnav_test.yaml",
@@ -447,3 +485,283 @@ def test_batch_obs(sensor_device, batched_device):
     ]
 
     _ = batch_obs(sensors, device=batched_device)
+
+
+@pytest.mark.skipif(
+    not baseline_installed, reason="baseline sub-module not installed"
+)
+def test_batch_obs_changing_num_obs():
+    import numpy as np
+
+    # Pausing and resuming environments changes the number of observations
+    for num_obs in [4, 2, 5, 3, 9]:
+        observations = [
+            {
+                "rgb": np.random.randint(0, 255, (8, 8, 3), dtype=np.uint8),
+                "state": {"pos": torch.randn(3)},
+                "step": i,
+            }
+            for i in range(num_obs)
+        ]
+        batch = batch_obs(observations)
+        assert torch.equal(
+            batch["rgb"],
+            torch.stack([torch.from_numpy(o["rgb"]) for o in observations]),
+        )
+        assert torch.equal(
+            batch["state"]["pos"],
+            torch.stack([o["state"]["pos"] for o in observations]),
+        )
+        assert batch["step"].tolist() == list(range(num_obs))
+
+
+@pytest.mark.skipif(
+    not baseline_installed, reason="baseline sub-module not installed"
+)
+def test_batch_obs_changing_nested_keys():
+    import numpy as np
+
+    # The top level keys stay the same while the nested keys and shapes
+    # change, also between the observations of a batch
+    for state_shape, state_key in [
+        ((3,), "pos"),
+        ((3,), "rot"),
+        ((4,), "rot"),
+        ((4,), "pos"),
+    ]:
+        observations = [
+            {
+                "rgb": np.random.randint(0, 255, (8, 8, 3), dtype=np.uint8),
+                "state": {state_key: np.random.randn(*state_shape)},
+            }
+            for _ in range(4)
+        ]
+        batch = batch_obs(observations)
+        assert set(batch["state"].keys()) == {state_key}
+        assert np.array_equal(
+            batch["state"][state_key].numpy(),
+            np.stack([o["state"][state_key] for o in observations]),
+        )
+
+    observations = [
+        {"state": {"pos": np.zeros(3)}},
+        {"state": {"rot": np.zeros(3)}},
+    ]
+    with pytest.raises(ValueError):
+        batch_obs(observations)
+
+    # Only a later observation of the batch changes shape
+    observations = [{"state": {"pos": np.zeros(3)}} for _ in range(2)]
+    batch_obs(observations)
+    observations[1]["state"]["pos"] = np.zeros(4)
+    with pytest.raises(ValueError):
+        batch_obs(observations)
+
+
+def _reference_returns(
+    rewards, value_preds, masks, next_return, num_steps, use_gae, gamma, tau
+):
+    r"""Returns of the first num_steps steps written as explicit discounted
+    sums, independently of the backward recurrence:
+    returns[t] = value_preds[t] + sum_k (gamma * tau) ** (k - t) * delta[k]
+    with GAE, where delta[k] = rewards[k] + gamma * value_preds[k + 1] -
+    value_preds[k], and returns[t] = sum_k gamma ** (k - t) * rewards[k] +
+    gamma ** (num_steps - t) * next_return otherwise. The sums stop at the
+    end of the episode of step t.
+    """
+    masks = masks.to(rewards.dtype)
+    returns = torch.zeros_like(rewards[:num_steps])
+    for t in range(num_steps):
+        discount = torch.ones_like(rewards[0])
+        for k in range(t, num_steps):
+            if use_gae:
+                delta = (
+                    rewards[k]
+                    + gamma * value_preds[k + 1] * masks[k + 1]
+                    - value_preds[k]
+                )
+                returns[t] += discount * delta
+                discount = discount * gamma * tau * masks[k + 1]
+            else:
+                returns[t] += discount * rewards[k]
+                discount = discount * gamma * masks[k + 1]
+        if use_gae:
+            returns[t] += value_preds[t]
+        else:
+            returns[t] += discount * next_return
+
+    return returns
+
+
+@pytest.mark.skipif(
+    not baseline_installed, reason="baseline sub-module not installed"
+)
+@pytest.mark.parametrize(
+    "num_steps,use_gae",
+    list(itertools.product([1, 31, 32, 33, 128], [True, False])),
+)
+def test_compute_returns_implementations(num_steps, use_gae):
+    from habitat_baselines.common.return_computation import (
+        RETURNS_IMPLEMENTATIONS,
+        compute_returns_,
+    )
+
+    torch.manual_seed(0)
+    num_envs = 8
+    rewards = torch.randn(num_steps + 1, num_envs, 1)
+    value_preds = torch.randn(num_steps + 1, num_envs, 1)
+    masks = torch.rand(num_steps + 1, num_envs, 1) > 0.1
+    init_returns = torch.randn(num_steps + 1, num_envs, 1)
+
+    all_returns = {}
+    for implementation in RETURNS_IMPLEMENTATIONS:
+        returns = init_returns.clone()
+        compute_returns_(
+            returns,
+            rewards,
+            value_preds,
+            masks,
+            num_steps,
+            use_gae,
+            gamma=0.99,
+            tau=0.95,
+            implementation=implementation,
+            chunk_size=32,
+        )
+        all_returns[implementation] = returns
+
+    for returns in all_returns.values():
+        assert torch.allclose(returns, all_returns["loop"], atol=1e-5)
+
+    expected_returns = _reference_returns(
+        rewards,
+        value_preds,
+        masks,
+        init_returns[num_steps],
+        num_steps,
+        use_gae,
+        gamma=0.99,
+        tau=0.95,
+    )
+    for returns in all_returns.values():
+        assert torch.allclose(returns[:num_steps], expected_returns, atol=1e-4)
+        assert torch.equal(returns[num_steps:], init_returns[num_steps:])
+
+
+@pytest.mark.skipif(
+    not baseline_installed, reason="baseline sub-module not installed"
+)
+def test_episode_stats_accumulator():
+    from habitat_baselines.common.episode_stats import EpisodeStatsAccumulator
+
+    num_envs = 4
+    accumulator = EpisodeStatsAccumulator(num_envs, ignore_keys={"rank0"})
+    expected = {
+        k: torch.zeros(num_envs, 1) for k in ["count", "reward", "success"]
+    }
+    rng = random.Random(0)
+    for step in range(20):
+        env_slice = slice(step % 2 * 2, step % 2 * 2 + 2)
+        infos = [
+            {
+                "success": float(rng.random() > 0.5),
+                "rank0": 1.0,
+                "top_down_map": {"map": None},
+                # A nested metric that only appears after a few steps
+                **({"stage": {"a": rng.random()}} if step > 5 else {}),
+            }
+            for _ in range(2)
+        ]
+        done_masks = torch.tensor([[rng.random() > 0.3] for _ in infos])
+        rewards = torch.randn(2, 1)
+        accumulator.add(env_slice, infos, done_masks, rewards)
+
+        if step > 5 and "stage.a" not in expected:
+            expected["stage.a"] = torch.zeros(num_envs, 1)
+        for k, v in expected.items():
+            if k == "count":
+                values = torch.ones(2, 1)
+            elif k == "reward":
+                values = rewards
+            elif k == "stage.a":
+                values = torch.tensor([[info["stage"]["a"]] for info in infos])
+            else:
+                values = torch.tensor([[info[k]] for info in infos])
+            v[env_slice] += values.where(done_masks, values.new_zeros(()))
+
+    assert sorted(accumulator.keys) == sorted(expected.keys())
+    for k, v in expected.items():
+        assert torch.allclose(accumulator[k], v), k
+
+    restored = EpisodeStatsAccumulator(num_envs)
+    restored.load_state_dict(accumulator.state_dict())
+    for k in expected.keys():
+        assert torch.equal(restored[k], accumulator[k])
+
+
+@pytest.mark.skipif(
+    not baseline_installed, reason="baseline sub-module not installed"
+)
+@pytest.mark.parametrize("num_mini_batch", [1, 3])
+def test_prefetched_data_generator(num_mini_batch):
+    from types import SimpleNamespace
+
+    import numpy as np
+    from gym import spaces
+
+    from habitat_baselines.common.rollout_storage import RolloutStorage
+    from habitat_baselines.common.tensor_dict import TensorDict
+
+    num_steps, num_envs = 8, 6
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    observation_space = spaces.Dict(
+        {"pos": spaces.Box(-1, 1, (3,), dtype=np.float32)}
+    )
+    actor_critic = SimpleNamespace(
+        num_recurrent_layers=2, recurrent_hidden_size=4
+    )
+
+    torch.manual_seed(0)
+    rollouts = {}
+    for prefetch in [False, True]:
+        rollouts[prefetch] = RolloutStorage(
+            num_steps,
+            num_envs,
+            observation_space,
+            spaces.Discrete(4),
+            actor_critic,
+            prefetch_mini_batches=prefetch,
+        )
+    for v in rollouts[False].buffers.flatten()[1]:
+        if v.dtype == torch.bool:
+            v.copy_(torch.rand(v.shape) > 0.2)
+        else:
+            v.copy_(torch.randint(0, 10, v.shape))
+    rollouts[True].buffers = rollouts[False].buffers.map(lambda v: v.clone())
+    advantages = torch.randn(num_steps + 1, num_envs, 1, device=device)
+    for storage in rollouts.values():
+        storage.to(device)
+        for _ in range(num_steps):
+            storage.advance_rollout()
+
+    for epoch in range(3):
+        torch.manual_seed(epoch)
+        expected_batches = [
+            TensorDict.from_tree(batch)
+            for batch in rollouts[False].data_generator(
+                advantages, num_mini_batch
+            )
+        ]
+        torch.manual_seed(epoch)
+        num_batches = 0
+        for expected, batch in zip(
+            expected_batches,
+            rollouts[True].data_generator(advantages, num_mini_batch),
+        ):
+            expected_spec, expected_values = expected.flatten()
+            spec, values = TensorDict.from_tree(batch).flatten()
+            assert spec == expected_spec
+            for k, v, expected_v in zip(spec, values, expected_values):
+                assert torch.equal(v, expected_v), k
+            num_batches += 1
+        assert num_batches == num_mini_batch
@@ -4,6 +4,7 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+import copy
 import itertools
 import multiprocessing as mp
 import os
@@ -11,7 +12,7 @@ from typing import List
 
 import numpy as np
 import pytest
-from gym import Wrapper
+from gym import Env, Wrapper, spaces
 
 import habitat
 from habitat.config.default import get_agent_config, get_config
@@ -52,6 +53,47 @@ class DummyRLEnv(habitat.RLEnv):
         return {}
 
 
+class NestedObservationEnv(Env):
+    r"""Deterministic environment with nested dict observations."""
+
+    def __init__(self, seed):
+        self._rng = np.random.RandomState(seed)
+        self._step = 0
+        self.observation_space = spaces.Dict(
+            {
+                "rgb": spaces.Box(0, 255, (8, 8, 3), dtype=np.uint8),
+                "depth": spaces.Box(0.0, 1.0, (8, 8, 1), dtype=np.float32),
+                "state": spaces.Dict(
+                    {
+                        "pos": spaces.Box(-1.0, 1.0, (3,), dtype=np.float32),
+                        "rot": spaces.Box(-1.0, 1.0, (4,), dtype=np.float32),
+                    }
+                ),
+                "step": spaces.Discrete(10),
+            }
+        )
+        self.action_space = spaces.Discrete(2)
+
+    def _get_observations(self):
+        return {
+            "rgb": self._rng.randint(0, 256, (8, 8, 3), dtype=np.uint8),
+            "depth": self._rng.rand(8, 8, 1).astype(np.float32),
+            "state": {
+                "pos": self._rng.rand(3).astype(np.float32),
+                "rot": self._rng.rand(4).astype(np.float32),
+            },
+            "step": self._step,
+        }
+
+    def reset(self):
+        self._step = 0
+        return self._get_observations()
+
+    def step(self, action):
+        self._step += 1
+        return self._get_observations(), float(action), self._step == 5, {}
+
+
 class CallTestEnvWrapper(Wrapper):
     def __init__(self, env, env_ind=0):
         super(CallTestEnvWrapper, self).__init__(env)
@@ -187,6 +229,87 @@ def test_threaded_vectorized_env():
             assert len(observations) == num_envs
 
 
+@pytest.mark.parametrize(
+    "vector_env_cls", [habitat.VectorEnv, habitat.ThreadedVectorEnv]
+)
+def test_shared_memory_observations(vector_env_cls):
+    configs, _ = _load_test_data()
+    num_envs = len(configs)
+    env_fn_args = tuple((c,) for c in configs)
+    with vector_env_cls(
+        make_env_fn=make_gym_from_config,
+        env_fn_args=env_fn_args,
+        shared_memory_observations=True,
+    ) as envs:
+        observations = envs.reset()
+        assert len(observations) == num_envs
+        for _ in range(2 * configs[0].habitat.environment.max_episode_steps):
+            outputs = envs.step(
+                sample_non_stop_action_gym(envs.action_spaces[0], num_envs)
+            )
+            observations, _, _, _ = [list(x) for x in zip(*outputs)]
+            for obs, obs_space in zip(observations, envs.observation_spaces):
+                assert obs.keys() == obs_space.spaces.keys()
+                for k, v in obs.items():
+                    assert np.shape(v) == obs_space.spaces[k].shape
+
+    assert envs._shared_obs_buffers == []
+
+
+@pytest.mark.parametrize(
+    "vector_env_cls", [habitat.VectorEnv, habitat.ThreadedVectorEnv]
+)
+def test_shared_memory_observations_match_pickled(vector_env_cls):
+    env_fn_args = tuple((seed,) for seed in range(2))
+    all_observations = []
+    for shared_memory_observations in [False, True]:
+        with vector_env_cls(
+            make_env_fn=NestedObservationEnv,
+            env_fn_args=env_fn_args,
+            shared_memory_observations=shared_memory_observations,
+        ) as envs:
+            # The returned observations are views into the ring, copy them
+            observations = [copy.deepcopy(envs.reset())]
+            for step in range(12):
+                outputs = envs.step([step % 2] * envs.num_envs)
+                observations.append(
+                    copy.deepcopy([output[0] for output in outputs])
+                )
+                if shared_memory_observations:
+                    # Only the top level arrays are shared, the nested dict
+                    # observations are sent through the pipe
+                    assert len(envs._shared_obs_buffers) == envs.num_envs
+                    assert not outputs[0][0]["rgb"].flags.owndata
+        all_observations.append(observations)
+
+    np.testing.assert_equal(all_observations[1], all_observations[0])
+
+
+@pytest.mark.parametrize(
+    "vector_env_cls", [habitat.VectorEnv, habitat.ThreadedVectorEnv]
+)
+def test_async_step_batch(vector_env_cls):
+    configs, _ = _load_test_data()
+    num_envs = len(configs)
+    env_fn_args = tuple((c,) for c in configs)
+    with vector_env_cls(make_gym_from_config, env_fn_args=env_fn_args) as envs:
+        envs.reset()
+        # Pausing shifts the environment indices, workers keep their rank
+        envs.pause_at(0)
+        for _ in range(2 * configs[0].habitat.environment.max_episode_steps):
+            actions = np.array(
+                sample_non_stop_action_gym(
+                    envs.action_spaces[0], envs.num_envs
+                )
+            ).reshape(envs.num_envs)
+            envs.async_step_batch(actions)
+            outputs = envs.wait_step()
+            assert len(outputs) == num_envs - 1
+        envs.resume_all()
+
+    assert envs._shared_action_buffers == []
+
+
 @pytest.mark.parametrize("gpu2gpu", [False, True])
 def test_env(gpu2gpu):
     import habitat_sim
@@ -11,6 +11,9 @@ import pytest
 
 import habitat
 from habitat.config.default_structured_configs import TeleportActionConfig
+from habitat.tasks.nav.geodesic_distance_field import (
+    GeodesicDistanceFieldCache,
+)
 from habitat.utils.test_utils import sample_non_stop_action
 
 CFG_TEST = "test/config/habitat/habitat_all_sensors_test.yaml"
@@ -100,3 +103,58 @@ def test_task_actions_sampling(config_file):
             env.step(action)
             agent_state = env.sim.get_agent_state()
             habitat.logger.info(agent_state)
+
+
+def test_geodesic_distance_field():
+    goal = np.array([1.0, 0.0, 2.0])
+    num_exact_queries = 0
+
+    class PlanePathfinder:
+        # Open square floor, where geodesic distances are euclidean
+        def is_navigable(self, point):
+            return (
+                abs(point[0]) < 4.8 and abs(point[2]) < 4.8 and point[1] == 0
+            )
+
+    def exact_distance(position):
+        nonlocal num_exact_queries
+        num_exact_queries += 1
+        return float(np.linalg.norm(np.asarray(position) - goal))
+
+    cache = GeodesicDistanceFieldCache(
+        cell_size=0.25, exact_radius=1.0, max_size=2
+    )
+    field = cache.get("scene", goal[None])
+    assert cache.get("scene", goal[None].copy()) is field
+    assert cache.get("other_scene", goal[None]) is not field
+
+    rng = np.random.default_rng(0)
+    pathfinder = PlanePathfinder()
+    for _ in range(200):
+        position = np.array(
+            [rng.uniform(-4.5, 4.5), 0.0, rng.uniform(-4.5, 4.5)]
+        )
+        expected = float(np.linalg.norm(position - goal))
+        num_exact_queries = 0
+        distance = field.get_distance(position, pathfinder, exact_distance)
+        if expected < 0.9:
+            # Close to the goal the distance is always exact
+            assert distance == expected
+        else:
+            assert distance == pytest.approx(expected, abs=0.05)
+
+    # Once the vertices are cached, far positions need no exact query
+    num_exact_queries = 0
+    field.get_distance(np.array([-4.1, 0.0, -4.1]), pathfinder, exact_distance)
+    field.get_distance(np.array([-4.1, 0.0, -4.1]), pathfinder, exact_distance)
+    assert num_exact_queries <= 4
+
+    # Positions next to non navigable vertices fall back to exact queries
+    position = np.array([4.9, 0.0, 0.0])
+    assert field.get_distance(
+        position, pathfinder, exact_distance
+    ) == np.linalg.norm(position - goal)
+
+    # The least recently used field is evicted
+    cache.get("third_scene", goal[None])
+    assert cache.get("scene", goal[None]) is not field
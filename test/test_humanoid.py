@@ -5,6 +5,7 @@
 # LICENSE file in the root directory of this source tree.
 
 import math
+import pickle as pkl
 from os import path as osp
 
 import gym
@@ -19,6 +20,8 @@ import habitat_sim.agent
 from habitat.articulated_agent_controllers import (
     HumanoidRearrangeController,
     HumanoidSeqPoseController,
+    Motion,
+    get_motion_library,
 )
 
 default_sim_settings = {
@@ -531,3 +534,206 @@ def test_humanoid_seqpose_controller(humanoid_name):
                 "test_humanoid_wrapper",
                 open_vid=True,
             )
+
+
+def _reference_reach_pose(reach_data, position):
+    """
+    Scalar trilinear interpolation of the reaching poses, as computed for a
+    single position before the poses were interpolated in batches.
+    """
+    coord_info = reach_data.coord_info
+
+    def find_index_quant(minv, maxv, num_bins, value, interp):
+        if interp:
+            value = max(min(value, maxv), 0)
+        else:
+            value = max(min(value, maxv), minv)
+        index = (value - minv) / (maxv - minv) * (num_bins - 1)
+        lower = min(math.floor(index), num_bins - 1)
+        upper = max(min(math.ceil(index), num_bins - 1), 0)
+        t = index - lower
+        if lower < 0:
+            lower = int((0.0 - minv) * (num_bins - 1) / (maxv - minv))
+            t = (index - lower) / -lower
+            lower = -1
+        return lower, upper, t
+
+    def comp_inter(x_i, y_i, z_i):
+        if x_i < 0 or y_i < 0 or z_i < 0:
+            return -1
+        num_bins = coord_info["num_bins"]
+        return y_i * num_bins[0] * num_bins[2] + x_i * num_bins[2] + z_i
+
+    def inter_data(x_i, y_i, z_i, dat, is_quat=False):
+        (x0, x1, xd), (y0, y1, yd), (z0, z1, zd) = x_i, y_i, z_i
+        c00 = (
+            dat[comp_inter(x0, y0, z0)] * (1 - xd)
+            + dat[comp_inter(x1, y0, z0)] * xd
+        )
+        c01 = (
+            dat[comp_inter(x0, y0, z1)] * (1 - xd)
+            + dat[comp_inter(x1, y0, z1)] * xd
+        )
+        c10 = (
+            dat[comp_inter(x0, y1, z0)] * (1 - xd)
+            + dat[comp_inter(x1, y1, z0)] * xd
+        )
+        c11 = (
+            dat[comp_inter(x0, y1, z1)] * (1 - xd)
+            + dat[comp_inter(x1, y1, z1)] * xd
+        )
+        c0 = c00 * (1 - yd) + c10 * yd
+        c1 = c01 * (1 - yd) + c11 * yd
+        c = c0 * (1 - zd) + c1 * zd
+        if is_quat:
+            c = c / np.linalg.norm(c, axis=-1)[..., None]
+        return c
+
+    x_ind, y_ind, z_ind = [
+        find_index_quant(
+            coord_info["min"][i],
+            coord_info["max"][i],
+            coord_info["num_bins"][i],
+            position[i],
+            interp=i == 2,
+        )
+        for i in range(3)
+    ]
+    joints = inter_data(
+        x_ind, y_ind, z_ind, np.asarray(reach_data.joints), is_quat=True
+    )
+    translation = inter_data(
+        x_ind, y_ind, z_ind, np.asarray(reach_data.translations)
+    )
+    rotation = inter_data(
+        x_ind, y_ind, z_ind, np.asarray(reach_data.rotations), is_quat=True
+    )
+    quat_rot = mn.Quaternion(mn.Vector3(rotation[:3]), rotation[-1])
+    transform = (
+        mn.Matrix4.rotation_y(mn.Rad(-np.pi / 2.0))
+        @ mn.Matrix4.rotation_z(mn.Rad(-np.pi / 2.0))
+        @ mn.Matrix4.from_(quat_rot.to_matrix(), mn.Vector3(translation))
+    )
+    return joints, transform
+
+
+def test_motion_library(tmp_path):
+    rng = np.random.default_rng(0)
+    num_joints = 5
+    walk_motion = {
+        "joints_array": rng.random((6, num_joints, 4)),
+        "transform_array": np.tile(np.eye(4), (6, 1, 1)),
+        "displacement": np.linspace(0.0, 1.0, 6),
+        "fps": 30,
+    }
+    # Grid of 2 x 2 x 3 poses, with varying root rotations and translations.
+    num_poses = 12
+    hand_transforms = np.tile(np.eye(4), (num_poses, 1, 1))
+    for transform, angle in zip(
+        hand_transforms, rng.uniform(-1.0, 1.0, num_poses)
+    ):
+        transform[:3, :3] = np.array(
+            mn.Matrix4.rotation_y(mn.Rad(angle)).rotation()
+        )
+        transform[:3, 3] = rng.uniform(-1.0, 1.0, 3)
+    hand_motion = {
+        "joints_array": rng.random((num_poses * num_joints, 4)),
+        "transform_array": hand_transforms,
+    }
+    motion_path = str(tmp_path / "motion_data.pkl")
+    with open(motion_path, "wb") as f:
+        pkl.dump(
+            {
+                "walk_motion": walk_motion,
+                "stop_pose": {
+                    "joints": rng.random((1, num_joints * 4)),
+                    "transform": np.eye(4),
+                },
+                "left_hand": {
+                    "pose_motion": hand_motion,
+                    "coord_info": np.array(
+                        {
+                            "min": [0, 0, 0.5],
+                            "max": [1, 1, 1.5],
+                            "num_bins": [2, 2, 3],
+                        }
+                    ),
+                },
+            },
+            f,
+        )
+
+    controller = HumanoidRearrangeController(motion_path)
+    other_controller = HumanoidRearrangeController(motion_path)
+    library = get_motion_library(motion_path)
+    assert osp.isfile(motion_path + ".motionlib")
+    # The motion data is loaded once and shared by all the controllers.
+    assert controller.walk_motion is other_controller.walk_motion
+    assert isinstance(library.get_reach_data("left_hand").joints, np.memmap)
+    assert controller.hand_processed_data["right_hand"] is None
+    assert np.allclose(
+        controller.walk_motion.displacement, walk_motion["displacement"]
+    )
+
+    expected = controller.build_ik_vectors(
+        Motion(
+            hand_motion["joints_array"].reshape(num_poses, -1, 4),
+            hand_motion["transform_array"],
+            None,
+            1,
+        )
+    )
+    reach_data = controller.hand_processed_data["left_hand"]
+    for data, expected_data in zip(
+        (reach_data.joints, reach_data.rotations, reach_data.translations),
+        expected,
+    ):
+        assert np.allclose(data, expected_data)
+
+    # The batched reach poses match the scalar reference, inside and outside
+    # of the grid, and below the minimum z where the stop pose is used.
+    relative_positions = np.array(
+        [
+            [0.25, 0.5, 0.75],
+            [0.9, 0.1, 1.2],
+            [-0.5, 1.5, 1.0],
+            [2.0, -1.0, 2.0],
+            [0.3, 0.6, 0.25],
+            [0.7, 0.2, 0.4],
+            [0.5, 0.5, -0.3],
+        ]
+    )
+    controller.reset(mn.Matrix4.translation(mn.Vector3(1.0, 0.0, 2.0)))
+    base_transform = controller.obj_transform_base
+    relative_to_world = (
+        mn.Matrix4.rotation_y(mn.Rad(-np.pi / 2.0))
+        @ mn.Matrix4.rotation_x(mn.Rad(-np.pi / 2.0))
+        @ base_transform.inverted()
+    ).inverted()
+    positions = np.array(
+        [
+            list(
+                base_transform.translation
+                + relative_to_world.transform_vector(mn.Vector3(relative_pos))
+            )
+            for relative_pos in relative_positions
+        ]
+    )
+    joints, transforms = controller.calculate_reach_poses(positions)
+    assert joints.shape == (len(positions), num_joints, 4)
+    point = mn.Vector3(0.1, 0.2, 0.3)
+    for relative_pos, joint, transform in zip(
+        relative_positions, joints, transforms
+    ):
+        expected_joints, expected_transform = _reference_reach_pose(
+            reach_data, relative_pos
+        )
+        assert np.allclose(joint, expected_joints)
+        assert np.allclose(
+            (transform @ np.array([0.1, 0.2, 0.3, 1.0]))[:3],
+            expected_transform.transform_point(point),
+        )
+
+    # The single position API sets the controller state.
+    controller.calculate_reach_pose(mn.Vector3(positions[-1]))
+    assert np.allclose(controller.joint_pose, joints[-1].reshape(-1))
@@ -14,6 +14,7 @@ from habitat.config.default import get_config
 from habitat.core.embodied_task import Episode
 from habitat.core.logging import logger
 from habitat.datasets import make_dataset
+from habitat.datasets.binary_format import load_columnar, save_columnar
 from habitat.datasets.object_nav.object_nav_dataset import ObjectNavDatasetV1
 from habitat.tasks.nav.nav import MoveForwardAction
 
@@ -66,6 +67,88 @@ def test_object_nav_dataset(config_file):
     check_json_serialization(dataset)
 
 
+def _object_goal(object_id, x):
+    return {
+        "object_id": object_id,
+        "object_category": "chair",
+        "position": [x, 0.1, -x / 3],
+        "radius": None,
+        "view_points": [
+            {
+                "agent_state": {
+                    "position": [x + 0.1, 0.2, 1 / 3],
+                    "rotation": [0.0, 0.7071067811865476, 0.0, 0.7],
+                },
+                "iou": 0.123456789,
+            }
+        ],
+    }
+
+
+def test_binary_object_nav_dataset(tmp_path):
+    dataset = ObjectNavDatasetV1()
+    dataset.from_json(
+        json.dumps(
+            {
+                "category_to_task_category_id": {"chair": 0},
+                "category_to_mp3d_category_id": {"chair": 3},
+                "goals_by_category": {
+                    "scene_a.glb_chair": [
+                        _object_goal("1", 0.1),
+                        _object_goal("2", 2 / 3),
+                    ],
+                    "scene_b.glb_chair": [_object_goal("3", 1e-7)],
+                },
+                "episodes": [
+                    {
+                        "episode_id": "0",
+                        "scene_id": f"data/{scene}",
+                        "object_category": "chair",
+                        "start_position": [0.1, 0.2, 0.3],
+                        "start_rotation": [0.0, 0.1, 0.0, 0.99498743710662],
+                        "info": {"geodesic_distance": 1.1},
+                        "goals": [],
+                        "shortest_paths": [
+                            [
+                                {
+                                    "position": [0.1, 0.2, 0.3],
+                                    "rotation": None,
+                                    "action": 1,
+                                },
+                                {
+                                    "position": None,
+                                    "rotation": None,
+                                    "action": None,
+                                },
+                            ]
+                        ],
+                    }
+                    for scene in ["scene_a.glb", "scene_b.glb", "scene_a.glb"]
+                ],
+            }
+        )
+    )
+
+    binary_path = str(tmp_path / "dataset.npz")
+    save_columnar(binary_path, dataset.to_binary())
+    decoded_dataset = ObjectNavDatasetV1()
+    decoded_dataset.from_binary(load_columnar(binary_path))
+
+    # All the goals keys are visible before their goals are built
+    goals_by_category = decoded_dataset.goals_by_category
+    assert len(goals_by_category) == 2
+    assert set(goals_by_category.keys()) == set(dataset.goals_by_category)
+    assert dict(goals_by_category.items()) == dataset.goals_by_category
+
+    assert decoded_dataset.category_to_task_category_id == {"chair": 0}
+    assert len(decoded_dataset.episodes) == len(dataset.episodes)
+    for episode, decoded_episode in zip(
+        dataset.episodes, decoded_dataset.episodes
+    ):
+        assert decoded_episode == episode
+    check_json_serialization(decoded_dataset)
+
+
 @pytest.mark.parametrize(
     "config_file",
     [
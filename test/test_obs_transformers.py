@@ -2,12 +2,18 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+import os
+
 import pytest
+import torch
 from gym import spaces
 from gym.vector.utils.spaces import batch_space
 
 from habitat_baselines.common.baseline_registry import baseline_registry
 from habitat_baselines.common.obs_transformers import (  # get_active_obs_transforms,
+    Cube2Equirect,
+    Cube2Fisheye,
+    Equirect2Cube,
     apply_obs_transforms_batch,
     apply_obs_transforms_obs_space,
 )
@@ -62,3 +68,37 @@ def test_transforms(obs_transform_config: ObsTransformConfig):
     assert modified_obs_space.contains(
         {k: v[0] for k, v in transformed_obs.items()}
     ), f"Observation transform generated the observation ({str({k: v.shape for k,v in transformed_obs.items()}) }) which is incompatible with the defined observation space {modified_obs_space}"
+
+
+@pytest.mark.parametrize(
+    "converter_cls,converter_args,input_shape",
+    [
+        (Cube2Equirect, (32, 64), (12, 3, 16, 16)),
+        (
+            Cube2Fisheye,
+            (32, 32, 180, 16, 16, 6.4, 6.4, 0.2, 0.2),
+            (12, 3, 16, 16),
+        ),
+        (Equirect2Cube, (16, 16), (2, 3, 32, 64)),
+    ],
+)
+def test_projection_sampling_map(
+    tmp_path, converter_cls, converter_args, input_shape
+):
+    batch = torch.rand(input_shape)
+    expected = converter_cls(*converter_args, use_sampling_map=False)(batch)
+    converter = converter_cls(*converter_args, use_sampling_map=True)
+    assert torch.allclose(converter(batch), expected, atol=1e-4)
+
+    # The sampling map is loaded from the cache.
+    cached_converter = converter_cls(
+        *converter_args, sampling_map_cache_dir=str(tmp_path)
+    )
+    assert len(os.listdir(tmp_path)) == 1
+    cached_converter = converter_cls(
+        *converter_args, sampling_map_cache_dir=str(tmp_path)
+    )
+    assert torch.equal(
+        cached_converter.sampling_input_ids, converter.sampling_input_ids
+    )
+    assert torch.allclose(cached_converter(batch), expected, atol=1e-4)
@@ -16,6 +16,7 @@ from habitat.config.default import get_config
 from habitat.core.embodied_task import Episode
 from habitat.core.logging import logger
 from habitat.datasets import make_dataset
+from habitat.datasets.binary_format import load_columnar, save_columnar
 from habitat.datasets.pointnav import pointnav_generator as pointnav_generator
 from habitat.datasets.pointnav.pointnav_dataset import (
     DEFAULT_SCENE_PATH_PREFIX,
@@ -66,6 +67,52 @@ def test_single_pointnav_dataset():
     check_json_serialization(dataset)
 
 
+def test_binary_pointnav_dataset(tmp_path):
+    dataset_config = get_config(
+        "benchmark/nav/pointnav/pointnav_habitat_test.yaml"
+    ).habitat.dataset
+    if not PointNavDatasetV1.check_config_paths_exist(dataset_config):
+        pytest.skip("Test skipped as dataset files are missing.")
+    dataset = PointNavDatasetV1(config=dataset_config)
+
+    binary_path = str(tmp_path / "dataset.npz")
+    save_columnar(binary_path, dataset.to_binary())
+    decoded_dataset = PointNavDatasetV1()
+    decoded_dataset.from_binary(load_columnar(binary_path))
+
+    assert len(decoded_dataset.episodes) == len(dataset.episodes)
+    assert decoded_dataset.scene_ids == dataset.scene_ids
+    assert decoded_dataset.get_scene_episodes(dataset.scene_ids[0])
+    for episode, decoded_episode in zip(
+        dataset.episodes, decoded_dataset.episodes
+    ):
+        # Decoding is lossless
+        assert decoded_episode == episode
+    check_json_serialization(decoded_dataset)
+
+
+@pytest.mark.parametrize("load_workers_type", ["thread", "process"])
+def test_parallel_cached_pointnav_dataset(tmp_path, load_workers_type):
+    dataset_config = get_config(
+        "benchmark/nav/pointnav/pointnav_habitat_test.yaml"
+    ).habitat.dataset
+    if not PointNavDatasetV1.check_config_paths_exist(dataset_config):
+        pytest.skip("Test skipped as dataset files are missing.")
+    dataset = PointNavDatasetV1(config=dataset_config)
+
+    with habitat.config.read_write(dataset_config):
+        dataset_config.num_load_workers = 2
+        dataset_config.load_workers_type = load_workers_type
+        dataset_config.decoded_cache_dir = str(tmp_path)
+    # The first load fills the cache, the second one reads from it. Both
+    # give the same episodes as the JSON load.
+    for _ in range(2):
+        cached_dataset = PointNavDatasetV1(config=dataset_config)
+        assert len(os.listdir(tmp_path)) > 0
+        assert cached_dataset.scene_ids == dataset.scene_ids
+        assert list(cached_dataset.episodes) == list(dataset.episodes)
+
+
 def test_multiple_files_scene_path():
     dataset_config = get_config(CFG_MULTI_TEST).habitat.dataset
     if not PointNavDatasetV1.check_config_paths_exist(dataset_config):
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+# Copyright (c) Meta Platforms, Inc. and its affiliates.
+# This source code is licensed under the MIT license found in the
+# LICENSE file in the root directory of this source tree.
+
+import json
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from habitat.utils.profiler import Profiler
+
+
+def test_profiler_scopes(tmp_path):
+    trace_path = str(tmp_path / "trace.json")
+    profiler = Profiler(enabled=True, trace_path=trace_path)
+
+    @profiler.profile("inner")
+    def inner():
+        time.sleep(0.001)
+
+    def run():
+        for _ in range(10):
+            with profiler.scope("outer"):
+                inner()
+                profiler.record("extra", 0.002)
+
+    threads = [threading.Thread(target=run) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = profiler.get_stats()
+    assert set(stats.keys()) == {"outer", "outer.inner", "outer.extra"}
+    assert stats["outer"]["count"] == 20
+    inner_stats = stats["outer.inner"]
+    assert 0.001 <= inner_stats["p50"] <= inner_stats["p99"]
+    assert inner_stats["p99"] <= inner_stats["max"]
+    assert stats["outer.extra"]["p50"] == pytest.approx(0.002, rel=0.1)
+
+    # Merging the state of another process.
+    other = Profiler(enabled=True, trace_path=trace_path)
+    other.merge_state(profiler.get_state())
+    other.merge_state(profiler.get_state(reset=True))
+    assert other.get_stats()["outer"]["count"] == 40
+    assert profiler.get_stats() == {}
+
+    other.export_chrome_trace()
+    with open(trace_path) as f:
+        events = json.load(f)["traceEvents"]
+    assert len(events) == 120
+    assert {e["name"] for e in events} == {"outer", "inner", "extra"}
+    assert all(e["ph"] == "X" and e["dur"] > 0 for e in events)
+
+    # A disabled profiler records nothing.
+    disabled = Profiler(enabled=False)
+    with disabled.scope("outer"):
+        disabled.record("extra", 0.002)
+    assert disabled.get_stats() == {}
+
+
+def test_profiler_percentiles():
+    profiler = Profiler(enabled=True)
+    durations = np.random.RandomState(0).lognormal(-6.0, 1.5, size=10000)
+    for duration in durations:
+        profiler.record("step", duration)
+
+    stats = profiler.get_stats()["step"]
+    assert stats["count"] == len(durations)
+    assert stats["max"] == durations.max()
+    sorted_durations = np.sort(durations)
+    for q in [50, 95, 99]:
+        expected = sorted_durations[int(np.ceil(q / 100 * len(durations))) - 1]
+        assert stats[f"p{q}"] == pytest.approx(expected, rel=2 ** (1 / 16) - 1)
+
+
+def test_reentrant_timing_context():
+    from habitat_baselines.utils.timing import Timing
+
+    timer = Timing()
+
+    @timer.timeit("recurse")
+    def recurse(depth):
+        time.sleep(0.002)
+        if depth > 0:
+            recurse(depth - 1)
+
+    # The outermost call, which exits last, includes the 4 sleeps.
+    recurse(3)
+    assert timer["recurse"] >= 0.008
@@ -4,10 +4,13 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
+import gzip
+import itertools
 import json
 import os.path as osp
 import random
 import time
+from functools import partial
 from glob import glob
 
 import magnum as mn
@@ -28,6 +31,13 @@ from habitat.core.embodied_task import Episode
 from habitat.core.environments import get_env_class
 from habitat.core.logging import logger
 from habitat.datasets.rearrange.rearrange_dataset import RearrangeDatasetV0
+from habitat.tasks.rearrange.actions.oracle_nav_path_cache import (
+    OracleNavPathCache,
+)
+from habitat.tasks.rearrange.multi_task.pddl_defined_predicates import (
+    is_robot_at_position,
+)
+from habitat.tasks.rearrange.multi_task.pddl_predicate import Predicate
 from habitat.utils.geometry_utils import is_point_in_triangle
 
 CFG_TEST = "benchmark/rearrange/skills/pick.yaml"
@@ -52,7 +62,7 @@ def check_binary_serialization(dataset: RearrangeDatasetV0):
     assert isinstance(episode, Episode)
     dataset_decoded_bin = decoded_dataset.to_binary()
     # check that the expected keys are present in both encoded Dicts
-    expected_keys = ["all_transforms", "idx_to_name", "all_eps"]
+    expected_keys = ["transforms", "name_table", "extras_blob"]
     for key in expected_keys:
         assert key in bin_dict
         assert key in dataset_decoded_bin
@@ -99,6 +109,92 @@ def test_rearrange_dataset():
     check_binary_serialization(dataset)
 
 
+def test_obj_state_cache():
+    """
+    Checks the cached object states match the simulator after each step.
+    """
+    config = get_config(
+        CFG_TEST,
+        [
+            "habitat.simulator.concur_render=False",
+            "habitat.dataset.split=val",
+        ],
+    )
+    if not RearrangeDatasetV0.check_config_paths_exist(config.habitat.dataset):
+        pytest.skip(
+            "Please download ReplicaCAD RearrangeDataset Dataset to data folder."
+        )
+
+    with habitat.Env(config=config) as env:
+        env.reset()
+        sim = env.sim
+        rom = sim.get_rigid_object_manager()
+        for _ in range(5):
+            scene_pos = sim.get_scene_pos()
+            assert sim.get_scene_pos() is scene_pos
+            assert not scene_pos.flags.writeable
+            assert np.allclose(
+                scene_pos,
+                [
+                    rom.get_object_by_id(idx).translation
+                    for idx in sim.scene_obj_ids
+                ],
+            )
+            assert sim.get_scene_rot().shape == (len(sim.scene_obj_ids), 4)
+            assert np.allclose(
+                sim.get_agent_ee_pos(0),
+                sim.get_agent_data(0)
+                .articulated_agent.ee_transform()
+                .translation,
+            )
+
+            env.step(env.action_space.sample())
+            assert sim.get_scene_pos() is not scene_pos
+
+
+def test_obj_state_cache_holding():
+    """
+    Checks the cached object states are updated when the base moves while
+    holding an object, without stepping the simulation.
+    """
+    config = get_config(
+        CFG_TEST,
+        [
+            "habitat.simulator.concur_render=False",
+            "habitat.dataset.split=val",
+        ],
+    )
+    if not RearrangeDatasetV0.check_config_paths_exist(config.habitat.dataset):
+        pytest.skip(
+            "Please download ReplicaCAD RearrangeDataset Dataset to data folder."
+        )
+
+    with habitat.Env(config=config) as env:
+        env.reset()
+        sim = env.sim
+        rom = sim.get_rigid_object_manager()
+        obj_id = sim.scene_obj_ids[0]
+        sim.grasp_mgr.snap_to_obj(obj_id)
+        base_action = env.task.actions["base_velocity"]
+        articulated_agent = sim.get_agent_data(0).articulated_agent
+
+        for base_vel in [[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]]:
+            start_pos = np.array(sim.get_scene_pos()[0])
+            start_ee_pos = np.array(sim.get_agent_ee_pos(0))
+            version = sim.obj_state_version
+
+            base_action.step(base_vel=np.array(base_vel))
+            assert sim.obj_state_version != version
+            held_pos = np.array(rom.get_object_by_id(obj_id).translation)
+            assert not np.allclose(held_pos, start_pos)
+            assert np.allclose(sim.get_scene_pos()[0], held_pos)
+            assert not np.allclose(sim.get_agent_ee_pos(0), start_ee_pos)
+            assert np.allclose(
+                sim.get_agent_ee_pos(0),
+                articulated_agent.ee_transform().translation,
+            )
+
+
 def _get_test_pddl():
     """
     Helper to get a test PDDL instance.
@@ -177,6 +273,188 @@ def test_pddl_action_postconds():
     sim_info.sim.close()
 
 
+def test_pddl_predicate_index():
+    """
+    Checks the indexed predicate evaluation matches evaluating every
+    grounding of the predicates, as the simulator state changes.
+    """
+
+    pddl = _get_test_pddl()
+    sim_info = pddl.sim_info
+    all_entities = list(pddl.all_entities.values())
+
+    def get_true_predicates_brute_force():
+        true_preds = []
+        for pred in pddl.predicates.values():
+            for entity_input in itertools.permutations(
+                all_entities, pred.n_args
+            ):
+                if not pred.are_args_compatible(list(entity_input)):
+                    continue
+                use_pred = pred.clone()
+                use_pred.set_param_values(entity_input)
+                if use_pred.is_true(sim_info):
+                    true_preds.append(use_pred)
+        return [p.compact_str for p in true_preds]
+
+    poss_preds = pddl.get_possible_predicates()
+    poss_actions = pddl.get_possible_actions()
+    for action in [None, *poss_actions[:10]]:
+        if action is not None:
+            action.apply_if_true(sim_info)
+        true_preds = pddl.get_true_predicates()
+        assert [
+            p.compact_str for p in true_preds
+        ] == get_true_predicates_brute_force()
+        assert pddl.get_true_predicates() == true_preds
+        assert pddl.are_predicates_true(poss_preds).tolist() == [
+            p.is_true(sim_info) for p in poss_preds
+        ]
+    sim_info.sim.close()
+
+
+def test_pddl_predicate_index_default_agent():
+    """
+    Checks the indexed predicates reading the default agent, which is not one
+    of their arguments, are evaluated again when only the agent moves.
+    """
+
+    pddl = _get_test_pddl()
+    sim_info = pddl.sim_info
+    robot_at = pddl.predicates["robot_at"]
+    pddl.predicates["default_robot_at"] = Predicate(
+        "default_robot_at",
+        partial(is_robot_at_position, dist_thresh=2.0),
+        None,
+        [arg for arg in robot_at.args if arg.name != "robot"],
+    )
+    pddl._clear_pred_indices()
+    default_preds = [
+        p
+        for p in pddl.get_possible_predicates()
+        if p.name == "default_robot_at"
+    ]
+    assert len(default_preds) > 0
+    assert all(p.reads_default_agent for p in default_preds)
+
+    articulated_agent = sim_info.sim.get_agent_data(None).articulated_agent
+    for at_pred in default_preds:
+        # Only move the agent, above the argument of the predicate.
+        at_pos = sim_info.get_entity_pos(at_pred._arg_values[0])
+        articulated_agent.base_pos = mn.Vector3(
+            at_pos[0], articulated_agent.base_pos[1], at_pos[2]
+        )
+        sim_info.sim.invalidate_obj_state_cache()
+        assert pddl.are_predicates_true(default_preds).tolist() == [
+            p.is_true(sim_info) for p in default_preds
+        ]
+        assert pddl.are_predicates_true([at_pred])[0]
+
+    articulated_agent.base_pos = articulated_agent.base_pos + mn.Vector3(
+        100.0, 0.0, 0.0
+    )
+    sim_info.sim.invalidate_obj_state_cache()
+    assert not pddl.are_predicates_true(default_preds).any()
+    sim_info.sim.close()
+
+
+def test_pddl_possible_actions():
+    """
+    Checks the grounded action table matches grounding and checking every
+    action candidate.
+    """
+
+    pddl = _get_test_pddl()
+    all_entities = list(pddl.all_entities.values())
+    true_preds = pddl.get_true_predicates()
+
+    def get_possible_actions_brute_force(filter_entities, true_preds):
+        matching_actions = []
+        for action in pddl.actions.values():
+            for entity_input in itertools.combinations(
+                all_entities, action.n_args
+            ):
+                if not all(e in entity_input for e in filter_entities):
+                    continue
+                for entity_inputs in itertools.permutations(entity_input):
+                    if not action.are_args_compatible(list(entity_inputs)):
+                        continue
+                    new_action = action.clone()
+                    new_action.set_param_values(entity_inputs)
+                    if (
+                        true_preds is not None
+                        and not new_action.is_precond_satisfied_from_predicates(
+                            true_preds
+                        )
+                    ):
+                        continue
+                    matching_actions.append(new_action.compact_str)
+        return matching_actions
+
+    robot = pddl.get_entity("robot_0")
+    for filter_entities in [[], [robot]]:
+        for preds in [None, true_preds]:
+            assert [
+                action.compact_str
+                for action in pddl.get_possible_actions(
+                    filter_entities=filter_entities, true_preds=preds
+                )
+            ] == get_possible_actions_brute_force(filter_entities, preds)
+    pddl.sim_info.sim.close()
+
+
+def test_oracle_nav_path_cache():
+    """
+    Follows an L shaped path around a wall and checks the path is only
+    planned again when the agent leaves it.
+    """
+
+    corner = np.array([2.0, 0.0, 0.0])
+    num_find_path = 0
+
+    def find_path(start, end):
+        nonlocal num_find_path
+        num_find_path += 1
+        # Points beyond x=2 can't be reached directly from z<2.
+        if start[0] < corner[0] - 1e-3 and start[2] < 2.0:
+            return [start, corner, end]
+        return [start, end]
+
+    cache = OracleNavPathCache(
+        find_path, corridor_radius=0.3, waypoint_radius=0.1
+    )
+    target = np.array([2.0, 0.0, 3.0])
+    agent_pos = np.zeros(3)
+    for _ in range(100):
+        path = cache.get_path(agent_pos, target, navmesh_key=0)
+        if np.linalg.norm(target - agent_pos) < 0.05:
+            break
+        to_waypoint = path[1] - agent_pos
+        agent_pos = agent_pos + to_waypoint * min(
+            1.0, 0.05 / np.linalg.norm(to_waypoint)
+        )
+    assert np.linalg.norm(target - agent_pos) < 0.05
+    assert num_find_path == cache.num_replans == 1
+    assert cache.num_hits > 50
+
+    # Leaving the corridor, changing the target or the navmesh plans the
+    # path again.
+    cache.get_path(np.array([1.0, 0.0, 1.0]), target, navmesh_key=0)
+    assert cache.num_replans == 2
+    cache.get_path(np.array([1.0, 0.0, 1.0]), corner, navmesh_key=0)
+    assert cache.num_replans == 3
+    cache.get_path(np.array([1.0, 0.0, 1.0]), corner, navmesh_key=1)
+    assert cache.num_replans == 4
+
+    # A corridor radius of 0 plans the path at every step.
+    cache = OracleNavPathCache(
+        find_path, corridor_radius=0.0, waypoint_radius=0.1
+    )
+    for _ in range(3):
+        cache.get_path(np.zeros(3), target, navmesh_key=0)
+    assert cache.num_replans == 3
+
+
 TEST_CFG_PATHS = list(
     glob(
         "habitat-lab/habitat/config/benchmark/rearrange/**/*.yaml",
@@ -272,6 +550,35 @@ def test_rearrange_episode_generator(
     )
 
 
+@pytest.mark.parametrize("config", [GEN_TEST_CFG])
+def test_parallel_rearrange_episode_generator(config, tmp_path):
+    cfg = rr_gen.get_config_defaults()
+    override_config = OmegaConf.load(config)
+    cfg = OmegaConf.merge(cfg, override_config)
+    assert isinstance(cfg, DictConfig)
+
+    datasets = []
+    for run in range(2):
+        output_path = str(tmp_path / f"run_{run}" / "dataset.json.gz")
+        rr_gen.generate_episodes_parallel(
+            cfg,
+            output_path,
+            num_episodes=2,
+            num_workers=2,
+            episodes_per_shard=1,
+            seed=0,
+            db_output=str(tmp_path / "debug"),
+        )
+        dataset = RearrangeDatasetV0()
+        with gzip.open(output_path, "rt") as f:
+            dataset.from_json(f.read())
+        assert len(dataset.episodes) == 2
+        datasets.append(dataset)
+
+    # The shards only depend on the seed of the run
+    assert datasets[0].to_json() == datasets[1].to_json()
+
+
 @pytest.mark.skipif(
     not osp.exists("data/test_assets/"),
     reason="This test requires habitat-sim test assets.",
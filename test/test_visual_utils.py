@@ -6,6 +6,7 @@
 
 import numpy as np
 
+from habitat.utils.visualizations import fog_of_war, maps
 from habitat.utils.visualizations.utils import observations_to_image
 
 
@@ -57,3 +58,104 @@ def test_different_dim_observations_to_image():
         1570,
         3,
     ), "Resulted image resolution doesn't match."
+
+
+def test_fog_of_war_ray_table():
+    rng = np.random.default_rng(0)
+    top_down_map = np.ones((200, 200), dtype=np.uint8)
+    for _ in range(30):
+        x, y = rng.integers(0, 200, size=2)
+        top_down_map[
+            x : x + rng.integers(3, 20), y : y + rng.integers(3, 20)
+        ] = 0
+    top_down_map[90:110, 90:110] = 1
+    point = np.array([100, 100])
+    table = fog_of_war.FogOfWarRayTable(fov=90, max_line_len=50)
+
+    full_mask = np.zeros_like(top_down_map)
+    incremental_mask = np.zeros_like(top_down_map)
+    view = None
+    for angle in np.linspace(0, 2 * np.pi, 30):
+        expected = fog_of_war.reveal_fog_of_war(
+            top_down_map,
+            np.zeros_like(top_down_map),
+            point,
+            np.array(angle),
+            fov=90,
+            max_line_len=50,
+        )
+        mask = np.zeros_like(top_down_map)
+        table.reveal(top_down_map, mask, point, angle)
+        # The view direction is snapped to the closest precomputed ray.
+        iou = (expected & mask).sum() / (expected | mask).sum()
+        assert iou > 0.9
+
+        table.reveal(top_down_map, full_mask, point, angle)
+        view = table.reveal(top_down_map, incremental_mask, point, angle, view)
+    assert np.array_equal(full_mask, incremental_mask)
+
+
+def test_topdown_map_cache(tmp_path):
+    num_computed = 0
+
+    def compute_map():
+        nonlocal num_computed
+        num_computed += 1
+        return np.full((4, 4), num_computed, dtype=np.uint8)
+
+    cache = maps.TopDownMapCache(max_size=1, cache_dir=str(tmp_path))
+    first_map = cache.get_or_compute("a", compute_map)
+    # Cached maps are returned as copies.
+    first_map[:] = 0
+    assert np.all(cache.get_or_compute("a", compute_map) == 1)
+    cache.get_or_compute("b", compute_map)
+    assert num_computed == 2
+
+    # "a" was evicted from memory, but not from disk.
+    assert np.all(cache.get_or_compute("a", compute_map) == 1)
+    other_cache = maps.TopDownMapCache(max_size=1, cache_dir=str(tmp_path))
+    assert np.all(other_cache.get_or_compute("b", compute_map) == 2)
+    assert num_computed == 2
+
+    memory_cache = maps.TopDownMapCache(max_size=1)
+    memory_cache.get_or_compute("a", compute_map)
+    memory_cache.get_or_compute("b", compute_map)
+    memory_cache.get_or_compute("a", compute_map)
+    assert num_computed == 5
+    assert memory_cache.num_misses == 3
+
+    # A size of 0 disables the in-memory cache.
+    no_cache = maps.TopDownMapCache(max_size=0)
+    no_cache.get_or_compute("a", compute_map)
+    no_cache.get_or_compute("a", compute_map)
+    assert num_computed == 7
+    assert no_cache.num_hits == 0
+
+
+def test_topdown_map_cache_navmesh_hash():
+    class Pathfinder:
+        def __init__(self, vertices):
+            self.vertices = vertices
+            self.num_builds = 0
+
+        @property
+        def navigable_area(self):
+            return float(len(self.vertices))
+
+        def build_navmesh_vertices(self):
+            self.num_builds += 1
+            return self.vertices
+
+    cache = maps.TopDownMapCache()
+    pathfinder = Pathfinder([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0]])
+    navmesh_hash = cache.get_navmesh_hash("scene", pathfinder)
+    assert navmesh_hash == maps.get_navmesh_hash(pathfinder)
+    assert cache.get_navmesh_hash("scene", pathfinder) == navmesh_hash
+    assert pathfinder.num_builds == 2
+
+    # The navmesh is hashed again when the scene or the navmesh change.
+    cache.get_navmesh_hash("other_scene", pathfinder)
+    assert pathfinder.num_builds == 3
+    pathfinder.vertices = pathfinder.vertices + [[0.0, 0.0, 1.0]]
+    assert cache.get_navmesh_hash("other_scene", pathfinder) != navmesh_hash
+    assert pathfinder.num_builds == 4